@@ -1,24 +1,38 @@
 """An neural network Agent that uses a NEAT genome to construct its network."""
 
-from typing import List
+from typing import List, Optional
 
+import numpy as np
 from neat import Config
 from neat.genome import DefaultGenome
-from neat.nn import FeedForwardNetwork
 
+from basic_neat_model.compiled_network import CompiledNetwork
 from simulator.agents.basic_nn_agent import BasicNeuralNetworkAgent
 
 
 class NEATAgent(BasicNeuralNetworkAgent):
-    """A version of the BasicNeuralNetworkAgent that uses a NEAT network."""
+    """A version of the BasicNeuralNetworkAgent that uses a NEAT network.
 
-    def __init__(self, genome: DefaultGenome, config: Config):
+    The genome is compiled into a CompiledNetwork, unless an already compiled
+    network is given, and evaluate_batch activates it on a whole batch of input
+    vectors, e.g. to serve an InferenceBroker.
+    """
+
+    def __init__(self,
+                 genome: DefaultGenome,
+                 config: Config,
+                 network: Optional[CompiledNetwork] = None):
         self.genome = genome
         self.genome.fitness = 0
-        self.network = FeedForwardNetwork.create(genome, config)
+        if network is None:
+            network = CompiledNetwork.create(genome, config)
+        self.network = network
 
     def reward(self, amount):
         self.genome.fitness += amount
 
     def evaluate_network(self, input_vector: List[float]) -> List[float]:
         return self.network.activate(input_vector)
+
+    def evaluate_batch(self, inputs: np.ndarray) -> np.ndarray:
+        return self.network.activate_batch(inputs)
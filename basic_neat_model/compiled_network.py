@@ -0,0 +1,341 @@
+"""Compiles NEAT genomes into layered NumPy networks with batched activation."""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from neat import activations
+from neat import aggregations
+from neat import Config
+from neat.genome import DefaultGenome
+from neat.graphs import feed_forward_layers
+
+from simulator.agents.decision_cache import DecisionCache
+
+Activation = Callable[[np.ndarray], np.ndarray]
+
+
+def _inv(z: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore"):
+        result = 1.0 / z
+    result[z == 0.0] = 0.0
+    return result
+
+
+# NumPy versions of neat-python's built-in activation functions, which clamp
+# their inputs in the same way.
+_ACTIVATIONS: Dict[Callable[[float], float], Activation] = {
+    activations.sigmoid_activation:
+        lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    activations.tanh_activation:
+        lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    activations.sin_activation:
+        lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    activations.gauss_activation:
+        lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4)**2),
+    activations.relu_activation:
+        lambda z: np.maximum(z, 0.0),
+    activations.softplus_activation:
+        lambda z: 0.2 * np.log(1 + np.exp(np.clip(5.0 * z, -60.0, 60.0))),
+    activations.identity_activation:
+        lambda z: z,
+    activations.clamped_activation:
+        lambda z: np.clip(z, -1.0, 1.0),
+    activations.inv_activation:
+        _inv,
+    activations.log_activation:
+        lambda z: np.log(np.maximum(z, 1e-7)),
+    activations.exp_activation:
+        lambda z: np.exp(np.clip(z, -60.0, 60.0)),
+    activations.abs_activation:
+        np.abs,
+    activations.hat_activation:
+        lambda z: np.maximum(0.0, 1 - np.abs(z)),
+    activations.square_activation:
+        np.square,
+    activations.cube_activation:
+        lambda z: z**3,
+}
+
+
+def _vectorize(activation: Callable[[float], float]) -> Activation:
+    """Produces a NumPy version of an activation function."""
+    if activation in _ACTIVATIONS:
+        return _ACTIVATIONS[activation]
+    # User-defined activation functions are applied element by element.
+    return np.vectorize(activation, otypes=[float])
+
+
+class CompiledLayer:
+    """One layer of a CompiledNetwork, whose nodes only depend on earlier ones.
+
+    Attributes:
+        sources: The columns of the network's values that the layer reads.
+        weights: A (len(sources), layer size) matrix of connection weights,
+          scaled by each node's response.
+        biases: Each node's bias.
+        start: The first of the layer's own columns in the network's values.
+        activations: Each activation function in the layer, with the indices
+          of the nodes using it, or None if every node uses it.
+    """
+
+    def __init__(self, sources: np.ndarray, weights: np.ndarray,
+                 biases: np.ndarray, start: int,
+                 activations_used: List[Tuple[Activation,
+                                              Optional[np.ndarray]]]):
+        self.sources = sources
+        self.weights = weights
+        self.biases = biases
+        self.start = start
+        self.activations = activations_used
+
+    @property
+    def size(self) -> int:
+        return len(self.biases)
+
+    def apply(self, values: np.ndarray):
+        """Evaluates the layer's nodes into their columns of the values.
+
+        Args:
+            values: A (network values,) vector or a (batch size, network
+              values) array.
+        """
+        totals = values[..., self.sources] @ self.weights + self.biases
+        outputs = values[..., self.start:self.start + self.size]
+        for activation, indices in self.activations:
+            if indices is None:
+                outputs[...] = activation(totals)
+            else:
+                outputs[..., indices] = activation(totals[..., indices])
+
+
+class CompiledNetwork:
+    """A feed-forward NEAT network compiled into one weight matrix per layer.
+
+    Disabled connections and nodes that cannot affect an output are pruned,
+    and the remaining nodes are grouped into layers with the same
+    neat.graphs.feed_forward_layers as neat.nn.FeedForwardNetwork, so both
+    evaluate exactly the same nodes. In particular, an output that cannot be
+    reached from the inputs is 0. Each layer's weight matrix only spans the
+    values it reads, so it stays small however sparse the genome is.
+
+    Inputs are activated in batches, one row per input vector, with a single
+    matrix product per layer.
+    """
+
+    def __init__(self, num_inputs: int, layers: List[CompiledLayer],
+                 outputs: np.ndarray):
+        """Assembles a network from compiled layers.
+
+        Args:
+            num_inputs: The number of inputs, which take the first columns of
+              the network's values.
+            layers: The layers, in order of evaluation, whose columns follow
+              the inputs in the same order.
+            outputs: The column of each output. The last column, after every
+              layer's, is always 0.
+        """
+        self.num_inputs = num_inputs
+        self.layers = layers
+        self.outputs = outputs
+        self.num_values = num_inputs + sum(layer.size for layer in layers) + 1
+
+    @staticmethod
+    def create(genome: DefaultGenome, config: Config) -> "CompiledNetwork":
+        """Compiles a genome into a network.
+
+        Raises:
+            ValueError: A node aggregates its inputs with a function other than
+              sum or mean, which cannot be expressed as a matrix product.
+        """
+        genome_config = config.genome_config
+        connections = [
+            gene.key for gene in genome.connections.values() if gene.enabled
+        ]
+        incoming: Dict[int, List[Tuple[int, float]]] = {}
+        for in_node, out_node in connections:
+            incoming.setdefault(out_node, []).append(
+                (in_node, genome.connections[(in_node, out_node)].weight))
+
+        columns = {key: i for i, key in enumerate(genome_config.input_keys)}
+        layers = []
+        for layer_nodes in feed_forward_layers(genome_config.input_keys,
+                                               genome_config.output_keys,
+                                               connections):
+            nodes = sorted(layer_nodes)
+            sources = sorted({
+                columns[in_node] for node in nodes
+                for in_node, _ in incoming[node]
+            })
+            rows = {column: row for row, column in enumerate(sources)}
+            weights = np.zeros((len(sources), len(nodes)))
+            biases = np.zeros(len(nodes))
+            grouped: Dict[Callable[[float], float], List[int]] = {}
+            for i, node in enumerate(nodes):
+                gene = genome.nodes[node]
+                aggregation = genome_config.aggregation_function_defs.get(
+                    gene.aggregation)
+                scale = gene.response
+                if aggregation is aggregations.mean_aggregation:
+                    scale /= len(incoming[node])
+                elif aggregation is not aggregations.sum_aggregation:
+                    raise ValueError(
+                        f"Node {node} uses the {gene.aggregation} aggregation, "
+                        f"but only sum and mean can be compiled.")
+                for in_node, weight in incoming[node]:
+                    weights[rows[columns[in_node]], i] += weight * scale
+                biases[i] = gene.bias
+                grouped.setdefault(
+                    genome_config.activation_defs.get(gene.activation),
+                    []).append(i)
+
+            start = len(columns)
+            for i, node in enumerate(nodes):
+                columns[node] = start + i
+            if len(grouped) == 1:
+                activations_used = [(_vectorize(next(iter(grouped))), None)]
+            else:
+                activations_used = [
+                    (_vectorize(activation), np.array(indices, dtype=np.intp))
+                    for activation, indices in grouped.items()
+                ]
+            layers.append(
+                CompiledLayer(np.array(sources, dtype=np.intp), weights,
+                              biases, start, activations_used))
+
+        zero_column = len(columns)
+        outputs = np.array([
+            columns.get(key, zero_column) for key in genome_config.output_keys
+        ],
+                           dtype=np.intp)
+        return CompiledNetwork(len(genome_config.input_keys), layers, outputs)
+
+    def activate_batch(self, inputs: np.ndarray) -> np.ndarray:
+        """Activates the network on a batch of input vectors.
+
+        Args:
+            inputs: A (batch size, inputs) array.
+
+        Returns:
+            A (batch size, outputs) array.
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        if inputs.ndim != 2 or inputs.shape[1] != self.num_inputs:
+            raise RuntimeError(
+                f"Expected batches of {self.num_inputs} inputs, got an array "
+                f"of shape {inputs.shape}")
+        values = np.empty((len(inputs), self.num_values))
+        values[:, :self.num_inputs] = inputs
+        values[:, -1] = 0.0
+        for layer in self.layers:
+            layer.apply(values)
+        return values[:, self.outputs]
+
+    def activate(self, inputs: Sequence[float]) -> List[float]:
+        """Activates the network on one input vector, like FeedForwardNetwork.
+        """
+        if len(inputs) != self.num_inputs:
+            raise RuntimeError(
+                f"Expected {self.num_inputs} inputs, got {len(inputs)}")
+        # A single vector skips the batch dimension, which is much cheaper for
+        # the small matrices of a typical genome.
+        values = np.empty(self.num_values)
+        values[:self.num_inputs] = inputs
+        values[-1] = 0.0
+        for layer in self.layers:
+            layer.apply(values)
+        return values[self.outputs].tolist()
+
+
+def fingerprint(genome: DefaultGenome) -> int:
+    """Hashes every gene that decides a genome's compiled network.
+
+    Two genomes with the same fingerprint compile into the same network within
+    one process. Fingerprints are not stable across processes.
+    """
+    return hash((
+        tuple(
+            sorted((key, connection.weight, connection.enabled)
+                   for key, connection in genome.connections.items())),
+        tuple(
+            sorted((key, node.bias, node.response, node.activation,
+                    node.aggregation) for key, node in genome.nodes.items())),
+    ))
+
+
+class _CachedNetwork:
+    """A genome's compiled network and the rankings it has made."""
+
+    __slots__ = ("fingerprint", "network", "decisions", "generation")
+
+    def __init__(self, genome_fingerprint: int, network: CompiledNetwork):
+        self.fingerprint = genome_fingerprint
+        self.network = network
+        self.decisions = DecisionCache()
+        self.generation = 0
+
+
+class NetworkCache:
+    """The compiled networks of genomes, kept across one generation.
+
+    Networks are keyed by genome key, and only reused if the genome's
+    fingerprint has not changed, e.g. because a checkpoint was restored with
+    different genomes under the same keys. Networks that were not used in the
+    previous generation are evicted when a new generation starts, so the cache
+    holds at most about two populations' networks. If max_size is set, the
+    least recently used networks are also evicted beyond it, which bounds the
+    cache even if new_generation is never called.
+
+    Each network also has a DecisionCache of its rankings, shared by every
+    NEATAgent for the genome in the generation, which is cleared when a new
+    generation starts.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.max_size = max_size
+        self._networks: 'OrderedDict[int, _CachedNetwork]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._networks)
+
+    def _entry(self, genome: DefaultGenome, config: Config) -> _CachedNetwork:
+        genome_fingerprint = fingerprint(genome)
+        cached = self._networks.get(genome.key)
+        if cached is not None and cached.fingerprint == genome_fingerprint:
+            self.hits += 1
+            self._networks.move_to_end(genome.key)
+        else:
+            self.misses += 1
+            # A stale network is replaced as the most recently used.
+            self._networks.pop(genome.key, None)
+            cached = self._networks[genome.key] = _CachedNetwork(
+                genome_fingerprint, CompiledNetwork.create(genome, config))
+            if (self.max_size is not None and
+                    len(self._networks) > self.max_size):
+                self._networks.popitem(last=False)
+        cached.generation = self.generation
+        return cached
+
+    def get(self, genome: DefaultGenome, config: Config) -> CompiledNetwork:
+        """Produces the genome's network, compiling it if it is not cached."""
+        return self._entry(genome, config).network
+
+    def get_with_decisions(
+            self, genome: DefaultGenome,
+            config: Config) -> Tuple[CompiledNetwork, DecisionCache]:
+        """Produces the genome's network, as get does, and its DecisionCache."""
+        cached = self._entry(genome, config)
+        return cached.network, cached.decisions
+
+    def new_generation(self):
+        """Starts a generation, evicting networks unused in the previous one."""
+        self.generation += 1
+        self._networks = OrderedDict(
+            (key, cached)
+            for key, cached in self._networks.items()
+            if cached.generation >= self.generation - 1)
+        for cached in self._networks.values():
+            cached.decisions.clear()
@@ -0,0 +1,146 @@
+"""Distills a trained agent for the basic ruleset into a LookupTableAgent.
+
+Every cell of the discretized observation space of both active Pokemon is
+encoded at its center, as BasicNeuralNetworkAgent encodes battles, and ranked
+by the source agent's network in batches. The resulting LookupTableAgent
+decides with one array index instead of a network activation. How often it
+agrees with the source agent is measured on the decisions of self-play
+battles between every pair of starter teams.
+"""
+
+import os
+import pickle
+import time
+from itertools import product
+from typing import List, Optional, Tuple
+
+import neat
+import numpy as np
+
+from basic_neat_model.agents.neat_agent import NEATAgent
+from simulator.agents.agent import Agent
+from simulator.agents.basic_nn_agent import BasicNeuralNetworkAgent
+from simulator.agents.lookup_table_agent import Discretization
+from simulator.agents.lookup_table_agent import LookupTableAgent
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle
+from simulator.battle.battle import Player
+from simulator.battle.deadline import Deadline
+from simulator.team_generators.basic_rival_team_generator import \
+    BasicRivalTeamGenerator
+
+
+def basic_discretization(hp_buckets: int = 8) -> Discretization:
+    """Discretizes the basic ruleset's observations.
+
+    Its moves only lower Attack (Growl), Defense (Leer, Tail Whip) and Speed
+    (Bubble), and only Ember inflicts a status, a burn.
+    """
+    species = sorted({p.species for p in BasicRivalTeamGenerator.STARTERS},
+                     key=lambda s: s.dex_num)
+    return Discretization(species=tuple(species), hp_buckets=hp_buckets)
+
+
+def _side_features(discretization: Discretization) -> np.ndarray:
+    """Encodes each side cell's center as BasicNeuralNetworkAgent would."""
+    return np.array([
+        BasicNeuralNetworkAgent.encode_active_pokemon(species, hp, modifiers,
+                                                      status)
+        for species, hp, modifiers, status in discretization.side_centers()
+    ])
+
+
+def distill(source: NEATAgent,
+            discretization: Discretization,
+            depth: int = 2) -> LookupTableAgent:
+    """Fills in a lookup table with the source agent's rankings.
+
+    Args:
+        source: The agent to distill.
+        discretization: How observations are discretized into cells.
+        depth: The number of best Actions kept for each cell.
+
+    Returns:
+        A LookupTableAgent deciding as the source does at each cell's center.
+    """
+    sides = _side_features(discretization)
+    cells = len(sides)
+    table = np.empty((cells, cells, depth), dtype=np.uint8)
+    inputs = np.empty((cells, 2 * sides.shape[1]))
+    inputs[:, sides.shape[1]:] = sides
+    for cell, features in enumerate(sides):
+        inputs[:, :sides.shape[1]] = features
+        outputs = source.evaluate_batch(inputs)
+        # A stable sort ranks equal outputs in ACTIONS order, like _rank.
+        order = np.argsort(-outputs, axis=1, kind="stable")
+        table[cell] = order[:, :depth]
+    return LookupTableAgent(discretization, table)
+
+
+class _AgreementRecorder(Agent):
+    """Plays as the source agent, counting how often the table agrees."""
+
+    def __init__(self, source: Agent, table: LookupTableAgent):
+        self.source = source
+        self.table = table
+        self.agreements = 0
+        self.decisions = 0
+
+    def request_action(self,
+                       battle: Battle,
+                       player: Player,
+                       choices: List[Action],
+                       *,
+                       deadline: Optional[Deadline] = None) -> Action:
+        action = self.source.request_action(battle, player, choices)
+        self.agreements += (self.table.request_action(battle, player,
+                                                      choices) == action)
+        self.decisions += 1
+        return action
+
+
+def agreement(source: Agent,
+              table: LookupTableAgent,
+              battles: int = 100) -> Tuple[float, int]:
+    """Measures how often the table decides as the source does in self-play.
+
+    Args:
+        source: The agent the table was distilled from.
+        table: The distilled LookupTableAgent.
+        battles: The number of battles played for each pair of teams.
+
+    Returns:
+        The fraction of decisions the table agreed with and the number of
+        decisions.
+    """
+    recorder = _AgreementRecorder(source, table)
+    teams = [[starter] for starter in BasicRivalTeamGenerator.STARTERS]
+    for team_one, team_two in product(teams, repeat=2):
+        for _ in range(battles):
+            Battle(team_one, team_two, recorder, recorder).play()
+    return recorder.agreements / max(recorder.decisions, 1), recorder.decisions
+
+
+def main(winner_file: str, config_file: str, output_file: str):
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    with open(winner_file, "rb") as file:
+        source = NEATAgent(pickle.load(file), config)
+
+    start = time.perf_counter()
+    table = distill(source, basic_discretization())
+    print(f"Distilled {table.table.shape[0] ** 2} cells in "
+          f"{time.perf_counter() - start:.1f}s")
+    table.save(output_file)
+    print(f"Wrote {output_file} ({os.path.getsize(output_file)} bytes)")
+
+    rate, decisions = agreement(source, table)
+    print(f"Agreed with the source on {rate:.1%} of {decisions} decisions")
+
+
+if __name__ == "__main__":
+    local_dir = os.path.dirname(__file__)
+    main(os.path.join(local_dir, "winner.p"), os.path.join(local_dir,
+                                                           "config"),
+         os.path.join(local_dir, "lookup_table.npz"))
@@ -0,0 +1,122 @@
+"""Glicko ratings for genomes, estimated from the games they play.
+
+Ratings follow Glickman's Glicko system: each player has a rating and a
+rating deviation, the uncertainty of the rating. Games are grouped into
+rating periods, here generations, and every player's rating is updated once
+per period from all of its games against the ratings held at the start of
+the period. Deviations shrink as players play and grow between periods.
+"""
+
+from math import log
+from math import pi
+from math import sqrt
+from typing import Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+_Q = log(10) / 400
+
+
+class Glicko:
+    """The Glicko ratings of a pool of players, keyed by any hashable id."""
+
+    def __init__(self,
+                 initial_rating: float = 1500.0,
+                 initial_deviation: float = 350.0,
+                 deviation_growth: float = 15.0):
+        """Sets up an empty pool.
+
+        Args:
+            initial_rating: The rating of players that have not played yet.
+            initial_deviation: The deviation of players that have not played
+              yet, which is also the highest deviation.
+            deviation_growth: How much uncertainty is added to the ratings at
+              the start of each period (Glicko's c).
+        """
+        self.initial_rating = initial_rating
+        self.initial_deviation = initial_deviation
+        self.deviation_growth = deviation_growth
+        self.ratings: Dict[Hashable, Tuple[float, float]] = {}
+
+    def get(self, player: Hashable) -> Tuple[float, float]:
+        """Produces a player's rating and rating deviation."""
+        return self.ratings.get(player,
+                                (self.initial_rating, self.initial_deviation))
+
+    def arrays(self, players: Sequence[Hashable]) -> Tuple[np.ndarray,
+                                                           np.ndarray]:
+        """Produces the ratings and rating deviations of players, in order."""
+        ratings = np.array([self.get(player) for player in players])
+        return ratings[:, 0], ratings[:, 1]
+
+    @staticmethod
+    def g(deviation):
+        """Discounts a game against an opponent by its rating deviation."""
+        return 1 / np.sqrt(1 + 3 * (_Q * deviation)**2 / pi**2)
+
+    @classmethod
+    def expected_score(cls, rating, opponent_rating, opponent_deviation):
+        """Produces the expected score of a player against an opponent."""
+        return 1 / (1 + 10**(-cls.g(opponent_deviation) *
+                             (rating - opponent_rating) / 400))
+
+    @classmethod
+    def information(cls, rating, opponent_rating, opponent_deviation):
+        """Produces how much a game against an opponent tells about a player.
+
+        This is the game's term in the inverse of Glicko's d², which is
+        largest for evenly matched opponents with certain ratings.
+        """
+        expected = cls.expected_score(rating, opponent_rating,
+                                      opponent_deviation)
+        return cls.g(opponent_deviation)**2 * expected * (1 - expected)
+
+    def update(self,
+               games: Iterable[Tuple[Hashable, Hashable, float]],
+               players: Optional[Iterable[Hashable]] = None):
+        """Updates every rating from one rating period's games.
+
+        Args:
+            games: The players and the first player's score (1 for a win, 0.5
+              for a draw and 0 for a loss) of each game.
+            players: If set, only these players' ratings are kept, e.g. to
+              forget genomes that are no longer in the population.
+        """
+        # Every deviation grows at the start of the period, before any game.
+        start: Dict[Hashable, Tuple[float, float]] = {}
+
+        def at_start(player: Hashable) -> Tuple[float, float]:
+            if player not in start:
+                rating, deviation = self.get(player)
+                start[player] = (rating,
+                                 min(sqrt(deviation**2 +
+                                          self.deviation_growth**2),
+                                     self.initial_deviation))
+            return start[player]
+
+        # Each player's sums of g(RD_j)² E (1 - E) and of g(RD_j) (s - E).
+        sums: Dict[Hashable, Tuple[float, float]] = {}
+        for player, opponent, score in games:
+            for one, other, one_score in ((player, opponent, score),
+                                          (opponent, player, 1 - score)):
+                rating, _ = at_start(one)
+                other_rating, other_deviation = at_start(other)
+                g = self.g(other_deviation)
+                expected = self.expected_score(rating, other_rating,
+                                               other_deviation)
+                information, surprise = sums.get(one, (0.0, 0.0))
+                sums[one] = (information + g * g * expected * (1 - expected),
+                             surprise + g * (one_score - expected))
+
+        if players is None:
+            players = set(self.ratings) | set(sums)
+        ratings = {}
+        for player in players:
+            rating, deviation = at_start(player)
+            if player in sums:
+                information, surprise = sums[player]
+                precision = 1 / deviation**2 + _Q * _Q * information
+                rating += _Q / precision * surprise
+                deviation = sqrt(1 / precision)
+            ratings[player] = (float(rating), float(deviation))
+        self.ratings = ratings
@@ -13,13 +13,16 @@ from basic_neat_model.parallel_utils import ParallelSelfPlayEvaluator
 
 def train(config_file: str,
           generations: Optional[int] = 300,
-          checkpoint_file: Optional[str] = None):
+          checkpoint_file: Optional[str] = None,
+          opponents: Optional[int] = None):
     """Trains a network using the given configuration. Saves the winner.
 
     Args:
         config_file: Path to the configuration from this file's directory.
         generations: The number of generations to train for.
         checkpoint_file: Path to a checkpoint from this file's directory.
+        opponents: If set, each genome plays this many sampled opponents per
+          generation, and its fitness is its Glicko rating.
     """
     config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
                          neat.DefaultSpeciesSet, neat.DefaultStagnation,
@@ -36,7 +39,10 @@ def train(config_file: str,
     pop.add_reporter(
         neat.Checkpointer(generation_interval=1,
                           filename_prefix="checkpoints/neat-checkpoint-"))
-    pe = ParallelSelfPlayEvaluator(multiprocessing.cpu_count() - 1, evaluate)
+    pe = ParallelSelfPlayEvaluator(multiprocessing.cpu_count() - 1,
+                                   evaluate,
+                                   config=config,
+                                   opponents=opponents)
 
     winner = pop.run(pe.evaluate, generations)
 
@@ -1,14 +1,23 @@
 """Utilities for parallel training of a NEAT model for the basic ruleset."""
 
+import heapq
+import pickle
+import time
 from itertools import product
 from math import sqrt
-from typing import Dict, List, Tuple
+from multiprocessing import Pool
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 from neat import Config
 from neat import DefaultGenome
 from neat import ParallelEvaluator
 
 from basic_neat_model.agents.neat_agent import NEATAgent
+from basic_neat_model.compiled_network import NetworkCache
+from basic_neat_model.glicko import Glicko
 from simulator.battle.battle import Battle
 from simulator.battle.battle import Player
 from simulator.team_generators.basic_rival_team_generator import \
@@ -18,26 +27,264 @@ from simulator.team_generators.team_generator import \
 
 
 class ParallelSelfPlayEvaluator(ParallelEvaluator):
-    """A version of ParallelEvaluator that can engage in self-play."""
+    """A version of ParallelEvaluator that can engage in self-play.
+
+    By default, every genome plays itself and every genome after it in the
+    population, and its fitness is the sum of its rewards. If opponents is
+    set, every genome instead plays that many opponents, sampled in
+    proportion to how informative a game against them would be, and its
+    fitness is its Glicko rating, kept across generations. This costs
+    O(population × opponents) pairs per generation instead of
+    O(population²).
+
+    Pairs are split into chunks of about equal estimated cost, a few per
+    worker, and sent out longest first, so that workers run out of work at
+    about the same time. A pair's cost is estimated from how long each of its
+    genomes' pairs took, on average, in the previous generation. Workers sum
+    the rewards of their chunk, and chunks are collected as they complete.
+
+    Each generation's population is pickled once into shared memory, and
+    every worker unpickles it once, so chunks only hold pairs of genome ids.
+    Workers receive the evaluation function and the Config when they start.
+    """
+
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self,
+                 num_workers,
+                 eval_function,
+                 timeout=None,
+                 config: Optional[Config] = None,
+                 opponents: Optional[int] = None,
+                 ratings: Optional[Glicko] = None,
+                 seed: Optional[int] = None):
+        """Sets up the evaluator and its pool of workers.
+
+        Args:
+            num_workers: The number of worker processes.
+            eval_function: Evaluates a genome against competitors, producing
+              the rewards of each genome id, like evaluate.
+            timeout: The most seconds to wait for each chunk of pairs.
+            config: The Config for the run, which workers are started with.
+              If not set, workers are started when evaluate is first called.
+            opponents: If set, the number of opponents sampled for each genome.
+            ratings: The Glicko ratings of the genomes, when opponents are
+              sampled. Defaults to a new pool of ratings.
+            seed: Seeds the sampling of opponents.
+        """
+        if opponents is not None and opponents < 1:
+            raise ValueError("Every genome must play at least one opponent.")
+        # The pool is created with an initializer, rather than by
+        # ParallelEvaluator.
+        # pylint: disable=super-init-not-called
+        self.num_workers = num_workers
+        self.eval_function = eval_function
+        self.timeout = timeout
+        self.config = None
+        self.pool = None
+        if config is not None:
+            self._start_pool(config)
+        self._generation = 0
+        self.opponents = opponents
+        self.ratings = Glicko() if ratings is None else ratings
+        self._random = np.random.default_rng(seed)
+        # The mean cost of each genome's pairs in the previous generation.
+        self.genome_costs: Dict[int, float] = {}
+
+    def __del__(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+
+    def _start_pool(self, config: Config):
+        """Starts the workers, with the evaluation function and the Config."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+        self.config = config
+        # Workers share the resource tracker if it runs before they start, and
+        # otherwise each starts its own, which would try to clean up every
+        # generation's shared memory again when the worker exits.
+        resource_tracker.ensure_running()
+        self.pool = Pool(self.num_workers,
+                         initializer=_initialize_worker,
+                         initargs=(self.eval_function, config))
+
+    def _chunks(self, pairs: List[Tuple[int, int]]):
+        """Splits pairs into chunks of equal estimated cost, longest first."""
+        known = self.genome_costs
+        default = sum(known.values()) / len(known) if known else 1.0
+        costs = [(known.get(genome_id, default) +
+                  known.get(competitor_id, default)) / 2
+                 for genome_id, competitor_id in pairs]
+        count = min(len(pairs), self.num_workers * self.CHUNKS_PER_WORKER)
+        chunks = [[] for _ in range(count)]
+        loads = [(0.0, chunk) for chunk in range(count)]
+        # The most costly pair left always goes to the least loaded chunk.
+        for pair in sorted(range(len(pairs)),
+                           key=costs.__getitem__,
+                           reverse=True):
+            load, chunk = heapq.heappop(loads)
+            chunks[chunk].append(pairs[pair])
+            heapq.heappush(loads, (load + costs[pair], chunk))
+        return [chunks[chunk] for _, chunk in sorted(loads, reverse=True)]
+
+    def _sample_pairs(self, genomes):
+        """Samples informative opponents for each genome.
+
+        A game is most informative against an opponent of a similar rating
+        whose own rating is certain, as measured by Glicko.information.
+        Pairs sampled from both sides are only played once.
+        """
+        ratings, deviations = self.ratings.arrays(
+            [genome_id for genome_id, _ in genomes])
+        information = Glicko.information(ratings[:, np.newaxis],
+                                         ratings[np.newaxis, :],
+                                         deviations[np.newaxis, :])
+        np.fill_diagonal(information, 0.0)
+        opponents = min(self.opponents, len(genomes) - 1)
+        sampled = set()
+        for idx, weights in enumerate(information):
+            # Every opponent keeps some chance of being sampled.
+            weights = weights + 1e-6
+            weights[idx] = 0.0
+            for opponent in self._random.choice(len(genomes),
+                                                size=opponents,
+                                                replace=False,
+                                                p=weights / weights.sum()):
+                sampled.add((min(idx, opponent), max(idx, opponent)))
+        return [(genomes[i][0], genomes[j][0]) for i, j in sorted(sampled)]
 
     def evaluate(self, genomes, config):
-        jobs = []
-        for idx, genome in enumerate(genomes[:-1]):
-            competitors = genomes[idx:]
-            jobs.append(
-                self.pool.apply_async(self.eval_function,
-                                      args=(genome, competitors, config)))
+        if self.pool is None or config is not self.config:
+            self._start_pool(config)
+        if self.opponents is None:
+            pairs = [(genome_id, competitor_id)
+                     for idx, (genome_id, _) in enumerate(genomes[:-1])
+                     for competitor_id, _ in genomes[idx:]]
+        else:
+            pairs = self._sample_pairs(genomes)
+        chunks = self._chunks(pairs)
+
+        rewards = {genome_id: 0.0 for genome_id, _ in genomes}
+        pair_costs = {genome_id: [] for genome_id, _ in genomes}
+        games = []
+        self._generation += 1
+        population = pickle.dumps(genomes, pickle.HIGHEST_PROTOCOL)
+        memory = SharedMemory(create=True, size=max(len(population), 1))
+        try:
+            memory.buf[:len(population)] = population
+            results = self.pool.imap_unordered(
+                _evaluate_chunk,
+                [(self._generation, memory.name, chunk) for chunk in chunks])
+            for _ in chunks:
+                chunk_rewards, chunk_pairs = results.next(timeout=self.timeout)
+                for genome_id, reward in chunk_rewards.items():
+                    rewards[genome_id] += reward
+                for genome_id, competitor_id, cost, score in chunk_pairs:
+                    pair_costs[genome_id].append(cost)
+                    pair_costs[competitor_id].append(cost)
+                    games.append((genome_id, competitor_id, score))
+        finally:
+            memory.close()
+            memory.unlink()
+
+        self.genome_costs = {
+            genome_id: sum(costs) / len(costs)
+            for genome_id, costs in pair_costs.items()
+            if costs
+        }
+        if self.opponents is not None:
+            self.ratings.update(games,
+                                [genome_id for genome_id, _ in genomes])
+            rewards = {
+                genome_id: self.ratings.get(genome_id)[0]
+                for genome_id in rewards
+            }
+        for genome_id, genome in genomes:
+            genome.fitness = rewards[genome_id]
 
-        rewards = {genome[0]: (genome[1], 0.0) for genome in genomes}
 
-        for job in jobs:
-            job_rewards = job.get(timeout=self.timeout)
-            for genome_id, reward in job_rewards.items():
-                rewards[genome_id] = (rewards[genome_id][0],
-                                      rewards[genome_id][1] + reward)
+# Each process compiles a genome's network at most once per generation. Only
+# workers of a ParallelSelfPlayEvaluator start new generations, so the cache is
+# also bounded for processes that call evaluate directly.
+MAX_CACHED_NETWORKS = 512
+_networks = NetworkCache(max_size=MAX_CACHED_NETWORKS)
 
-        for _, (genome, reward) in rewards.items():
-            genome.fitness = reward
+# The evaluation function, Config and population of a worker process.
+_worker_eval_function: Optional[Callable] = None
+_worker_config: Optional[Config] = None
+_worker_generation = 0
+_worker_genomes: Dict[int, Tuple[int, DefaultGenome]] = {}
+
+
+def _initialize_worker(eval_function: Callable, config: Config):
+    global _worker_eval_function, _worker_config
+    _worker_eval_function = eval_function
+    _worker_config = config
+    # A new generation keeps at most the previous population's networks, so
+    # this bound only guards against the cache outgrowing two populations.
+    _networks.max_size = max(MAX_CACHED_NETWORKS, 2 * config.pop_size)
+
+
+def _load_generation(generation: int, memory_name: str):
+    """Unpickles a generation's population, unless it already has."""
+    global _worker_generation, _worker_genomes
+    if generation == _worker_generation:
+        return
+    memory = SharedMemory(name=memory_name)
+    try:
+        genomes = pickle.loads(memory.buf)
+    finally:
+        memory.close()
+    _worker_genomes = {genome[0]: genome for genome in genomes}
+    _worker_generation = generation
+    _networks.new_generation()
+
+
+def _evaluate_chunk(
+    job: Tuple[int, str, List[Tuple[int, int]]]
+) -> Tuple[Dict[int, float], List[Tuple[int, int, float, float]]]:
+    """Plays a chunk of pairs in a worker, summing their rewards there.
+
+    Args:
+        job: The generation, the name of the shared memory holding its
+          population, and the chunk of genome id pairs.
+
+    Returns:
+        The summed rewards of each genome id, and for each pair, the genome
+        ids, the time taken and the first genome's score: its share of the
+        pair's rewards, or 0.5 if there were none.
+    """
+    generation, memory_name, pairs = job
+    _load_generation(generation, memory_name)
+    rewards: Dict[int, float] = {}
+    results = []
+    for genome_id, competitor_id in pairs:
+        start = time.perf_counter()
+        pair_rewards = _worker_eval_function(_worker_genomes[genome_id],
+                                             [_worker_genomes[competitor_id]],
+                                             _worker_config)
+        cost = time.perf_counter() - start
+        total = sum(pair_rewards.values())
+        score = pair_rewards.get(genome_id, 0.0) / total if total else 0.5
+        results.append((genome_id, competitor_id, cost, score))
+        for rewarded_id, reward in pair_rewards.items():
+            rewards[rewarded_id] = rewards.get(rewarded_id, 0.0) + reward
+    return rewards, results
+
+
+def _agent(genome: DefaultGenome, config: Config) -> NEATAgent:
+    """Produces an agent for a genome, from its cached network and rankings.
+
+    NEAT networks are deterministic, and the basic ruleset's battles revisit
+    the same observations constantly, so every agent for a genome in a
+    generation shares one DecisionCache.
+    """
+    network, decisions = _networks.get_with_decisions(genome, config)
+    agent = NEATAgent(genome, config, network)
+    agent.decision_cache = decisions
+    return agent
 
 
 def evaluate(genome: Tuple[int, DefaultGenome],
@@ -53,9 +300,9 @@ def evaluate(genome: Tuple[int, DefaultGenome],
     Returns:
         A dictionary of genome ids and how much to reward them.
     """
-    evaluating_bot = (genome[0], NEATAgent(genome[1], config))
+    evaluating_bot = (genome[0], _agent(genome[1], config))
     competitor_bots = list(
-        map(lambda g: (g[0], NEATAgent(g[1], config)), competitor_genomes))
+        map(lambda g: (g[0], _agent(g[1], config)), competitor_genomes))
     rewards = {genome[0]: 0.0}
 
     brtg = BasicRivalTeamGenerator()
@@ -72,7 +319,7 @@ def evaluate(genome: Tuple[int, DefaultGenome],
         for team_one, team_two in team_matchups:
             battle = Battle(team_one, team_two, evaluating_bot[1],
                             competitor[1])
-            winner, turns = battle.play()
+            winner, turns, _ = battle.play()
             if winner is None:
                 rewards[evaluating_bot[0]] += 0.25 / sqrt(turns)
                 rewards[competitor[0]] += 0.25 / sqrt(turns)
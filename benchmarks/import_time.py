@@ -0,0 +1,81 @@
+"""Benchmarks how long it takes a fresh interpreter to import the simulator.
+
+Each measurement runs in a new subprocess, as a pool worker would, and times
+importing a module and then touching the dex data it needs. Cold runs point
+the compiled dex cache at an empty directory, so the dexes are built from
+JSON; warm runs load them from the cache.
+
+Run from the repository root:
+
+    python benchmarks/import_time.py [--repeats N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CASES = {
+    "simulator": ("import simulator", ""),
+    "simulator.ruleset": (
+        "import simulator.ruleset",
+        "simulator.ruleset.FULL_RULESET",
+    ),
+    "basic_neat_model.parallel_utils": (
+        "import basic_neat_model.parallel_utils",
+        "import simulator.ruleset; simulator.ruleset.FULL_RULESET",
+    ),
+}
+
+_TIMER = """
+import time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+{statement}
+imported = time.perf_counter()
+{first_use}
+used = time.perf_counter()
+print(imported - start, used - start)
+"""
+
+
+def measure(statement: str, first_use: str, cache_dir: str):
+    env = {**os.environ, "LANCE_DEX_CACHE_DIR": cache_dir}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    output = subprocess.run(
+        [sys.executable, "-c", _TIMER.format(statement=statement, first_use=first_use)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    imported, used = output.split()
+    return float(imported), float(used)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'module':<34}{'cache':<7}{'import ms':>11}{'+ first use ms':>16}")
+    for name, (statement, first_use) in CASES.items():
+        samples = {"cold": [], "warm": []}
+        with tempfile.TemporaryDirectory() as warm_dir:
+            measure(statement, first_use, warm_dir)
+            # Interleave cold and warm runs so that drift affects both equally.
+            for _ in range(args.repeats):
+                with tempfile.TemporaryDirectory() as cold_dir:
+                    samples["cold"].append(measure(statement, first_use, cold_dir))
+                samples["warm"].append(measure(statement, first_use, warm_dir))
+        for cache, runs in samples.items():
+            imported = statistics.median(r[0] for r in runs) * 1000
+            used = statistics.median(r[1] for r in runs) * 1000
+            print(f"{name:<34}{cache:<7}{imported:>11.1f}{used:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
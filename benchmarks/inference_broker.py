@@ -0,0 +1,116 @@
+"""Benchmarks batching network evaluations with an InferenceBroker.
+
+Many starter battles are played concurrently on one event loop with
+Battle.play_async, between agents sharing one NumPy multilayer perceptron,
+first evaluating it once per decision, then through an InferenceBroker. For
+each, the report gives the time per decision spent evaluating the network and
+the broker's mean batch size.
+
+Run from the repository root:
+
+    python benchmarks/inference_broker.py [--battles N] [--hidden N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from itertools import product
+from typing import List, Sequence
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from simulator.agents.basic_nn_agent import BasicNeuralNetworkAgent
+from simulator.agents.inference_broker import InferenceBroker
+from simulator.battle.battle import Battle
+from simulator.team_generators.basic_rival_team_generator import BasicRivalTeamGenerator
+
+
+class Perceptron:
+    """A two-layer perceptron with random weights."""
+
+    def __init__(self, inputs: int, hidden: int, outputs: int, seed: int):
+        rng = np.random.default_rng(seed)
+        self.w1 = rng.standard_normal((inputs, hidden))
+        self.w2 = rng.standard_normal((hidden, outputs))
+
+    def activate_batch(self, inputs: np.ndarray) -> np.ndarray:
+        return np.tanh(inputs @ self.w1) @ self.w2
+
+
+class TimedPerceptronAgent(BasicNeuralNetworkAgent):
+    def __init__(self, network: Perceptron):
+        self.network = network
+        self.seconds = 0.0
+        self.decisions = 0
+
+    def evaluate_network(self, input_vector: Sequence[float]) -> List[float]:
+        start = time.perf_counter()
+        output = self.network.activate_batch(np.array([input_vector]))[0].tolist()
+        self.seconds += time.perf_counter() - start
+        self.decisions += 1
+        return output
+
+
+async def play_all(battles: List[Battle]):
+    await asyncio.gather(*(battle.play_async() for battle in battles))
+
+
+def make_battles(agent: TimedPerceptronAgent, count: int) -> List[Battle]:
+    starters = [[starter] for starter in BasicRivalTeamGenerator.STARTERS]
+    matchups = list(product(starters, repeat=2))
+    return [Battle(*matchups[i % len(matchups)], agent, agent) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--battles", type=int, default=512)
+    parser.add_argument("--hidden", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    network = Perceptron(32, args.hidden, 10, args.seed)
+
+    agent = TimedPerceptronAgent(network)
+    random.seed(args.seed)
+    start = time.perf_counter()
+    asyncio.run(play_all(make_battles(agent, args.battles)))
+    wall = time.perf_counter() - start
+    print(
+        f"unbatched: {agent.decisions} decisions, "
+        f"{agent.seconds / agent.decisions * 1e6:.1f} us of inference each, "
+        f"{wall:.2f} s in total"
+    )
+
+    agent = TimedPerceptronAgent(network)
+    batch_seconds = [0.0]
+
+    def evaluate_batch(inputs: np.ndarray) -> np.ndarray:
+        batch_start = time.perf_counter()
+        outputs = network.activate_batch(inputs)
+        batch_seconds[0] += time.perf_counter() - batch_start
+        return outputs
+
+    with InferenceBroker(evaluate_batch, args.max_batch_size) as broker:
+        agent.broker = broker
+        random.seed(args.seed)
+        start = time.perf_counter()
+        asyncio.run(play_all(make_battles(agent, args.battles)))
+        wall = time.perf_counter() - start
+    print(
+        f"brokered:  {broker.requests} decisions, "
+        f"{batch_seconds[0] / broker.requests * 1e6:.1f} us of inference each, "
+        f"{wall:.2f} s in total, mean batch size {broker.mean_batch_size:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
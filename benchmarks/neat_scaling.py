@@ -0,0 +1,275 @@
+"""Benchmarks how ParallelSelfPlayEvaluator.evaluate scales with worker count.
+
+A synthetic population is built from the basic NEAT model's config with a
+fixed seed, and each genome is mutated a few times so that its network is not
+empty. The evaluator is then run once per worker count, from 1 up to every
+core, with its pool wrapped in a proxy that measures each job:
+
+- strong scaling: a fixed population, reported as speedup and efficiency
+  relative to one worker;
+- weak scaling: a population grown with the worker count so that the number
+  of genome pairs per worker stays constant;
+- per-worker utilisation: the share of the evaluation's wall time each worker
+  process spent running jobs;
+- IPC: bytes sent to and received from workers, and the time spent pickling
+  them (measured by pickling each payload once more, outside the pool),
+  including the population broadcast through shared memory, which is also
+  reported on its own;
+- the slowest job, and the tail: how long the evaluation ran after the first
+  worker ran out of jobs.
+
+Job timestamps come from time.perf_counter, which is system-wide on Linux.
+
+Run from the repository root:
+
+    python benchmarks/neat_scaling.py [--population N] [--max-workers N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import random
+import sys
+import time
+from math import sqrt
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import neat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from basic_neat_model.parallel_utils import ParallelSelfPlayEvaluator, evaluate
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "basic_neat_model",
+    "config",
+)
+
+
+def _timed_call(
+    function: Callable, args: Tuple
+) -> Tuple[Any, int, float, float, int, float]:
+    start = time.perf_counter()
+    value = function(*args)
+    end = time.perf_counter()
+    pickle_start = time.perf_counter()
+    size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    pickle_time = time.perf_counter() - pickle_start
+    return value, os.getpid(), start, end, size, pickle_time
+
+
+class JobRecord:
+    def __init__(self, bytes_sent: int, pickle_time: float):
+        self.bytes_sent = bytes_sent
+        self.pickle_time = pickle_time
+        self.bytes_received = 0
+        self.pid = 0
+        self.start = 0.0
+        self.end = 0.0
+
+
+def _timed_job(job: Tuple[Callable, int, Any]) -> Tuple[int, Tuple]:
+    function, index, arg = job
+    return index, _timed_call(function, (arg,))
+
+
+def _record(record: JobRecord, timed: Tuple) -> Any:
+    value, pid, start, end, size, pickle_time = timed
+    record.pid = pid
+    record.start = start
+    record.end = end
+    record.bytes_received = size
+    record.pickle_time += pickle_time
+    return value
+
+
+class _MeasuredResult:
+    def __init__(self, result: multiprocessing.pool.AsyncResult, record: JobRecord):
+        self._result = result
+        self._record = record
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        return _record(self._record, self._result.get(timeout))
+
+
+class _MeasuredIterator:
+    def __init__(self, iterator: Iterator, records: List[JobRecord]):
+        self._iterator = iterator
+        self._records = records
+
+    def __iter__(self):
+        return self
+
+    def next(self, timeout: Optional[float] = None) -> Any:
+        index, timed = self._iterator.next(timeout)
+        return _record(self._records[index], timed)
+
+    __next__ = next
+
+
+class MeasuringPool:
+    """Wraps a Pool's apply_async and imap_unordered to record every job's
+    timing and IPC."""
+
+    def __init__(self, pool: multiprocessing.pool.Pool):
+        self._pool = pool
+        self.jobs: List[JobRecord] = []
+
+    def _new_record(self, payload: Any) -> JobRecord:
+        pickle_start = time.perf_counter()
+        size = len(pickle.dumps(payload, pickle.HIGHEST_PROTOCOL))
+        record = JobRecord(size, time.perf_counter() - pickle_start)
+        self.jobs.append(record)
+        return record
+
+    def apply_async(self, function: Callable, args: Tuple = ()) -> _MeasuredResult:
+        record = self._new_record((function, args))
+        return _MeasuredResult(
+            self._pool.apply_async(_timed_call, (function, args)), record
+        )
+
+    def imap_unordered(
+        self, function: Callable, iterable: Iterable, chunksize: int = 1
+    ) -> _MeasuredIterator:
+        args = list(iterable)
+        records = [self._new_record((function, arg)) for arg in args]
+        jobs = [(function, index, arg) for index, arg in enumerate(args)]
+        return _MeasuredIterator(
+            self._pool.imap_unordered(_timed_job, jobs, chunksize), records
+        )
+
+
+def make_population(
+    config: neat.Config, size: int, seed: int, mutations: int
+) -> List[Tuple[int, neat.DefaultGenome]]:
+    random.seed(seed)
+    genomes = []
+    for key in range(1, size + 1):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        for _ in range(mutations):
+            genome.mutate(config.genome_config)
+        genomes.append((key, genome))
+    return genomes
+
+
+def run_evaluation(
+    config: neat.Config, genomes: List[Tuple[int, neat.DefaultGenome]], workers: int
+) -> Dict[str, Any]:
+    # The evaluator pickles the population once per evaluation into shared
+    # memory, as measured here.
+    pickle_start = time.perf_counter()
+    broadcast_bytes = len(pickle.dumps(genomes, pickle.HIGHEST_PROTOCOL))
+    broadcast_time = time.perf_counter() - pickle_start
+
+    evaluator = ParallelSelfPlayEvaluator(workers, evaluate, config=config)
+    measuring_pool = MeasuringPool(evaluator.pool)
+    evaluator.pool = measuring_pool
+    try:
+        start = time.perf_counter()
+        evaluator.evaluate(genomes, config)
+        end = time.perf_counter()
+    finally:
+        evaluator.pool = measuring_pool._pool  # pylint: disable=protected-access
+        evaluator.pool.close()
+        evaluator.pool.join()
+    wall = end - start
+
+    jobs = measuring_pool.jobs
+    busy: Dict[int, float] = {}
+    last_end: Dict[int, float] = {}
+    for job in jobs:
+        busy[job.pid] = busy.get(job.pid, 0.0) + job.end - job.start
+        last_end[job.pid] = max(last_end.get(job.pid, 0.0), job.end)
+    return {
+        "workers": workers,
+        "population": len(genomes),
+        "jobs": len(jobs),
+        "wall": wall,
+        "utilisation": sorted((b / wall for b in busy.values()), reverse=True)
+        + [0.0] * (workers - len(busy)),
+        "bytes_sent": broadcast_bytes + sum(job.bytes_sent for job in jobs),
+        "bytes_received": sum(job.bytes_received for job in jobs),
+        "broadcast_bytes": broadcast_bytes,
+        "pickle_time": broadcast_time + sum(job.pickle_time for job in jobs),
+        "slowest_job": max(job.end - job.start for job in jobs),
+        # Every worker is idle after its last job ends, until the evaluation
+        # ends, so the earliest last job marks the start of the tail.
+        "tail": end - min(last_end.values()) if len(busy) == workers else wall,
+    }
+
+
+def weak_population(base_population: int, workers: int) -> int:
+    """Grows a population so that its genome pairs scale with the workers."""
+    pairs = workers * base_population * (base_population - 1) / 2
+    return max(2, round((1 + sqrt(1 + 8 * pairs)) / 2))
+
+
+def report(title: str, results: List[Dict[str, Any]]):
+    baseline = results[0]
+    print(f"\n{title}")
+    print(
+        f"{'workers':>7} {'pop':>5} {'jobs':>5} {'wall s':>8} {'speedup':>8} "
+        f"{'eff':>6} {'slowest s':>9} {'tail s':>7} {'sent KiB':>9} "
+        f"{'bcast KiB':>9} {'recv KiB':>9} {'pickle ms':>9}  utilisation"
+    )
+    for result in results:
+        if title.startswith("Strong"):
+            speedup = baseline["wall"] / result["wall"]
+        else:
+            # With constant work per worker, ideal wall time stays constant.
+            speedup = result["workers"] * baseline["wall"] / result["wall"]
+        print(
+            f"{result['workers']:>7} {result['population']:>5} {result['jobs']:>5} "
+            f"{result['wall']:>8.2f} {speedup:>8.2f} "
+            f"{speedup / result['workers']:>6.1%} {result['slowest_job']:>9.2f} "
+            f"{result['tail']:>7.2f} {result['bytes_sent'] / 1024:>9.1f} "
+            f"{result['broadcast_bytes'] / 1024:>9.1f} "
+            f"{result['bytes_received'] / 1024:>9.1f} "
+            f"{result['pickle_time'] * 1000:>9.1f}  "
+            + " ".join(f"{u:.0%}" for u in result["utilisation"])
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--population", type=int, default=24)
+    parser.add_argument("--max-workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mutations", type=int, default=10)
+    parser.add_argument(
+        "--no-weak", action="store_true", help="Skip the weak scaling runs."
+    )
+    args = parser.parse_args()
+
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        CONFIG_PATH,
+    )
+    worker_counts = range(1, args.max_workers + 1)
+
+    genomes = make_population(config, args.population, args.seed, args.mutations)
+    report(
+        "Strong scaling",
+        [run_evaluation(config, genomes, workers) for workers in worker_counts],
+    )
+
+    if not args.no_weak:
+        weak_results = []
+        for workers in worker_counts:
+            size = weak_population(args.population, workers)
+            weak_genomes = make_population(config, size, args.seed, args.mutations)
+            weak_results.append(run_evaluation(config, weak_genomes, workers))
+        report("Weak scaling", weak_results)
+
+
+if __name__ == "__main__":
+    main()
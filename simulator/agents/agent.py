@@ -1,9 +1,10 @@
 """An agent that can send commands to the Battle as requested."""
 
 from abc import ABCMeta, abstractmethod
-from typing import List
+from typing import List, Optional
 
 from simulator.battle.battle import Action, Battle, Player
+from simulator.battle.deadline import Deadline
 
 
 class NoValidActionsException(Exception):
@@ -24,7 +25,12 @@ class Agent(metaclass=ABCMeta):
     ACTIONS = [Action.MOVE_1, Action.MOVE_2, Action.MOVE_3, Action.MOVE_4] + SWITCHES
 
     def request_switch(
-        self, battle: Battle, player: Player, choices: List[Action]
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
     ) -> Action:
         """Request the agent to make a switch in the given battle.
 
@@ -36,15 +42,82 @@ class Agent(metaclass=ABCMeta):
             battle: The Battle in which the switch must be made.
             player: The Player who needs a pending switch added.
             choices: The possible Actions the agent can take.
+            deadline: When the decision must be made by, if it is timed.
 
         Returns:
             An element of choices that will be executed.
         """
-        return self.request_action(battle, player, choices)
+        return self.request_action(battle, player, choices, deadline=deadline)
+
+    async def request_switch_async(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        """Asynchronously request the agent to make a switch in the given battle.
+
+        Defaults to the same functionality as request_action_async, but can be
+        overriden.
+
+        Args:
+            battle: The Battle in which the switch must be made.
+            player: The Player who needs a pending switch added.
+            choices: The possible Actions the agent can take.
+            deadline: When the decision must be made by, if it is timed.
+
+        Returns:
+            An element of choices that will be executed.
+        """
+        return await self.request_action_async(
+            battle, player, choices, deadline=deadline
+        )
+
+    async def request_action_async(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        """Asynchronously request the agent to take an action in the given battle.
+
+        Defaults to calling request_action directly. Agents that wait on slow
+        sources (humans, remote bots, batched inference) should override this
+        so that the event loop can run other battles while they wait.
+
+        Args:
+            battle: The Battle in which the action must be taken.
+            player: The Player who needs a pending action added.
+            choices: The possible Actions the agent can take.
+            deadline: When the decision must be made by, if it is timed.
+
+        Returns:
+            An element of choices that will be executed.
+        """
+        return self.request_action(battle, player, choices, deadline=deadline)
+
+    def reseed(self, seed: int):
+        """Reseeds any random number generator the agent keeps of its own.
+
+        Agents drawing from the random module need not override this, as it
+        is seeded with the battle, e.g. by simulator.run.
+
+        Args:
+            seed: The new seed.
+        """
 
     @abstractmethod
     def request_action(
-        self, battle: Battle, player: Player, choices: List[Action]
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
     ) -> Action:
         """Request the agent to take an action in the given battle.
 
@@ -54,6 +127,7 @@ class Agent(metaclass=ABCMeta):
             battle: The Battle in which the action must be taken.
             player: The Player who needs a pending action added.
             choices: The possible Actions the agent can take.
+            deadline: When the decision must be made by, if it is timed.
 
         Returns:
             An element of choices that will be executed.
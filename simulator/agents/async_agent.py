@@ -0,0 +1,56 @@
+"""An agent whose decisions are awaited rather than computed on the spot."""
+
+import asyncio
+from abc import ABCMeta, abstractmethod
+from typing import List, Optional
+
+from simulator.agents.agent import Agent
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player
+from simulator.battle.deadline import Deadline
+
+
+class AsyncAgent(Agent, metaclass=ABCMeta):
+    """Abstract class for an agent that waits on a slow source for decisions.
+
+    Subclasses implement request_action_async. Battles played with play_async
+    await it directly, so a single event loop can host many battles whose
+    agents are waiting on humans, remote bots, or batched inference. The
+    synchronous request_action runs the coroutine to completion, and so must
+    not be called from inside a running event loop.
+    """
+
+    def request_action(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        return asyncio.run(
+            self.request_action_async(battle, player, choices, deadline=deadline)
+        )
+
+    def request_switch(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        return asyncio.run(
+            self.request_switch_async(battle, player, choices, deadline=deadline)
+        )
+
+    @abstractmethod
+    async def request_action_async(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        pass
@@ -1,20 +1,30 @@
 """A simple NeuralNetworkAgent that can compete in 1v1s with the starters."""
 
 from abc import ABCMeta
-from typing import List
+from typing import List, Sequence
 
 from simulator.agents.nn_agent import NeuralNetworkAgent
-from simulator.battle.active_pokemon import ActivePokemon
 from simulator.battle.battle import Battle, Player
+from simulator.battle.battle_view import SideView
 from simulator.pokemon.pokemon_species import PokemonSpecies
 from simulator.status import Status
 
+# The one-hot encodings of each starter's dex number and of each Status, which
+# are slow to build on every call.
+_POKEDEX_ENCODINGS = {
+    dex_num: [float(dex_num == other) for other in (1, 4, 7)] for dex_num in (1, 4, 7)
+}
+_STATUS_ENCODINGS = {
+    status: [float(status == other) for other in Status] for status in Status
+}
+
 
 class BasicNeuralNetworkAgent(NeuralNetworkAgent, metaclass=ABCMeta):
     """A basic NeuralNetworkAgent.
 
     This is an agent that bases its decisions solely on the status of the
-    current ActivePokemon. Its Pokedex is limited to the three starters.
+    current ActivePokemon, as seen through a BattleView. Its Pokedex is
+    limited to the three starters.
     """
 
     @staticmethod
@@ -31,18 +41,15 @@ class BasicNeuralNetworkAgent(NeuralNetworkAgent, metaclass=ABCMeta):
             ValueError: The PokemonSpecies must be Bulbasaur, Charmander, or
               Squirtle.
         """
-        encoding = [0.0 for _ in range(3)]
-        if pokemon.dex_num in (1, 4, 7):
-            index = pokemon.dex_num // 3
-        else:
+        encoding = _POKEDEX_ENCODINGS.get(pokemon.dex_num)
+        if encoding is None:
             raise ValueError(
                 "The Basic Ruleset only allows for the three starter Pokemon."
             )
-        encoding[index] = 1
-        return encoding
+        return encoding.copy()
 
     @staticmethod
-    def _encode_stat_modifiers(stat_modifiers: List[int]) -> List[float]:
+    def _encode_stat_modifiers(stat_modifiers: Sequence[int]) -> List[float]:
         """Encodes the given list of status modifiers as a vector.
         Args:
             stat_modifiers: A six-element-long list of stat modifiers.
@@ -61,30 +68,50 @@ class BasicNeuralNetworkAgent(NeuralNetworkAgent, metaclass=ABCMeta):
         Returns:
             A vector representation of the given Status.
         """
-        encoding = [0.0 for _ in Status]
-        for index, test_status in enumerate(Status):
-            if status == test_status:
-                encoding[index] = 1
-                break
-        return encoding
+        return _STATUS_ENCODINGS[status].copy()
+
+    @classmethod
+    def encode_active_pokemon(
+        cls,
+        species: PokemonSpecies,
+        hp_fraction: float,
+        stat_modifiers: Sequence[int],
+        status: Status,
+    ) -> List[float]:
+        """Encodes the state of an active Pokemon as a vector.
 
-    def _encode_active_pokemon(self, pokemon: ActivePokemon) -> List[float]:
-        """Encodes a representation of an ActivePokemon as a vector.
+        This is the encoding of each side in vectorize_battle, so that inputs
+        built without a Battle (e.g. by basic_neat_model.distill) match it.
 
         Args:
-            pokemon: The ActivePokemon to encode.
+            species: The Pokemon's species.
+            hp_fraction: The fraction of its HP left.
+            stat_modifiers: Its modifier of each ModifiableStat.
+            status: Its Status.
 
         Returns:
-            A vector representation of the given ActivePokemon.
+            A vector representation of the given active Pokemon.
         """
         return (
-            self._encode_one_hot_pokedex(pokemon.species)
-            + [pokemon.hp / pokemon.max_hp]
-            + self._encode_stat_modifiers(pokemon.stat_modifiers)
-            + self._encode_one_hot_status(pokemon.status)
+            cls._encode_one_hot_pokedex(species)
+            + [hp_fraction]
+            + cls._encode_stat_modifiers(stat_modifiers)
+            + cls._encode_one_hot_status(status)
+        )
+
+    def _encode_side(self, side: SideView) -> List[float]:
+        """Encodes a representation of a side's active Pokemon as a vector.
+
+        Args:
+            side: The SideView of the side to encode.
+
+        Returns:
+            A vector representation of the side's active Pokemon.
+        """
+        return self.encode_active_pokemon(
+            side.species, side.hp / side.max_hp, side.stat_modifiers, side.status
         )
 
     def vectorize_battle(self, battle: Battle, player: Player) -> List[float]:
-        return self._encode_active_pokemon(
-            battle.actives[player]
-        ) + self._encode_active_pokemon(battle.actives[player.opponent])
+        view = battle.view(player)
+        return self._encode_side(view.own) + self._encode_side(view.opponent)
@@ -0,0 +1,74 @@
+"""A bounded cache of action rankings, keyed by the observation they rank.
+
+A deterministic NeuralNetworkAgent always ranks the same observation the same
+way, and small formats revisit the same observations constantly, so the
+ranking of a repeated observation can be reused instead of evaluating the
+network and sorting its outputs again.
+
+Observations are keyed exactly by default. Rounding them to a number of
+decimals first also merges observations that differ only by float noise, at
+the cost of possibly reusing the ranking of a slightly different observation.
+"""
+
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+from simulator.battle.action import Action
+
+
+class DecisionCache:
+    """An LRU cache of action rankings, with hit and miss statistics."""
+
+    def __init__(self, max_size: int = 4096, decimals: Optional[int] = None):
+        """Sets up an empty cache.
+
+        Args:
+            max_size: The most rankings kept. The least recently used ranking
+              is evicted to make room for a new one.
+            decimals: If set, observations are rounded to this many decimals
+              before being used as keys.
+        """
+        if max_size < 1:
+            raise ValueError("The cache must hold at least one ranking.")
+        self.max_size = max_size
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self._rankings: "OrderedDict[Hashable, Tuple[Action, ...]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._rankings)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def key(self, input_vector: Sequence[float]) -> Hashable:
+        """Produces the cache key of an observation."""
+        if self.decimals is None:
+            return tuple(input_vector)
+        return tuple(round(value, self.decimals) for value in input_vector)
+
+    def get(self, key: Hashable) -> Optional[List[Action]]:
+        """Produces a copy of the ranking cached under a key, if there is one."""
+        ranking = self._rankings.get(key)
+        if ranking is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._rankings.move_to_end(key)
+        return list(ranking)
+
+    def put(self, key: Hashable, ranking: Sequence[Action]):
+        """Caches a ranking, evicting the least recently used one if full."""
+        self._rankings[key] = tuple(ranking)
+        self._rankings.move_to_end(key)
+        if len(self._rankings) > self.max_size:
+            self._rankings.popitem(last=False)
+
+    def clear(self):
+        """Empties the cache and resets its statistics."""
+        self._rankings.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,351 @@
+"""A depth-limited expectiminimax agent for the simultaneous-move battle.
+
+Each turn is searched as a zero-sum matrix game between P1's and P2's Actions,
+whose cells are chance nodes over the turn's random rolls (damage rolls,
+crits, accuracy, speed ties and side effects). The engine draws its rolls from
+the random module, so a chance node is sampled rather than enumerated: the
+turn is played out once for each of a fixed list of seeds, and the outcomes
+are merged by Battle.state_key, each weighted by how many seeds led to it.
+Using the same seeds in every cell compares Actions under the same rolls.
+
+Search is bounded in three ways:
+
+- a transposition table, keyed by state_key and depth, holds every solved
+  matrix node, and is kept between decisions in the same battle;
+- rows are tested for weak dominance against the best row found so far, and
+  each of their cells is only searched until it is proven no better than the
+  dominating row's cell, using Star1 bounds over the cell's chance outcomes
+  (values lie in [0, 1], so the unsearched outcomes bound the cell's value).
+  Removing weakly dominated rows and columns does not change a game's value;
+- iterative deepening stops at the decision's time budget, and the deepest
+  fully searched depth is used.
+
+Matrix games are solved exactly when they have a pure saddle point, and
+otherwise approximately with regret matching+. At the root, the agent samples
+its Action from its side's mixed strategy.
+"""
+
+import random
+import time
+import weakref
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from simulator.agents.agent import Agent
+from simulator.agents.mcts_agent import evaluate
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player
+from simulator.battle.deadline import Deadline
+
+_EPSILON = 1e-9
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def solve_matrix_game(
+    matrix: Sequence[Sequence[float]], iterations: int = 100
+) -> Tuple[float, List[float], List[float]]:
+    """Solves a zero-sum matrix game, with the row player maximizing.
+
+    A pure saddle point is found exactly. Otherwise the players' strategies
+    are the linearly weighted averages of regret matching+, which converge to
+    an equilibrium as iterations grows.
+
+    Returns:
+        The value of the game, and the row and column players' strategies.
+    """
+    rows, columns = len(matrix), len(matrix[0])
+    row_minimums = [min(row) for row in matrix]
+    column_maximums = [max(row[j] for row in matrix) for j in range(columns)]
+    maximin = max(row_minimums)
+    minimax = min(column_maximums)
+    if maximin >= minimax - _EPSILON:
+        row_strategy = [0.0] * rows
+        row_strategy[row_minimums.index(maximin)] = 1.0
+        column_strategy = [0.0] * columns
+        column_strategy[column_maximums.index(minimax)] = 1.0
+        return maximin, row_strategy, column_strategy
+
+    row_regrets = [0.0] * rows
+    column_regrets = [0.0] * columns
+    row_totals = [0.0] * rows
+    column_totals = [0.0] * columns
+    for iteration in range(1, iterations + 1):
+        row_strategy = _regret_matching(row_regrets)
+        column_strategy = _regret_matching(column_regrets)
+        row_payoffs = [
+            sum(value * p for value, p in zip(row, column_strategy)) for row in matrix
+        ]
+        column_payoffs = [
+            sum(row[j] * p for row, p in zip(matrix, row_strategy))
+            for j in range(columns)
+        ]
+        value = sum(payoff * p for payoff, p in zip(row_payoffs, row_strategy))
+        for i in range(rows):
+            row_regrets[i] = max(0.0, row_regrets[i] + row_payoffs[i] - value)
+            row_totals[i] += iteration * row_strategy[i]
+        for j in range(columns):
+            column_regrets[j] = max(0.0, column_regrets[j] + value - column_payoffs[j])
+            column_totals[j] += iteration * column_strategy[j]
+
+    row_strategy = _normalize(row_totals)
+    column_strategy = _normalize(column_totals)
+    value = sum(
+        matrix[i][j] * row_strategy[i] * column_strategy[j]
+        for i in range(rows)
+        for j in range(columns)
+    )
+    return value, row_strategy, column_strategy
+
+
+def _regret_matching(regrets: List[float]) -> List[float]:
+    total = sum(regrets)
+    if total <= 0:
+        return [1.0 / len(regrets)] * len(regrets)
+    return [regret / total for regret in regrets]
+
+
+def _normalize(weights: List[float]) -> List[float]:
+    total = sum(weights)
+    return [weight / total for weight in weights]
+
+
+def _column_dominates(matrix: List[List[float]], k: int, j: int) -> bool:
+    """Whether column k weakly dominates column j for the minimizing player.
+
+    Of identical columns, only the first dominates the others.
+    """
+    if k == j or any(row[k] > row[j] + _EPSILON for row in matrix):
+        return False
+    return k < j or any(row[k] < row[j] - _EPSILON for row in matrix)
+
+
+class ExpectiminimaxAgent(Agent):
+    """An agent choosing by iteratively deepened expectiminimax search."""
+
+    def __init__(
+        self,
+        seconds: float = 0.25,
+        max_depth: int = 3,
+        samples: int = 4,
+        solver_iterations: int = 64,
+        max_table_size: int = 200_000,
+        seed: Optional[int] = None,
+    ):
+        """Sets up the agent.
+
+        Args:
+            seconds: The time spent searching each decision. The battle's
+              deadline, if it is sooner, takes precedence. The first depth is
+              always searched fully.
+            max_depth: The most turns to search ahead.
+            samples: The number of seeds each chance node is sampled with.
+            solver_iterations: Regret matching+ iterations for the matrix
+              games inside the tree. The root's game gets four times as many.
+            max_table_size: The transposition table is cleared when it holds
+              this many entries.
+            seed: Seeds the chance samples and the choice from the mixed
+              strategy.
+        """
+        self.seconds = seconds
+        self.max_depth = max_depth
+        self.solver_iterations = solver_iterations
+        self.max_table_size = max_table_size
+        self._random = random.Random(seed)
+        self._seeds = [self._random.getrandbits(64) for _ in range(samples)]
+
+        self.table: Dict[Tuple[Hashable, int], float] = {}
+        self._row_orders: Dict[Hashable, List[Optional[Action]]] = {}
+        self._battle: Optional[weakref.ref] = None
+        self._stop = 0.0
+        self._timed = False
+        # The deepest search completed for the last decision.
+        self.depth_reached = 0
+
+    def reseed(self, seed: int):
+        """Reseeds the chance samples, forgetting every value found with the
+        previous ones."""
+        self._random.seed(seed)
+        self._seeds = [self._random.getrandbits(64) for _ in self._seeds]
+        self.table.clear()
+        self._row_orders.clear()
+
+    def _budget(self, deadline: Optional[Deadline]) -> float:
+        if deadline is None:
+            return self.seconds
+        # Leave a margin for solving the root and returning.
+        return min(self.seconds, deadline.remaining() * 0.8)
+
+    def _check_time(self):
+        if self._timed and time.perf_counter() >= self._stop:
+            raise _OutOfTime()
+
+    def _chance(
+        self,
+        state: Battle,
+        p1_action: Optional[Action],
+        p2_action: Optional[Action],
+        depth: int,
+        alpha: float,
+    ) -> Tuple[float, bool]:
+        """Evaluates a joint decision, stopping once it is proven at most alpha.
+
+        Outcomes are sampled one seed at a time, so that a cut also saves
+        playing out the remaining samples.
+
+        Returns:
+            The decision's value and True, or an upper bound on its value of at
+            most alpha and False.
+        """
+        # Switching in a Pokemon after a knock out involves no rolls.
+        seeds = self._seeds[:1] if state.pending_switches() else self._seeds
+        probability = 1.0 / len(seeds)
+        outcome_values: Dict[Hashable, float] = {}
+        value = 0.0
+        remaining = 1.0
+        for seed in seeds:
+            child = state.clone()
+            random.seed(seed)
+            child.advance(p1_action, p2_action)
+            key = child.state_key()
+            child_value = outcome_values.get(key)
+            if child_value is None:
+                child_value = outcome_values[key] = self._value(child, depth, key)
+            value += probability * child_value
+            remaining -= probability
+            # Star1: the unsampled outcomes are worth at most 1 each.
+            if value + remaining <= alpha and remaining > _EPSILON:
+                return value + remaining, False
+        return value, True
+
+    def _matrix(
+        self, state: Battle, depth: int, key: Hashable
+    ) -> Tuple[List[Optional[Action]], List[Optional[Action]], List[List[float]]]:
+        """Evaluates the cells of a decision's matrix game that can matter.
+
+        Returns:
+            P1's and P2's Actions left after removing weakly dominated ones,
+            and the matrix of their values for P1.
+        """
+        rows: List[Optional[Action]] = state.choices(Player.P1) or [None]
+        columns: List[Optional[Action]] = state.choices(Player.P2) or [None]
+        child_depth = depth if state.pending_switches() else depth - 1
+        # Trying the best rows first, as found by a shallower search, makes
+        # the later rows likelier to be proven dominated early.
+        order = self._row_orders.get(key)
+        if order is not None:
+            rows.sort(key=lambda row: order.index(row) if row in order else len(order))
+
+        kept: List[Tuple[Optional[Action], List[float]]] = []
+        for row in rows:
+            self._check_time()
+            dominator = max(kept, key=lambda k: sum(k[1]), default=None)
+            values: List[float] = []
+            exact: List[bool] = []
+            dominated = dominator is not None
+            for j, column in enumerate(columns):
+                alpha = dominator[1][j] if dominated else -1.0
+                value, is_exact = self._chance(state, row, column, child_depth, alpha)
+                values.append(value)
+                exact.append(is_exact)
+                if value > alpha + _EPSILON:
+                    dominated = False
+            if dominated:
+                continue
+            for j, column in enumerate(columns):
+                if not exact[j]:
+                    values[j], _ = self._chance(state, row, column, child_depth, -1.0)
+            kept = [
+                k for k in kept if any(a > b + _EPSILON for a, b in zip(k[1], values))
+            ]
+            kept.append((row, values))
+
+        self._row_orders[key] = [
+            row for row, _ in sorted(kept, key=lambda k: -sum(k[1]))
+        ]
+        kept_rows = [row for row, _ in kept]
+        matrix = [values for _, values in kept]
+        kept_columns = [
+            j
+            for j in range(len(columns))
+            if not any(_column_dominates(matrix, k, j) for k in range(len(columns)))
+        ]
+        return (
+            kept_rows,
+            [columns[j] for j in kept_columns],
+            [[values[j] for j in kept_columns] for values in matrix],
+        )
+
+    def _value(self, state: Battle, depth: int, key: Hashable) -> float:
+        if state.finished or depth == 0:
+            return evaluate(state)
+        value = self.table.get((key, depth))
+        if value is not None:
+            return value
+        _, _, matrix = self._matrix(state, depth, key)
+        value, _, _ = solve_matrix_game(matrix, self.solver_iterations)
+        if len(self.table) >= self.max_table_size:
+            self.table.clear()
+            self._row_orders.clear()
+        self.table[(key, depth)] = value
+        return value
+
+    def strategy(
+        self, battle: Battle, player: Player, deadline: Optional[Deadline] = None
+    ) -> Dict[Action, float]:
+        """Searches the battle's next decision, as deep as the budget allows.
+
+        Returns:
+            The probability of each of the player's Actions in its strategy,
+            which is empty if the player has no choices in the battle.
+        """
+        if not battle.choices(player):
+            return {}
+        if self._battle is None or self._battle() is not battle:
+            self._battle = weakref.ref(battle)
+            self.table.clear()
+            self._row_orders.clear()
+
+        random_state = random.getstate()
+        self._stop = time.perf_counter() + self._budget(deadline)
+        key = battle.state_key()
+        strategy: Dict[Action, float] = {}
+        try:
+            for depth in range(1, self.max_depth + 1):
+                # The first depth is always completed, so there is a strategy.
+                self._timed = depth > 1
+                try:
+                    rows, columns, matrix = self._matrix(battle, depth, key)
+                except _OutOfTime:
+                    break
+                _, row_strategy, column_strategy = solve_matrix_game(
+                    matrix, self.solver_iterations * 4
+                )
+                if player == Player.P1:
+                    strategy = dict(zip(rows, row_strategy))
+                else:
+                    strategy = dict(zip(columns, column_strategy))
+                self.depth_reached = depth
+                if time.perf_counter() >= self._stop:
+                    break
+        finally:
+            random.setstate(random_state)
+        return strategy
+
+    def request_action(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        if len(choices) == 1:
+            return choices[0]
+        strategy = self.strategy(battle, player, deadline)
+        weights = [strategy.get(choice, 0.0) for choice in choices]
+        if not any(weights):
+            # There was nothing to search, so no choice is known to be better.
+            return self._random.choice(choices)
+        return self._random.choices(choices, weights)[0]
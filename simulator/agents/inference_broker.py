@@ -0,0 +1,181 @@
+"""Batches network evaluations from many concurrent battles into single calls.
+
+Evaluating a network on one input vector at a time spends most of its time on
+per-call overhead. An InferenceBroker collects input vectors submitted from
+any number of threads, and evaluates them together on its own thread, as soon
+as max_batch_size vectors are waiting or max_latency seconds have passed since
+the first of them arrived. Each caller gets a Future for its own output.
+
+Coroutines are batched on their event loop instead, without a thread: the
+vectors submitted by every coroutine that runs before the loop gets back to
+the broker's callback are evaluated together, so a batch forms without any
+waiting, as soon as every battle on the loop has asked for its decision.
+
+A NeuralNetworkAgent whose broker attribute is set evaluates its network
+through the broker, so many battles played concurrently (e.g. with
+Battle.play_async on one event loop, or on a thread pool) share batches.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+BatchFunction = Callable[[np.ndarray], np.ndarray]
+_Request = Tuple[Sequence[float], Future]
+_AsyncRequest = Tuple[Sequence[float], "asyncio.Future[List[float]]"]
+
+
+def batched(evaluate: Callable[[Sequence[float]], Sequence[float]]) -> BatchFunction:
+    """Adapts a network evaluated one vector at a time into a BatchFunction.
+
+    This saves no evaluation time by itself, but lets networks without batch
+    support share a broker's interface.
+    """
+
+    def evaluate_batch(inputs: np.ndarray) -> np.ndarray:
+        return np.array([evaluate(row) for row in inputs.tolist()])
+
+    return evaluate_batch
+
+
+class InferenceBroker:
+    """Evaluates input vectors in batches, for threads and coroutines alike.
+
+    Use it as a context manager, or call close, to stop its thread.
+    """
+
+    def __init__(
+        self,
+        evaluate_batch: BatchFunction,
+        max_batch_size: int = 256,
+        max_latency: float = 0.001,
+    ):
+        """Starts the broker's thread.
+
+        Args:
+            evaluate_batch: Maps a (batch size, inputs) array to a (batch size,
+              outputs) array, e.g. a network's batched activation.
+            max_batch_size: The most vectors evaluated at once.
+            max_latency: The most seconds a vector waits for others to join
+              its batch.
+        """
+        if max_batch_size < 1:
+            raise ValueError("Batches must hold at least one input vector.")
+        self.evaluate_batch = evaluate_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.batches = 0
+        self.requests = 0
+
+        self._pending: Dict[asyncio.AbstractEventLoop, List[_AsyncRequest]] = {}
+        self._requests: "queue.SimpleQueue[Optional[_Request]]" = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="InferenceBroker", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "InferenceBroker":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Evaluates any vectors already submitted, then stops the thread."""
+        if not self._closed:
+            self._closed = True
+            self._requests.put(None)
+            self._thread.join()
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+    def submit(self, input_vector: Sequence[float]) -> Future:
+        """Queues an input vector, producing a Future for its output vector."""
+        if self._closed:
+            raise RuntimeError("The broker has been closed.")
+        future: Future = Future()
+        self._requests.put((input_vector, future))
+        return future
+
+    def evaluate(self, input_vector: Sequence[float]) -> List[float]:
+        """Blocks until the output vector for an input vector is ready."""
+        return self.submit(input_vector).result()
+
+    async def evaluate_async(self, input_vector: Sequence[float]) -> List[float]:
+        """Awaits the output vector for an input vector on the running loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(loop, [])
+        pending.append((input_vector, future))
+        if len(pending) == 1:
+            # Runs after every coroutine that is ready to run now.
+            loop.call_soon(self._flush, loop)
+        elif len(pending) >= self.max_batch_size:
+            self._flush(loop)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        self._evaluate(
+            [
+                (vector, future)
+                for vector, future in self._pending.pop(loop, [])
+                if not future.cancelled()
+            ]
+        )
+
+    def _collect(self, first: _Request) -> Tuple[List[_Request], bool]:
+        """Gathers a batch, starting from its first request.
+
+        Returns:
+            The batch, and whether the broker was closed while gathering it.
+        """
+        batch = [first]
+        flush_at = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            try:
+                request = self._requests.get(
+                    timeout=max(0.0, flush_at - time.monotonic())
+                )
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def _run(self):
+        closed = False
+        while not closed:
+            first = self._requests.get()
+            if first is None:
+                break
+            batch, closed = self._collect(first)
+            self._evaluate(
+                [
+                    (vector, future)
+                    for vector, future in batch
+                    if future.set_running_or_notify_cancel()
+                ]
+            )
+
+    def _evaluate(self, batch: List[Union[_Request, _AsyncRequest]]):
+        if not batch:
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        try:
+            outputs = self.evaluate_batch(np.array([vector for vector, _ in batch]))
+        except Exception as exception:  # pylint: disable=broad-except
+            for _, future in batch:
+                future.set_exception(exception)
+            return
+        for (_, future), output in zip(batch, outputs.tolist()):
+            future.set_result(output)
@@ -0,0 +1,188 @@
+"""An agent whose decisions are looked up in a table, one array index each.
+
+A LookupTableAgent plays the basic ruleset's 1v1s (see BasicNeuralNetworkAgent)
+from a table holding, for every cell of a discretized observation of both
+active Pokemon, the best few Actions in order of preference. Each side's
+observation is discretized into its species, a bucket of its HP fraction, the
+modifiers of a few stats rounded to the nearest of a few levels, and its
+status. Tables are filled in by distilling another agent, e.g. with
+basic_neat_model.distill, so decisions cost one array index instead of a
+network activation, at the cost of some fidelity between cell centers.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from simulator.agents.agent import Agent
+from simulator.battle.action import Action
+from simulator.battle.active_pokemon import ActivePokemon
+from simulator.battle.battle import Battle, Player
+from simulator.battle.deadline import Deadline
+from simulator.dex.pokedex import POKEDEX
+from simulator.modifiable_stat import ModifiableStat
+from simulator.pokemon.pokemon_species import PokemonSpecies
+from simulator.status import Status
+
+
+class UnknownSpeciesException(Exception):
+    def __init__(self, species: PokemonSpecies):
+        super().__init__(f"{species.name} is not in the lookup table.")
+
+
+@dataclass(frozen=True)
+class Discretization:
+    """How each side's observation is discretized into cells.
+
+    Attributes:
+        species: The species a side's active Pokemon can be.
+        hp_buckets: The number of equal buckets HP fractions are divided into.
+        stats: The stats whose modifiers are modelled. Other modifiers are
+          assumed to be 0.
+        levels: The modifier values each modelled stat is rounded to.
+        statuses: The statuses modelled. Other statuses are treated as the
+          first.
+    """
+
+    species: Tuple[PokemonSpecies, ...]
+    hp_buckets: int = 8
+    stats: Tuple[ModifiableStat, ...] = (
+        ModifiableStat.ATTACK,
+        ModifiableStat.DEFENSE,
+        ModifiableStat.SPEED,
+    )
+    levels: Tuple[int, ...] = (-4, -2, -1, 0)
+    statuses: Tuple[Status, ...] = (Status.NONE, Status.BURN)
+
+    def __post_init__(self):
+        species_index = {species: i for i, species in enumerate(self.species)}
+        # The level index of each modifier from -6 to 6, nearest to 0 on ties.
+        level_index = [
+            min(
+                range(len(self.levels)),
+                key=lambda i: (abs(self.levels[i] - modifier), abs(self.levels[i])),
+            )
+            for modifier in range(-6, 7)
+        ]
+        status_index = {status: 0 for status in Status}
+        status_index.update({status: i for i, status in enumerate(self.statuses)})
+        object.__setattr__(self, "_species_index", species_index)
+        object.__setattr__(self, "_level_index", level_index)
+        object.__setattr__(self, "_status_index", status_index)
+
+    @property
+    def side_shape(self) -> Tuple[int, ...]:
+        """The number of values of each discretized feature of a side."""
+        return (
+            (len(self.species), self.hp_buckets)
+            + (len(self.levels),) * len(self.stats)
+            + (len(self.statuses),)
+        )
+
+    @property
+    def side_cells(self) -> int:
+        return math.prod(self.side_shape)
+
+    def side_cell(self, pokemon: ActivePokemon) -> int:
+        """Produces the cell of a side's active Pokemon.
+
+        Raises:
+            UnknownSpeciesException: The species is not in the discretization.
+        """
+        try:
+            cell = self._species_index[pokemon.species]
+        except KeyError:
+            raise UnknownSpeciesException(pokemon.species) from None
+        bucket = math.ceil(pokemon.hp * self.hp_buckets / pokemon.max_hp) - 1
+        cell = cell * self.hp_buckets + min(max(bucket, 0), self.hp_buckets - 1)
+        modifiers = pokemon.stat_modifiers_view
+        for stat in self.stats:
+            cell = cell * len(self.levels) + self._level_index[modifiers[stat] + 6]
+        return cell * len(self.statuses) + self._status_index[pokemon.status]
+
+    def side_centers(
+        self,
+    ) -> Iterator[Tuple[PokemonSpecies, float, List[int], Status]]:
+        """Produces the species, HP fraction, stat modifiers and status at the
+        center of each side cell, in cell order."""
+        for species in self.species:
+            for bucket in range(self.hp_buckets):
+                hp = (bucket + 0.5) / self.hp_buckets
+                for levels in np.ndindex(*(len(self.levels),) * len(self.stats)):
+                    modifiers = [0] * len(ModifiableStat)
+                    for stat, level in zip(self.stats, levels):
+                        modifiers[stat] = self.levels[level]
+                    for status in self.statuses:
+                        yield species, hp, modifiers, status
+
+
+class LookupTableAgent(Agent):
+    """An agent choosing the first valid Action of its table's cell.
+
+    Attributes:
+        discretization: How observations are discretized into cells.
+        table: A (side cells, side cells, depth) array of indices into
+          ACTIONS, of the best Actions for the player's and the opponent's
+          cells, in order of preference.
+    """
+
+    def __init__(self, discretization: Discretization, table: np.ndarray):
+        side_cells = discretization.side_cells
+        if table.shape[:2] != (side_cells, side_cells):
+            raise ValueError(
+                f"A table of shape {table.shape} does not match "
+                f"{side_cells} cells per side."
+            )
+        self.discretization = discretization
+        self.table = table
+
+    def ranking(self, battle: Battle, player: Player) -> np.ndarray:
+        """Produces the indices into ACTIONS of the cell's best Actions."""
+        discretization = self.discretization
+        return self.table[
+            discretization.side_cell(battle.actives[player]),
+            discretization.side_cell(battle.actives[player.opponent]),
+        ]
+
+    def request_action(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        for index in self.ranking(battle, player).tolist():
+            action = self.ACTIONS[index]
+            if action in choices:
+                return action
+        # Rankings are truncated, so none of the cell's Actions may be valid.
+        return choices[0]
+
+    def save(self, path: str):
+        """Writes the table and its discretization to a .npz file."""
+        discretization = self.discretization
+        np.savez_compressed(
+            path,
+            table=self.table,
+            species=np.array([species.name for species in discretization.species]),
+            hp_buckets=discretization.hp_buckets,
+            stats=np.array([int(stat) for stat in discretization.stats]),
+            levels=np.array(discretization.levels),
+            statuses=np.array([status.name for status in discretization.statuses]),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LookupTableAgent":
+        """Reads an agent written by save."""
+        with np.load(path) as data:
+            discretization = Discretization(
+                species=tuple(POKEDEX[name] for name in data["species"].tolist()),
+                hp_buckets=int(data["hp_buckets"]),
+                stats=tuple(ModifiableStat(stat) for stat in data["stats"].tolist()),
+                levels=tuple(data["levels"].tolist()),
+                statuses=tuple(Status[name] for name in data["statuses"].tolist()),
+            )
+            return cls(discretization, data["table"])
@@ -0,0 +1,339 @@
+"""A fast scripted agent that uses the move with the highest expected damage.
+
+Expected damage follows the engine: DamagingMove.damage_formula with the mean
+damage roll, weighted by the chance to hit and to land a critical hit, with
+the fixed-damage moves (Sonic Boom, Seismic Toss, Psywave, Super Fang, etc.)
+handled as the engine handles them. What decides each move's damage and
+each species' critical hit chances is kept in tables as they are first
+needed, so each decision is a handful of arithmetic operations per move.
+
+The agent switches when it is badly outmatched: when the opponent is expected
+to knock out its active Pokemon in far fewer hits than it needs in return,
+and a Pokemon on its bench would fare much better, even after taking a hit
+on the way in.
+"""
+
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+from simulator.agents.agent import Agent
+from simulator.battle.action import Action
+from simulator.battle.active_pokemon import ActivePokemon
+from simulator.battle.battle import Battle, Player
+from simulator.battle.battling_pokemon import BattlingPokemon
+from simulator.battle.deadline import Deadline
+from simulator.moves.damaging_move import (
+    ConstantDamageMove,
+    DamagingMove,
+    HighCriticalChanceDamagingMove,
+    LevelDamagingMove,
+)
+from simulator.moves.misc_moves import Psywave, SuperFang
+from simulator.moves.move import Move
+from simulator.pokemon.pokemon_species import PokemonSpecies
+
+# The mean of the engine's damage roll, randint(217, 255).
+_MEAN_ROLL = 236.0
+
+# How each kind of DamagingMove computes its damage.
+_FORMULA, _CONSTANT, _LEVEL, _PSYWAVE, _SUPER_FANG = range(5)
+
+
+class _MoveInfo:
+    """What decides a move's damage, read once from the move."""
+
+    __slots__ = ("kind", "power", "move_type", "physical", "high_critical", "accuracy")
+
+    def __init__(self, move: Move):
+        if isinstance(move, ConstantDamageMove):
+            self.kind = _CONSTANT
+        elif isinstance(move, LevelDamagingMove):
+            self.kind = _LEVEL
+        elif isinstance(move, Psywave):
+            self.kind = _PSYWAVE
+        elif isinstance(move, SuperFang):
+            self.kind = _SUPER_FANG
+        else:
+            self.kind = _FORMULA
+        self.power = move.power
+        self.move_type = move.move_type
+        self.physical = move.move_type.is_physical
+        self.high_critical = isinstance(move, HighCriticalChanceDamagingMove)
+        self.accuracy = move.accuracy
+
+
+# Precomputed tables, filled in as moves and species are first seen.
+_MOVE_INFO: Dict[Move, Optional[_MoveInfo]] = {}
+_CRITICAL_CHANCES: Dict[PokemonSpecies, Tuple[float, float, float, float]] = {}
+
+
+def _move_info(move: Move) -> Optional[_MoveInfo]:
+    """Produces what decides a move's damage, or None if it deals none."""
+    try:
+        return _MOVE_INFO[move]
+    except KeyError:
+        info = _MOVE_INFO[move] = (
+            _MoveInfo(move) if isinstance(move, DamagingMove) else None
+        )
+        return info
+
+
+def _critical_chances(species: PokemonSpecies) -> Tuple[float, float, float, float]:
+    """Produces the critical hit chances of a species' normal and high critical
+    hit ratio moves, without and with Focus Energy."""
+    try:
+        return _CRITICAL_CHANCES[species]
+    except KeyError:
+        chances = _CRITICAL_CHANCES[species] = tuple(
+            species.critical_hit_threshold(high, focus_energy) / 256
+            for focus_energy in (False, True)
+            for high in (False, True)
+        )
+        return chances
+
+
+class Combatant:
+    """The stats of a Pokemon that decide the damage it deals and takes.
+
+    Active Pokemon use their stat modifiers, accuracy and evasion, and Pokemon
+    on the bench their unmodified stats.
+    """
+
+    __slots__ = (
+        "species",
+        "types",
+        "level",
+        "hp",
+        "moves",
+        "pp",
+        "attack",
+        "defense",
+        "special",
+        "base_attack",
+        "base_defense",
+        "base_special",
+        "accuracy",
+        "evasion",
+        "critical_chances",
+    )
+
+    def __init__(
+        self, pokemon: BattlingPokemon, active: Optional[ActivePokemon] = None
+    ):
+        self.species = pokemon.species
+        self.types = self.species.types
+        self.level = pokemon.pokemon.level
+        self.hp = pokemon.hp
+        self.moves = pokemon.moves
+        self.pp = pokemon.pp
+        self.base_attack = pokemon.attack
+        self.base_defense = pokemon.defense
+        self.base_special = pokemon.special
+        chances = _critical_chances(self.species)
+        if active is None:
+            self.attack = self.base_attack
+            self.defense = self.base_defense
+            self.special = self.base_special
+            self.accuracy = self.evasion = 1.0
+            self.critical_chances = chances[:2]
+        else:
+            self.attack = active.attack
+            self.defense = active.defense
+            self.special = active.special
+            self.accuracy = active.accuracy_multiplier
+            self.evasion = active.evasion_multiplier
+            self.critical_chances = chances[2:] if active.focus_energy else chances[:2]
+
+
+def expected_damage(
+    move: Move,
+    attacker: Combatant,
+    defender: Combatant,
+    accuracy_checks: bool = True,
+    deterministic_damage: bool = False,
+) -> float:
+    """Produces the expected damage of a move, as the engine would deal it."""
+    move = _move_info(move)
+    if move is None:
+        return 0.0
+    kind = move.kind
+    if kind == _FORMULA:
+        effectiveness = defender.species.attack_effectiveness(move.move_type)
+        if effectiveness == 0:
+            return 0.0
+        stab = 1.5 if move.move_type in attacker.types else 1.0
+        roll = 255.0 if deterministic_damage else _MEAN_ROLL
+        if move.physical:
+            attack, defense = attacker.attack, defender.defense
+            base_attack, base_defense = attacker.base_attack, defender.base_defense
+        else:
+            attack, defense = attacker.special, defender.special
+            base_attack, base_defense = attacker.base_special, defender.base_special
+        damage = DamagingMove.damage_formula(
+            attacker.level, move.power, attack, defense, stab, effectiveness, roll
+        )
+        critical_chance = attacker.critical_chances[move.high_critical]
+        if critical_chance > 0:
+            critical_damage = DamagingMove.damage_formula(
+                2 * attacker.level,
+                move.power,
+                base_attack,
+                base_defense,
+                stab,
+                effectiveness,
+                roll,
+            )
+            damage += critical_chance * (critical_damage - damage)
+    elif kind == _CONSTANT:
+        damage = float(move.power)
+    elif kind == _LEVEL:
+        damage = float(attacker.level)
+    elif kind == _PSYWAVE:
+        damage = max(math.floor(1.5 * attacker.level - 1), 1) / 2
+    else:
+        damage = float(max(1, math.floor(defender.hp / 2)))
+    if move.accuracy is not None and accuracy_checks:
+        threshold = max(
+            0, min(255, move.accuracy * attacker.accuracy * defender.evasion)
+        )
+        damage *= threshold / 256
+    return damage
+
+
+class MaxDamageAgent(Agent):
+    """An agent using its highest expected damage move, switching if outmatched."""
+
+    def __init__(
+        self,
+        switch_ratio: float = 3.0,
+        switch_gain: float = 2.0,
+        seed: Optional[int] = None,
+    ):
+        """Sets up the agent.
+
+        Args:
+            switch_ratio: The active Pokemon is outmatched when it needs this
+              many times as many hits to knock out the opponent as the
+              opponent needs to knock it out.
+            switch_gain: An outmatched Pokemon is only switched out for one
+              whose ratio is this many times better.
+            seed: Seeds the choice between equally good moves.
+        """
+        self.switch_ratio = switch_ratio
+        self.switch_gain = switch_gain
+        self._random = random.Random(seed)
+
+    def reseed(self, seed: int):
+        self._random.seed(seed)
+
+    @staticmethod
+    def _best_damage(
+        attacker: Combatant, defender: Combatant, battle: Battle
+    ) -> Tuple[float, List[int]]:
+        """Produces the attacker's highest expected damage and the move slots
+        dealing it."""
+        ruleset = battle.ruleset
+        best, best_slots = 0.0, []
+        for slot, (move, pp) in enumerate(zip(attacker.moves, attacker.pp)):
+            if pp == 0 and ruleset.use_pp:
+                continue
+            damage = expected_damage(
+                move,
+                attacker,
+                defender,
+                ruleset.accuracy_checks,
+                ruleset.deterministic_damage,
+            )
+            # Damage beyond a knock out is worth nothing.
+            damage = min(damage, defender.hp)
+            if not best_slots or damage > best:
+                best, best_slots = damage, [slot]
+            elif damage == best:
+                best_slots.append(slot)
+        return best, best_slots
+
+    @staticmethod
+    def _hits_ratio(
+        my_damage: float, their_damage: float, my_hp: float, their_hp: float
+    ) -> float:
+        """Produces the hits one side needs to knock out the other, per hit of
+        the other's."""
+        if their_damage <= 0:
+            return 0.0
+        if my_damage <= 0:
+            return math.inf
+        return math.ceil(their_hp / my_damage) / max(math.ceil(my_hp / their_damage), 1)
+
+    def _best_switch(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        theirs: Combatant,
+        incoming_hit: bool,
+    ) -> Tuple[Optional[Action], float]:
+        """Finds the bench Pokemon with the best hits ratio against the opponent.
+
+        Args:
+            theirs: The opponent's active Pokemon.
+            incoming_hit: Whether the new Pokemon takes a hit as it comes in.
+        """
+        best, best_ratio = None, math.inf
+        for action in choices:
+            if not action.is_switch:
+                continue
+            mine = Combatant(battle.teams[player][action.switch_slot])
+            their_damage, _ = self._best_damage(theirs, mine, battle)
+            hp = mine.hp - their_damage if incoming_hit else mine.hp
+            if hp <= 0:
+                continue
+            my_damage, _ = self._best_damage(mine, theirs, battle)
+            ratio = self._hits_ratio(my_damage, their_damage, hp, theirs.hp)
+            if ratio < best_ratio:
+                best, best_ratio = action, ratio
+        return best, best_ratio
+
+    def request_switch(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        opponent = battle.actives[player.opponent]
+        theirs = Combatant(opponent.pokemon, opponent)
+        best, _ = self._best_switch(battle, player, choices, theirs, False)
+        return choices[0] if best is None else best
+
+    def request_action(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        active = battle.actives[player]
+        opponent = battle.actives[player.opponent]
+        mine = Combatant(active.pokemon, active)
+        theirs = Combatant(opponent.pokemon, opponent)
+
+        my_damage, slots = self._best_damage(mine, theirs, battle)
+        their_damage, _ = self._best_damage(theirs, mine, battle)
+        ratio = self._hits_ratio(my_damage, their_damage, mine.hp, theirs.hp)
+        if ratio >= self.switch_ratio:
+            switch, switch_ratio = self._best_switch(
+                battle, player, choices, theirs, True
+            )
+            if switch is not None and switch_ratio * self.switch_gain <= ratio:
+                return switch
+
+        moves = [action for action in choices if not action.is_switch]
+        best_moves = [Action(slot) for slot in slots if Action(slot) in moves]
+        if best_moves:
+            return self._random.choice(best_moves)
+        if moves:
+            return self._random.choice(moves)
+        return self._random.choice(choices)
@@ -0,0 +1,364 @@
+"""A Monte Carlo tree search agent for the simultaneous-move battle.
+
+Each turn both players choose at once, so the tree uses decoupled UCT: every
+node keeps separate visit counts and values for each player's Actions, and
+each player's Action is selected by UCB1 over its own statistics. A node's
+children are keyed by the joint decision taken from it. The tree is open loop,
+since damage rolls, crits and accuracy make the same decisions lead to
+different states: every iteration replays its decisions on a fresh clone of
+the root battle, so node statistics average over the chance outcomes.
+
+Playouts are cheap: both players use random moves, switching only when forced,
+for a limited number of decisions, after which the battle is scored by the
+remaining HP of each team.
+
+The search is root parallel. With several workers, each worker process grows
+its own tree from the same root for the whole time budget, and the root visit
+counts of every tree are summed to decide. Trees are kept between decisions:
+when the agent is asked again in the same battle, each tree is moved down to
+the node reached by the decisions taken since, instead of being rebuilt.
+"""
+
+import math
+import multiprocessing
+import random
+import time
+import weakref
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional, Tuple
+
+from simulator.agents.agent import Agent
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player, Result
+from simulator.battle.deadline import Deadline
+
+JointAction = Tuple[Optional[Action], Optional[Action]]
+# An Action's number of visits and total value at the root.
+RootStats = Dict[Action, Tuple[int, float]]
+
+_PLAYERS = tuple(Player)
+
+
+class _Node:
+    """A node of the search tree, with decoupled statistics for each player."""
+
+    __slots__ = ("visits", "stats", "children")
+
+    def __init__(self):
+        self.visits = 0
+        # Each player's [visits, total value] for each of its Actions.
+        self.stats: Tuple[Dict[Action, List[float]], Dict[Action, List[float]]] = (
+            {},
+            {},
+        )
+        self.children: Dict[JointAction, "_Node"] = {}
+
+
+def evaluate(battle: Battle) -> float:
+    """Scores a battle for P1, from 0 for a loss to 1 for a win.
+
+    Unfinished battles are scored by the share of each team's total HP left.
+    """
+    if battle.result is not None:
+        if battle.result == Result.DRAW:
+            return 0.5
+        return 1.0 if battle.result == Result.P1_WIN else 0.0
+    if battle.finished:
+        return 0.5
+    shares = [
+        sum(pokemon.hp for pokemon in team) / sum(pokemon.max_hp for pokemon in team)
+        for team in battle.teams
+    ]
+    return 0.5 + 0.5 * (shares[Player.P1] - shares[Player.P2])
+
+
+def rollout(battle: Battle, depth: int) -> float:
+    """Plays a battle forward with random moves, and scores the result for P1.
+
+    Args:
+        battle: The battle to play forward, which is modified.
+        depth: The number of decisions to play before scoring.
+    """
+    for _ in range(depth):
+        if battle.finished:
+            break
+        joint: List[Optional[Action]] = [None, None]
+        for player in _PLAYERS:
+            choices = battle.choices(player)
+            if choices:
+                moves = [choice for choice in choices if not choice.is_switch]
+                joint[player] = random.choice(moves or choices)
+        battle.advance(joint[Player.P1], joint[Player.P2])
+    return evaluate(battle)
+
+
+class _Searcher:
+    """Grows one search tree, keeping it across decisions in the same battle."""
+
+    def __init__(self, exploration: float, rollout_depth: int):
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.root: Optional[_Node] = None
+        self.token: Optional[int] = None
+
+    def _select(self, node: _Node, player: Player, choices: List[Action]) -> Action:
+        stats = node.stats[player]
+        unvisited = [choice for choice in choices if choice not in stats]
+        if unvisited:
+            return random.choice(unvisited)
+        log_visits = math.log(node.visits)
+        best_choice = choices[0]
+        best_score = -math.inf
+        for choice in choices:
+            visits, value = stats[choice]
+            score = value / visits + self.exploration * math.sqrt(log_visits / visits)
+            if score > best_score:
+                best_choice, best_score = choice, score
+        return best_choice
+
+    def _iterate(self, root_state: Battle):
+        state = root_state.clone()
+        node = self.root
+        path: List[Tuple[_Node, List[Optional[Action]]]] = []
+        while not state.finished:
+            joint: List[Optional[Action]] = [None, None]
+            for player in _PLAYERS:
+                choices = state.choices(player)
+                if choices:
+                    joint[player] = self._select(node, player, choices)
+            path.append((node, joint))
+            state.advance(joint[Player.P1], joint[Player.P2])
+            key = (joint[Player.P1], joint[Player.P2])
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _Node()
+                node = child
+                break
+            node = child
+
+        value = rollout(state, self.rollout_depth)
+        node.visits += 1
+        for node, joint in path:
+            node.visits += 1
+            for player, action in zip(_PLAYERS, joint):
+                if action is None:
+                    continue
+                stats = node.stats[player].setdefault(action, [0, 0.0])
+                stats[0] += 1
+                stats[1] += value if player == Player.P1 else 1.0 - value
+
+    def search(
+        self,
+        token: int,
+        state: Battle,
+        decisions: List[JointAction],
+        player: Player,
+        seconds: float,
+        iterations: Optional[int],
+        seed: int,
+    ) -> RootStats:
+        """Searches from a battle state, and produces the player's root stats.
+
+        Args:
+            token: Identifies the battle. The tree is only reused when it is
+              the same as in the previous search.
+            state: The battle to search from, which is not modified.
+            decisions: The decisions taken since the previous search.
+            player: The player whose decision is being searched for.
+            seconds: How long to search for.
+            iterations: The most iterations to run, if limited.
+            seed: Seeds the random rolls of the search.
+        """
+        if token != self.token or self.root is None:
+            self.root = _Node()
+        else:
+            for decision in decisions:
+                child = self.root.children.get(decision)
+                self.root = _Node() if child is None else child
+                if child is None:
+                    break
+        self.token = token
+
+        random_state = random.getstate()
+        random.seed(seed)
+        try:
+            stop = time.perf_counter() + seconds
+            done = 0
+            while iterations is None or done < iterations:
+                self._iterate(state)
+                done += 1
+                if time.perf_counter() >= stop:
+                    break
+        finally:
+            random.setstate(random_state)
+        return {
+            action: (int(visits), value)
+            for action, (visits, value) in self.root.stats[player].items()
+        }
+
+
+def _serve(connection: Connection, exploration: float, rollout_depth: int):
+    searcher = _Searcher(exploration, rollout_depth)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        connection.send(searcher.search(*request))
+
+
+class MCTSAgent(Agent):
+    """An agent choosing by decoupled UCT search within each decision's budget."""
+
+    def __init__(
+        self,
+        seconds: float = 0.05,
+        workers: int = 1,
+        iterations: Optional[int] = None,
+        exploration: float = 0.7,
+        rollout_depth: int = 4,
+        seed: Optional[int] = None,
+    ):
+        """Sets up the agent. Worker processes are only started when needed.
+
+        Args:
+            seconds: The time spent searching each decision. The battle's
+              deadline, if it is sooner, takes precedence.
+            workers: The number of root-parallel search processes. With 1, the
+              search runs in the calling process, which is required inside
+              daemonic processes such as those of a multiprocessing.Pool.
+            iterations: If given, the most iterations per decision, split
+              evenly between the workers, e.g. for reproducible play.
+            exploration: The UCB1 exploration constant.
+            rollout_depth: The number of decisions each playout plays.
+            seed: Seeds the agent's searches.
+        """
+        self._processes: List[multiprocessing.Process] = []
+        self._connections: List[Connection] = []
+        if workers < 1:
+            raise ValueError("An MCTSAgent needs at least one worker.")
+        self.seconds = seconds
+        self.workers = workers
+        self.iterations = iterations
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self._random = random.Random(seed)
+
+        self._searcher: Optional[_Searcher] = None
+
+        self._battle: Optional[weakref.ref] = None
+        self._token = 0
+        self._decisions_seen = 0
+
+    def __del__(self):
+        self.close()
+
+    def reseed(self, seed: int):
+        self._random.seed(seed)
+
+    def close(self):
+        """Stops the agent's worker processes, if they were started."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+        for process in self._processes:
+            process.join(1)
+        self._processes, self._connections = [], []
+
+    def _start_workers(self):
+        for _ in range(self.workers):
+            connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_serve,
+                args=(child_connection, self.exploration, self.rollout_depth),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+            self._connections.append(connection)
+
+    def _new_decisions(self, battle: Battle) -> List[JointAction]:
+        """Produces the decisions taken since the last search of this battle."""
+        if self._battle is None or self._battle() is not battle:
+            self._battle = weakref.ref(battle)
+            self._token += 1
+            self._decisions_seen = 0
+        decisions = battle.history[self._decisions_seen :]
+        self._decisions_seen = len(battle.history)
+        return decisions
+
+    def _budget(self, deadline: Optional[Deadline]) -> float:
+        if deadline is None:
+            return self.seconds
+        # Leave a margin for merging the results and returning them.
+        return min(self.seconds, deadline.remaining() * 0.8)
+
+    def root_stats(
+        self, battle: Battle, player: Player, deadline: Optional[Deadline] = None
+    ) -> RootStats:
+        """Searches the battle's next decision, and merges every worker's stats.
+
+        Returns:
+            The player's visit count and total value for each Action searched.
+        """
+        decisions = self._new_decisions(battle)
+        seconds = self._budget(deadline)
+        iterations = (
+            None
+            if self.iterations is None
+            else max(1, math.ceil(self.iterations / self.workers))
+        )
+
+        if self.workers == 1:
+            if self._searcher is None:
+                self._searcher = _Searcher(self.exploration, self.rollout_depth)
+            return self._searcher.search(
+                self._token,
+                battle,
+                decisions,
+                player,
+                seconds,
+                iterations,
+                self._random.getrandbits(64),
+            )
+
+        if not self._processes:
+            self._start_workers()
+        state = battle.clone()
+        state.agents = (None, None)
+        state.fallback_agent = None
+        for connection in self._connections:
+            connection.send(
+                (
+                    self._token,
+                    state,
+                    decisions,
+                    player,
+                    seconds,
+                    iterations,
+                    self._random.getrandbits(64),
+                )
+            )
+        merged: Dict[Action, List[float]] = {}
+        for connection in self._connections:
+            for action, (visits, value) in connection.recv().items():
+                totals = merged.setdefault(action, [0, 0.0])
+                totals[0] += visits
+                totals[1] += value
+        return {
+            action: (int(visits), value) for action, (visits, value) in merged.items()
+        }
+
+    def request_action(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        if len(choices) == 1:
+            return choices[0]
+        stats = self.root_stats(battle, player, deadline)
+        return max(choices, key=lambda choice: stats.get(choice, (0, 0.0)))
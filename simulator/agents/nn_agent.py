@@ -1,24 +1,59 @@
 """Functionality for an Agent that interfaces with a neural network."""
 
 from abc import ABCMeta, abstractmethod
-from typing import List
+from typing import TYPE_CHECKING, List, Optional, Sequence
 
 from simulator.agents.agent import Agent, NoValidActionsException
 from simulator.battle.action import Action
 from simulator.battle.battle import Battle, Player
+from simulator.battle.deadline import Deadline
+
+if TYPE_CHECKING:
+    from simulator.agents.decision_cache import DecisionCache
+    from simulator.agents.inference_broker import InferenceBroker
 
 
 class NeuralNetworkAgent(Agent, metaclass=ABCMeta):
-    """An Agent whose decisions are made by a neural network."""
+    """An Agent whose decisions are made by a neural network.
+
+    If broker is set to an InferenceBroker for the same network, evaluations
+    are sent to it to be batched with those of other concurrent battles, and
+    request_action_async awaits them without blocking the event loop.
+
+    If decision_cache is set to a DecisionCache, rankings are cached by the
+    observation they rank, which is only correct for agents whose network is
+    deterministic and does not change while the cache is in use.
+    """
+
+    broker: Optional["InferenceBroker"] = None
+    decision_cache: Optional["DecisionCache"] = None
 
     def request_action(
-        self, battle: Battle, player: Player, choices: List[Action]
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
     ) -> Action:
         for action in self.rank_actions(battle, player):
             if action in choices:
                 return action
         raise NoValidActionsException()
 
+    async def request_action_async(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        for action in await self.rank_actions_async(battle, player):
+            if action in choices:
+                return action
+        raise NoValidActionsException()
+
     @abstractmethod
     def evaluate_network(self, input_vector: List[float]) -> List[float]:
         """Ranks available actions using neural network.
@@ -54,7 +89,39 @@ class NeuralNetworkAgent(Agent, metaclass=ABCMeta):
         Returns:
             A ranked copy of ACTIONS, from most preferred to least preferred.
         """
-        output = self.evaluate_network(self.vectorize_battle(battle, player))
+        input_vector = self.vectorize_battle(battle, player)
+        cache = self.decision_cache
+        if cache is not None:
+            key = cache.key(input_vector)
+            ranking = cache.get(key)
+            if ranking is not None:
+                return ranking
+        if self.broker is None:
+            output = self.evaluate_network(input_vector)
+        else:
+            output = self.broker.evaluate(input_vector)
+        ranking = self._rank(output)
+        if cache is not None:
+            cache.put(key, ranking)
+        return ranking
+
+    async def rank_actions_async(self, battle: Battle, player: Player) -> List[Action]:
+        """Ranks ACTIONS like rank_actions, awaiting the broker if there is one."""
+        if self.broker is None:
+            return self.rank_actions(battle, player)
+        input_vector = self.vectorize_battle(battle, player)
+        cache = self.decision_cache
+        if cache is not None:
+            key = cache.key(input_vector)
+            ranking = cache.get(key)
+            if ranking is not None:
+                return ranking
+        ranking = self._rank(await self.broker.evaluate_async(input_vector))
+        if cache is not None:
+            cache.put(key, ranking)
+        return ranking
+
+    def _rank(self, output: Sequence[float]) -> List[Action]:
         assert len(output) == 10
 
         actions = self.ACTIONS.copy()
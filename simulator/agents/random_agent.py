@@ -1,17 +1,23 @@
 """An agent that makes random moves, for testing purposes."""
 
 import random
-from typing import List
+from typing import List, Optional
 
 from simulator.agents.agent import Agent
 from simulator.battle.action import Action
 from simulator.battle.battle import Battle, Player
+from simulator.battle.deadline import Deadline
 
 
 class RandomAgent(Agent):
     """An agent that randomly selects an action each turn."""
 
     def request_action(
-        self, battle: Battle, player: Player, choices: List[Action]
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
     ) -> Action:
         return random.choice(choices)
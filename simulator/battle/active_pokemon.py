@@ -1,10 +1,12 @@
 """Functionality for the Pokemon in a battle that is currently active."""
 
 import random
-from typing import TYPE_CHECKING, List, Optional
+from array import array
+from typing import TYPE_CHECKING, Hashable, List, Optional, Sequence
 
+from simulator.battle.battle_view import SideView
 from simulator.battle.battling_pokemon import BattlingPokemon
-from simulator.dex.movedex import MOVEDEX
+from simulator.dex import movedex
 from simulator.modifiable_stat import ModifiableStat
 from simulator.moves.move import Move
 from simulator.pokemon.party_pokemon import PartyPokemon
@@ -26,7 +28,10 @@ class ActivePokemon:
 
     def __init__(self, pokemon: BattlingPokemon):
         self._pokemon = pokemon
-        self._stat_modifiers = [0 for _ in range(6)]
+        pokemon.revealed = True
+        # An array, so that it can be read without copying (see
+        # stat_modifiers_view).
+        self._stat_modifiers = array("b", [0 for _ in range(6)])
         self.confused = False
         self.leech_seed = False
         self.toxic_counter: Optional[int] = None
@@ -39,6 +44,64 @@ class ActivePokemon:
     def __str__(self):
         return str(self.pokemon)
 
+    def clone(self, pokemon: BattlingPokemon) -> "ActivePokemon":
+        """Copies this Pokemon's volatile state onto another BattlingPokemon."""
+        clone = ActivePokemon.__new__(ActivePokemon)
+        clone.__dict__.update(self.__dict__)
+        clone._pokemon = pokemon
+        clone._stat_modifiers = self._stat_modifiers[:]
+        return clone
+
+    def view(
+        self, active_slot: int, team: Sequence[BattlingPokemon], seen_only: bool = False
+    ) -> SideView:
+        """Copies the state of this Pokemon's side.
+
+        Args:
+            active_slot: This Pokemon's team slot.
+            team: The side's team.
+            seen_only: Whether to copy only what the opponent has seen.
+        """
+        team_view = tuple(
+            [
+                member.view(seen_only) if member.revealed or not seen_only else None
+                for member in team
+            ]
+        )
+        # The active Pokemon has been sent out, so its MemberView is present.
+        member = team_view[active_slot]
+        return SideView(
+            active_slot,
+            member.species,
+            member.hp,
+            member.max_hp,
+            member.status,
+            member.moves,
+            member.pp,
+            tuple(self._stat_modifiers),
+            self.confused,
+            self.leech_seed,
+            self.toxic_counter is not None,
+            self.reflect,
+            self.light_screen,
+            self.focus_energy,
+            self.mist,
+            team_view,
+        )
+
+    def state_key(self) -> Hashable:
+        return (
+            tuple(self._stat_modifiers),
+            self.confused,
+            self.leech_seed,
+            self.toxic_counter,
+            self.reflect,
+            self.light_screen,
+            self.focus_energy,
+            self.mist,
+            self.flinch,
+        )
+
     @property
     def species(self) -> PokemonSpecies:
         return self.pokemon.species
@@ -61,7 +124,12 @@ class ActivePokemon:
 
     @property
     def stat_modifiers(self) -> List[int]:
-        return self._stat_modifiers.copy()
+        return self._stat_modifiers.tolist()
+
+    @property
+    def stat_modifiers_view(self) -> memoryview:
+        """A read-only view of the stat modifiers, without copying."""
+        return memoryview(self._stat_modifiers).toreadonly()
 
     @property
     def hp(self) -> int:
@@ -141,7 +209,7 @@ class ActivePokemon:
         return self.pokemon.knocked_out
 
     @property
-    def pp(self) -> List[int]:
+    def pp(self) -> "array[int]":
         return self.pokemon.pp
 
     @staticmethod
@@ -243,11 +311,12 @@ class ActivePokemon:
         if self.pp[move_index] == 0:
             if log is not None:
                 log.log(f"{player}'s {self} is out of PP and used Struggle.")
-            MOVEDEX["Struggle"].execute(self, target)
+            movedex.MOVEDEX["Struggle"].execute(self, target)
         else:
             if self.battle.ruleset.use_pp:
                 self.decrement_pp(move_index)
             move = self.moves[move_index]
+            self._pokemon.revealed_moves |= 1 << move_index
             if log is not None:
                 log.log(f"{player}'s {self} used {move}")
             move.execute(self, target)
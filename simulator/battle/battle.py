@@ -2,14 +2,27 @@
 
 import random
 from enum import Enum, IntEnum, auto
-from typing import TYPE_CHECKING, List, Optional, Tuple
-
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import simulator.ruleset
 from simulator.battle.action import Action
 from simulator.battle.active_pokemon import ActivePokemon
+from simulator.battle.battle_view import BattleView
 from simulator.battle.battling_pokemon import BattlingPokemon
+from simulator.battle.deadline import Deadline
 from simulator.battle_log import BattleLog
 from simulator.pokemon.party_pokemon import PartyPokemon
-from simulator.ruleset import FULL_RULESET, Ruleset
+from simulator.pokemon.team import Team
+from simulator.ruleset import Ruleset
 
 if TYPE_CHECKING:
     from simulator.agents.agent import Agent
@@ -40,23 +53,55 @@ class Result(Enum):
         return Player.P1 if self == Result.P1_WIN else Player.P2
 
 
+# Enums are slow to iterate, and these are iterated for every decision.
+_PLAYERS = tuple(Player)
+_ACTIONS = tuple(Action)
+_SWITCHES = tuple(action for action in Action if action.is_switch)
+
+
 class Battle:
     """A Pokemon battle with all state information for both teams"""
 
     def __init__(
         self,
-        team_one: List[PartyPokemon],
-        team_two: List[PartyPokemon],
+        team_one: Union[Team, List[PartyPokemon]],
+        team_two: Union[Team, List[PartyPokemon]],
         agent_one: "Agent",
         agent_two: "Agent",
-        ruleset: Ruleset = FULL_RULESET,
+        ruleset: Optional[Ruleset] = None,
+        decision_time_limit: Optional[float] = None,
+        fallback_agent: Optional["Agent"] = None,
     ):
+        """Sets up a battle between two teams.
 
+        Args:
+            team_one: P1's team. Passing a Team lets its validity under the
+              ruleset be checked only once across many battles.
+            team_two: P2's team.
+            agent_one: The Agent controlling P1.
+            agent_two: The Agent controlling P2.
+            ruleset: The rules the battle is played under. Defaults to
+              FULL_RULESET.
+            decision_time_limit: Seconds each agent has per decision. Overrides
+              the ruleset's limit if given.
+            fallback_agent: Decides for agents that run out of time. If None,
+              the first available choice is taken instead.
+        """
+
+        if ruleset is None:
+            ruleset = simulator.ruleset.FULL_RULESET
         self.ruleset = ruleset
+        self.decision_time_limit = (
+            ruleset.decision_time_limit
+            if decision_time_limit is None
+            else decision_time_limit
+        )
+        self.fallback_agent = fallback_agent
+        self.timeouts: List[int] = [0, 0]
 
         if not self.ruleset.team_is_valid(team_one):
             raise ValueError(f"{team_one} is not a valid team for this ruleset.")
-        if not self.ruleset.team_is_valid(team_one):
+        if not self.ruleset.team_is_valid(team_two):
             raise ValueError(f"{team_two} is not a valid team for this ruleset.")
 
         self.teams: Tuple[List[BattlingPokemon], List[BattlingPokemon]] = (
@@ -74,18 +119,82 @@ class Battle:
             [False for _ in range(10)],
             [False for _ in range(10)],
         )
-        for i in range(len(self.p1_active_pokemon.moves)):
-            self._valid_actions[Player.P1][i] = True
-        for i in range(len(self.p2_active_pokemon.moves)):
-            self._valid_actions[Player.P2][i] = True
-        for i in range(len(self.p1_team)):
-            self._valid_actions[Player.P1][i + 6] = self.team_cursors[Player.P1] != i
-        for i in range(len(self.p2_team)):
-            self._valid_actions[Player.P2][i + 6] = self.team_cursors[Player.P2] != i
+        for player in Player:
+            self._refresh_move_actions(player)
+            for i in range(len(self.teams[player])):
+                self._valid_actions[player][Action.SWITCH_1 + i] = (
+                    self.team_cursors[player] != i
+                )
 
         self._turn = 0
+        # Whether the current turn has been counted but not yet resolved, as
+        # while play asks the agents for their actions.
+        self._turn_started = False
         self.result: Optional[Result] = None
         self.log: Optional[BattleLog] = None
+        # Every decision taken so far, as (P1's, P2's) Actions. A replacement
+        # switch after a knock out is its own entry, with None for the other
+        # player.
+        self.history: List[Tuple[Optional[Action], Optional[Action]]] = []
+
+    def view(self, player: Player) -> BattleView:
+        """Copies what a player can see of the battle into a read-only view."""
+        opponent = player.opponent
+        return BattleView(
+            player,
+            self._turn,
+            self.finished,
+            tuple(self.choices(player)),
+            self.actives[player].view(self.team_cursors[player], self.teams[player]),
+            self.actives[opponent].view(
+                self.team_cursors[opponent], self.teams[opponent], seen_only=True
+            ),
+        )
+
+    def clone(self) -> "Battle":
+        """Copies the battle's state, e.g. for an agent to search from.
+
+        The clone shares this battle's PartyPokemon, ruleset and agents, which
+        are never modified during a battle, and copies everything else. It has
+        no log and an empty history, and can be played forward with advance
+        without affecting this battle.
+        """
+        clone = type(self).__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.timeouts = self.timeouts.copy()
+        clone.teams = (
+            [pokemon.clone(clone) for pokemon in self.teams[Player.P1]],
+            [pokemon.clone(clone) for pokemon in self.teams[Player.P2]],
+        )
+        clone.team_cursors = self.team_cursors.copy()
+        clone.actives = [
+            self.actives[player].clone(clone.teams[player][self.team_cursors[player]])
+            for player in Player
+        ]
+        clone._valid_actions = (
+            self._valid_actions[Player.P1].copy(),
+            self._valid_actions[Player.P2].copy(),
+        )
+        clone.log = None
+        clone.history = []
+        return clone
+
+    def state_key(self) -> Hashable:
+        """Produces a hashable key of everything that decides how the battle goes on.
+
+        Battles between the same teams and with equal keys behave identically,
+        so the key can index a transposition table. The log and history are
+        not part of it.
+        """
+        return (
+            self._turn - self._turn_started,
+            self.result,
+            tuple(self.team_cursors),
+            tuple(self._valid_actions[Player.P1]),
+            tuple(self._valid_actions[Player.P2]),
+            tuple(pokemon.state_key() for team in self.teams for pokemon in team),
+            tuple(active.state_key() for active in self.actives),
+        )
 
     @property
     def p1_agent(self) -> "Agent":
@@ -117,20 +226,194 @@ class Battle:
 
     def increment_turn(self):
         self._turn += 1
+        self._turn_started = True
         if self.log is not None:
             self.log.advance_turn()
 
+    def _switch_choices(self, player: Player) -> List[Action]:
+        valid_actions = self._valid_actions[player]
+        return [s for s in _SWITCHES if valid_actions[s]]
+
+    def _action_choices(self, player: Player) -> List[Action]:
+        valid_actions = self._valid_actions[player]
+        return [a for a in _ACTIONS if valid_actions[a]]
+
+    def _new_deadline(self) -> Optional[Deadline]:
+        if self.decision_time_limit is None:
+            return None
+        return Deadline(self.decision_time_limit)
+
+    def _time_out(self, player: Player, choices: List[Action], switch: bool) -> Action:
+        """Records that the player ran out of time and decides on its behalf.
+
+        Args:
+            player: The Player who ran out of time.
+            choices: The possible Actions for the player.
+            switch: Whether the pending decision is a switch.
+
+        Returns:
+            The fallback agent's choice, or the first choice if there is none.
+        """
+        self.timeouts[player] += 1
+        if self.log is not None:
+            self.log.log(f"{player} ran out of time.")
+        if self.fallback_agent is None:
+            return choices[0]
+        if switch:
+            return self.fallback_agent.request_switch(self, player, choices)
+        return self.fallback_agent.request_action(self, player, choices)
+
+    def _request(self, player: Player, choices: List[Action], switch: bool) -> Action:
+        """Asks the player's agent to choose, enforcing the decision deadline.
+
+        Synchronous agents cannot be interrupted, so an agent that overruns its
+        deadline has its choice discarded in favour of the fallback once it
+        returns. Anytime agents should poll the deadline they are given.
+        """
+        agent = self.agents[player]
+        deadline = self._new_deadline()
+        if switch:
+            choice = agent.request_switch(self, player, choices, deadline=deadline)
+        else:
+            choice = agent.request_action(self, player, choices, deadline=deadline)
+        if deadline is not None and deadline.expired:
+            choice = self._time_out(player, choices, switch)
+        assert self._valid_actions[player][choice]
+        return choice
+
+    async def _request_async(
+        self, player: Player, choices: List[Action], switch: bool
+    ) -> Action:
+        """Awaits the player's agent's choice, cancelling it at the deadline.
+
+        Blocking agents (e.g. synchronous ones) cannot be interrupted, so a
+        choice returned after the deadline is discarded in favour of the
+        fallback, as in _request. An agent that fails instead raises its
+        exception, even after the deadline.
+        """
+        # asyncio is slow to import, and most battles are played synchronously.
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        agent = self.agents[player]
+
+        def request(deadline: Optional[Deadline]) -> Awaitable[Action]:
+            if switch:
+                return agent.request_switch_async(
+                    self, player, choices, deadline=deadline
+                )
+            return agent.request_action_async(self, player, choices, deadline=deadline)
+
+        if self.decision_time_limit is None:
+            choice = await request(None)
+            assert self._valid_actions[player][choice]
+            return choice
+
+        deadline: Optional[Deadline] = None
+
+        async def timed_request() -> Action:
+            nonlocal deadline
+            # The budget starts when the request starts running, so an agent
+            # is not charged for another agent blocking the event loop.
+            deadline = self._new_deadline()
+            return await request(deadline)
+
+        task = asyncio.ensure_future(timed_request())
+        try:
+            while not task.done():
+                budget = self.decision_time_limit
+                await asyncio.wait(
+                    {task}, timeout=budget if deadline is None else deadline.remaining()
+                )
+                if not task.done() and deadline is not None and deadline.expired:
+                    task.cancel()
+                    break
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if task.done() and not task.cancelled() and task.exception() is not None:
+            # An error, e.g. a ForfeitException, is not hidden by the fallback.
+            raise task.exception()
+        if task.cancelled() or deadline.expired:
+            choice = self._time_out(player, choices, switch)
+        else:
+            choice = task.result()
+        assert self._valid_actions[player][choice]
+        return choice
+
     def request_switch(self, player: Player) -> Action:
-        choices = [s for s in Action if s.is_switch and self._valid_actions[player][s]]
-        switch = self.agents[player].request_switch(self, player, choices)
-        assert self._valid_actions[player][switch]
-        return switch
+        return self._request(player, self._switch_choices(player), True)
 
     def request_action(self, player: Player) -> Action:
-        choices = [a for a in Action if self._valid_actions[player][a]]
-        action = self.agents[player].request_action(self, player, choices)
-        assert self._valid_actions[player][action]
-        return action
+        return self._request(player, self._action_choices(player), False)
+
+    async def request_switch_async(self, player: Player) -> Action:
+        return await self._request_async(player, self._switch_choices(player), True)
+
+    async def request_action_async(self, player: Player) -> Action:
+        return await self._request_async(player, self._action_choices(player), False)
+
+    @property
+    def finished(self) -> bool:
+        """Whether the battle is over, as play would find it.
+
+        A battle is over once it has a result, or once its last allowed turn
+        has been resolved and any knocked out Pokemon replaced.
+        """
+        if self.result is not None:
+            return True
+        return not (
+            self._turn_started or self._under_turn_max() or self.pending_switches()
+        )
+
+    def pending_switches(self) -> List[Player]:
+        """Produces the players who must replace a knocked out Pokemon, in order."""
+        if self.result is not None:
+            return []
+        return [player for player in _PLAYERS if self.actives[player].knocked_out]
+
+    def choices(self, player: Player) -> List[Action]:
+        """Produces the player's choices for the battle's next decision.
+
+        The next decision is the first pending switch, if there is one, and
+        otherwise both players' actions for the next turn.
+
+        Returns:
+            The valid Actions, or an empty list if the player is not deciding.
+        """
+        if self.finished:
+            return []
+        pending = self.pending_switches()
+        if not pending:
+            return self._action_choices(player)
+        if pending[0] == player:
+            return self._switch_choices(player)
+        return []
+
+    def advance(self, p1_action: Optional[Action], p2_action: Optional[Action]):
+        """Plays the battle's next decision without consulting its agents.
+
+        Together with clone and choices, this lets a battle be stepped through
+        one decision at a time, e.g. by a search agent or an environment. A
+        turn that play has already counted, while asking the agents for their
+        actions, is not counted again.
+
+        Args:
+            p1_action: P1's choice, or None if P1 is not deciding.
+            p2_action: P2's choice, or None if P2 is not deciding.
+        """
+        pending = self.pending_switches()
+        if pending:
+            player = pending[0]
+            self._execute_switch(player, (p1_action, p2_action)[player])
+        else:
+            if not self._turn_started:
+                self.increment_turn()
+            self._resolve_turn(p1_action, p2_action)
+        self.history.append((p1_action, p2_action))
+
+    def _record_switch(self, player: Player, action: Action):
+        self._execute_switch(player, action)
+        self.history.append((action, None) if player == Player.P1 else (None, action))
 
     def _execute_switch(self, player: Player, action: Action):
         """Executes the given player's pending switch.
@@ -146,15 +429,27 @@ class Battle:
         self.team_cursors[player] = slot
 
         if not self.actives[player].knocked_out:
-            self._valid_actions[player][old_slot + 6] = True
-        self._valid_actions[player][slot + 6] = False
+            self._valid_actions[player][Action.SWITCH_1 + old_slot] = True
+        self._valid_actions[player][Action.SWITCH_1 + slot] = False
 
         self.actives[player] = ActivePokemon(self.teams[player][slot])
         if self.log is not None:
             self.log.log(f"{player} sent in {self.actives[player]}")
 
-        for i in range(len(self.actives[player].moves)):
-            self._valid_actions[Player.P1][i] = True
+        self._refresh_move_actions(player)
+
+    def _refresh_move_actions(self, player: Player):
+        """Enables exactly the player's active Pokemon's moves that have PP left.
+
+        If none do, the first move is left enabled, and using it will Struggle.
+        """
+        active_pokemon = self.actives[player]
+        for i in range(Action.SWITCH_1):
+            self._valid_actions[player][i] = (
+                i < len(active_pokemon.moves) and active_pokemon.pp[i] > 0
+            )
+        if not any(self._valid_actions[player][: Action.SWITCH_1]):
+            self._valid_actions[player][Action.MOVE_1] = True
 
     def _execute_action(self, player: Player, action: Action):
         """Executes the given player's pending action.
@@ -171,7 +466,7 @@ class Battle:
         else:
             active_pokemon.use_move(action.move_slot)
             if active_pokemon.pp[action.move_slot] == 0:
-                self._valid_actions[player][action] = False
+                self._refresh_move_actions(player)
 
     def _first_to_move(self, p1_action: Action, p2_action: Action) -> Player:
         """Determines which player should move first in the coming turn.
@@ -246,34 +541,78 @@ class Battle:
         elif p2_eliminated:
             self.result = Result.P1_WIN
 
-    def play_turn(self):
-        """Plays out one turn of the battle."""
+    def forfeit(self, player: Player):
+        """Ends the battle immediately as a loss for the given player.
 
-        p1_action = self.request_action(Player.P1)
-        p2_action = self.request_action(Player.P2)
+        Args:
+            player: The Player who is forfeiting.
+        """
+        self.result = Result(player.opponent)
+
+    def _resolve_turn(self, p1_action: Action, p2_action: Action) -> List[Player]:
+        """Executes both players' actions and any end of turn effects.
 
+        Args:
+            p1_action: The Action P1 will take.
+            p2_action: The Action P2 will take.
+
+        Returns:
+            The Players whose active Pokemon were knocked out and must be
+            replaced before the next turn, in switching order.
+        """
+
+        self._turn_started = False
         self._execute_actions(p1_action, p2_action)
 
         self._update_result()
         if self.result is not None:
-            return
+            return []
 
         self._end_of_turn()
 
         self._update_result()
         if self.result is not None:
-            return
+            return []
+
+        return [player for player in _PLAYERS if self.actives[player].knocked_out]
+
+    def play_turn(self):
+        """Plays out one turn of the battle."""
+
+        p1_action = self.request_action(Player.P1)
+        p2_action = self.request_action(Player.P2)
+
+        switches = self._resolve_turn(p1_action, p2_action)
+        self.history.append((p1_action, p2_action))
+        for player in switches:
+            self._record_switch(player, self.request_switch(player))
+
+    async def play_turn_async(self):
+        """Plays out one turn of the battle, awaiting both agents concurrently."""
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        p1_action, p2_action = await asyncio.gather(
+            self.request_action_async(Player.P1), self.request_action_async(Player.P2)
+        )
 
-        if self.p1_active_pokemon.knocked_out:
-            p1_switch = self.request_action(Player.P1)
-            self._execute_switch(Player.P1, p1_switch)
-        if self.p1_active_pokemon.knocked_out:
-            p2_switch = self.request_action(Player.P2)
-            self._execute_switch(Player.P2, p2_switch)
+        switches = self._resolve_turn(p1_action, p2_action)
+        self.history.append((p1_action, p2_action))
+        for player in switches:
+            self._record_switch(player, await self.request_switch_async(player))
 
     def _under_turn_max(self):
         return self.ruleset.max_turns is None or self.turn < self.ruleset.max_turns
 
+    def _start(self, do_logging: bool):
+        if do_logging:
+            self.log = BattleLog()
+
+    def _finish(self) -> Tuple[Optional[Player], int, Optional[BattleLog]]:
+        if self.result is None:
+            self.result = Result.DRAW
+
+        return self.result.victor, self.turn, self.log
+
     def play(
         self, do_logging: bool = False
     ) -> Tuple[Optional[Player], int, Optional[BattleLog]]:
@@ -283,14 +622,39 @@ class Battle:
             The winner and the turn count of the battle.
         """
 
-        if do_logging:
-            self.log = BattleLog()
+        self._start(do_logging)
 
         while self.result is None and self._under_turn_max():
             self.increment_turn()
             self.play_turn()
 
-        if self.result is None:
-            self.result = Result.DRAW
+        return self._finish()
 
-        return self.result.victor, self.turn, self.log
+    async def play_async(
+        self,
+        do_logging: bool = False,
+        on_turn_end: Optional[Callable[["Battle"], Awaitable[None]]] = None,
+    ) -> Tuple[Optional[Player], int, Optional[BattleLog]]:
+        """Plays out the entire battle to completion on the running event loop.
+
+        Agents are awaited through request_action_async, so battles whose
+        agents are waiting on slow sources yield to other battles on the loop.
+
+        Args:
+            do_logging: Whether to record a BattleLog of the battle.
+            on_turn_end: A coroutine function awaited with this Battle after
+              every turn, e.g. to stream that turn's results to clients.
+
+        Returns:
+            The winner and the turn count of the battle.
+        """
+
+        self._start(do_logging)
+
+        while self.result is None and self._under_turn_max():
+            self.increment_turn()
+            await self.play_turn_async()
+            if on_turn_end is not None:
+                await on_turn_end(self)
+
+        return self._finish()
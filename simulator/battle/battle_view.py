@@ -0,0 +1,99 @@
+"""Read-only views of a battle, holding what one player can see of it.
+
+Agents are handed the whole mutable Battle, and reach each feature through
+several layers of properties (battle.actives[player].pokemon.species, etc.).
+A BattleView, made by Battle.view, instead holds the state of the player's
+and the opponent's sides as flat attributes of a SideView each, copied out
+of the engine when the view is made.
+
+A view holds only plain values: numbers, enums, tuples and the dex's shared
+PokemonSpecies and Moves, never the Battle or its Pokemon. The opponent's
+side only holds what the player has seen: the team members that have been
+sent out, and the moves they have used, with their PP. Unseen team members
+are None, as the size of a team is visible. Views can therefore be handed to
+agents that must not reach the rest of the battle, and pickle into a few
+hundred bytes for agents in other processes.
+"""
+
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+
+from simulator.moves.move import Move
+from simulator.pokemon.pokemon_species import PokemonSpecies
+from simulator.status import Status
+
+if TYPE_CHECKING:
+    from simulator.battle.action import Action
+    from simulator.battle.battle import Player
+
+
+class MemberView(NamedTuple):
+    """One Pokemon on a team, active or not.
+
+    Attributes:
+        moves: The Pokemon's moves, or for the opponent, the ones it has used.
+        pp: The PP left of each of moves.
+    """
+
+    species: PokemonSpecies
+    level: int
+    hp: int
+    max_hp: int
+    status: Status
+    moves: Tuple[Move, ...]
+    pp: Tuple[int, ...]
+
+    @property
+    def knocked_out(self) -> bool:
+        return self.hp == 0
+
+
+class SideView(NamedTuple):
+    """One player's side: its active Pokemon, flattened, and its team.
+
+    Attributes:
+        active_slot: The team slot of the active Pokemon.
+        moves: The active Pokemon's moves, or for the opponent, the ones it
+          has used.
+        pp: The PP left of each of moves.
+        stat_modifiers: The active Pokemon's modifier of each ModifiableStat.
+        toxic: Whether the active Pokemon is badly poisoned.
+        team: A MemberView of each team slot, in order, or for the opponent,
+          None for each member that has not been sent out.
+    """
+
+    active_slot: int
+    species: PokemonSpecies
+    hp: int
+    max_hp: int
+    status: Status
+    moves: Tuple[Move, ...]
+    pp: Tuple[int, ...]
+    stat_modifiers: Tuple[int, ...]
+    confused: bool
+    leech_seed: bool
+    toxic: bool
+    reflect: bool
+    light_screen: bool
+    focus_energy: bool
+    mist: bool
+    team: Tuple[Optional[MemberView], ...]
+
+
+class BattleView(NamedTuple):
+    """A battle as seen from one player's side.
+
+    Attributes:
+        player: The Player the battle is seen by.
+        turn: The battle's turn count.
+        finished: Whether the battle is over.
+        choices: The player's valid Actions for the battle's next decision.
+        own: The player's side.
+        opponent: What the player has seen of the opponent's side.
+    """
+
+    player: "Player"
+    turn: int
+    finished: bool
+    choices: Tuple["Action", ...]
+    own: SideView
+    opponent: SideView
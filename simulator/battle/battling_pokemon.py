@@ -1,7 +1,9 @@
 """A Pokemon currently in battle, with variable HP, Status, and PP"""
 
-from typing import TYPE_CHECKING, List
+from array import array
+from typing import TYPE_CHECKING, Hashable, List, Tuple
 
+from simulator.battle.battle_view import MemberView
 from simulator.moves.move import Move
 from simulator.pokemon.party_pokemon import PartyPokemon
 from simulator.pokemon.pokemon_species import PokemonSpecies
@@ -26,7 +28,12 @@ class BattlingPokemon:
         self._party_pokemon = party_pokemon
         self._hp = party_pokemon.hp
         self._status = Status.NONE
-        self._pp = [m.pp for m in party_pokemon.moves]
+        # An array, so that it can be read without copying (see pp_view).
+        self._pp = array("H", [m.pp for m in party_pokemon.moves])
+        # What the opponent has seen: whether this Pokemon has been sent out,
+        # and a bitmask of the move slots it has used.
+        self.revealed = False
+        self.revealed_moves = 0
 
         self._battle = battle
         self._player = player
@@ -34,6 +41,49 @@ class BattlingPokemon:
     def __str__(self):
         return str(self._party_pokemon)
 
+    def clone(self, battle: "Battle") -> "BattlingPokemon":
+        """Copies this Pokemon's HP, status and PP into another Battle."""
+        clone = BattlingPokemon.__new__(BattlingPokemon)
+        clone.__dict__.update(self.__dict__)
+        clone._pp = self._pp[:]
+        clone._battle = battle
+        return clone
+
+    def state_key(self) -> Hashable:
+        return self._hp, self._status, tuple(self._pp)
+
+    def visible_moves(
+        self, seen_only: bool = False
+    ) -> Tuple[Tuple[Move, ...], Tuple[int, ...]]:
+        """Produces this Pokemon's moves and the PP left of each.
+
+        Args:
+            seen_only: Whether to produce only the moves the opponent has seen
+              this Pokemon use.
+        """
+        moves = self._party_pokemon.moves
+        revealed = self.revealed_moves
+        if not seen_only or revealed == (1 << len(moves)) - 1:
+            return tuple(moves), tuple(self._pp)
+        if not revealed:
+            return (), ()
+        slots = [i for i in range(len(moves)) if revealed >> i & 1]
+        return tuple([moves[i] for i in slots]), tuple([self._pp[i] for i in slots])
+
+    def view(self, seen_only: bool = False) -> MemberView:
+        """Copies this Pokemon's state, or what the opponent has seen of it."""
+        party_pokemon = self._party_pokemon
+        moves, pp = self.visible_moves(seen_only)
+        return MemberView(
+            party_pokemon.species,
+            party_pokemon.level,
+            self._hp,
+            party_pokemon.hp,
+            self._status,
+            moves,
+            pp,
+        )
+
     @property
     def species(self) -> PokemonSpecies:
         return self.pokemon.species
@@ -93,9 +143,14 @@ class BattlingPokemon:
         return self.pokemon.moves
 
     @property
-    def pp(self) -> List[int]:
+    def pp(self) -> "array[int]":
         return self._pp
 
+    @property
+    def pp_view(self) -> memoryview:
+        """A read-only view of the PP left in each move slot, without copying."""
+        return memoryview(self._pp).toreadonly()
+
     @property
     def knocked_out(self) -> bool:
         return self.hp == 0
@@ -0,0 +1,37 @@
+"""A time budget for a single decision by an agent."""
+
+import time
+
+
+class Deadline:
+    """The point in time by which an agent must have chosen its Action.
+
+    Anytime agents (e.g. search agents) can poll remaining() to decide how
+    much more work they can afford before answering.
+    """
+
+    def __init__(self, budget: float):
+        if budget <= 0:
+            raise ValueError("A decision's time budget must be positive.")
+        self._budget = budget
+        self._expires_at = time.monotonic() + budget
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._budget})"
+
+    @property
+    def budget(self) -> float:
+        return self._budget
+
+    @property
+    def expires_at(self) -> float:
+        """The time.monotonic() value at which the deadline passes."""
+        return self._expires_at
+
+    def remaining(self) -> float:
+        """Produces the number of seconds left before the deadline passes."""
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
@@ -0,0 +1,75 @@
+"""Builds and inspects team corpus files."""
+
+import argparse
+import sys
+
+from simulator.corpus.showdown import import_teams
+from simulator.corpus.team_corpus import TeamCorpus, TeamCorpusWriter
+from simulator.team_generators.random_battle_team_generator import (
+    RandomBattleTeamGenerator,
+)
+
+
+def generate(args: argparse.Namespace):
+    generator = RandomBattleTeamGenerator(team_size=args.team_size, seed=args.seed)
+    with TeamCorpusWriter(args.corpus) as writer:
+        for start in range(0, args.count, args.chunk_size):
+            writer.write_packed(
+                generator.generate_packed(min(args.chunk_size, args.count - start))
+            )
+    print(f"Wrote {writer.count} teams to {args.corpus}")
+
+
+def import_showdown(args: argparse.Namespace):
+    with open(args.export, encoding="utf-8") as export:
+        with TeamCorpusWriter(args.corpus) as writer:
+            errors = import_teams(export, writer)
+    for error in errors:
+        print(f"Skipped a team: {error}", file=sys.stderr)
+    print(f"Wrote {writer.count} teams to {args.corpus}, skipped {len(errors)}")
+
+
+def info(args: argparse.Namespace):
+    corpus = TeamCorpus(args.corpus)
+    print(f"{len(corpus)} teams")
+    for i in range(min(args.show, len(corpus))):
+        print(
+            " / ".join(
+                f"{pokemon} L{pokemon.level} ({', '.join(map(str, pokemon.moves))})"
+                for pokemon in corpus[i]
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(required=True)
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="Write random battle teams to a corpus."
+    )
+    generate_parser.add_argument("count", type=int)
+    generate_parser.add_argument("corpus")
+    generate_parser.add_argument("--team-size", type=int)
+    generate_parser.add_argument("--seed", type=int)
+    generate_parser.add_argument("--chunk-size", type=int, default=65536)
+    generate_parser.set_defaults(command=generate)
+
+    import_parser = subparsers.add_parser(
+        "import", help="Write the teams of a Showdown export to a corpus."
+    )
+    import_parser.add_argument("export")
+    import_parser.add_argument("corpus")
+    import_parser.set_defaults(command=import_showdown)
+
+    info_parser = subparsers.add_parser("info", help="Describe a corpus.")
+    info_parser.add_argument("corpus")
+    info_parser.add_argument("--show", type=int, default=0)
+    info_parser.set_defaults(command=info)
+
+    args = parser.parse_args()
+    args.command(args)
+
+
+if __name__ == "__main__":
+    main()
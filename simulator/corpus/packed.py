@@ -0,0 +1,110 @@
+"""A fixed-width binary encoding of teams, for storing them in bulk.
+
+Each team is one TEAM_DTYPE record of 109 bytes, holding up to six
+MEMBER_DTYPE records. Species and moves are stored by their dex indices, so a
+packed team is only meaningful alongside the dex it was packed with (see
+simulator.dex.cache.dex_hash). Nicknames are not stored.
+"""
+
+import functools
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from simulator.dex.cache import load_dex
+from simulator.moves.move import Move
+from simulator.pokemon.party_pokemon import PartyPokemon
+from simulator.pokemon.pokemon_species import PokemonSpecies
+
+# Marks an empty member or move slot.
+EMPTY = 0xFF
+MAX_MEMBERS = 6
+MAX_MOVES = 4
+
+MEMBER_DTYPE = np.dtype(
+    [
+        ("species", np.uint8),
+        ("level", np.uint8),
+        ("moves", np.uint8, (MAX_MOVES,)),
+        # The Attack, Defense, Speed and Special DVs, one nibble each from the
+        # most significant.
+        ("dvs", "<u2"),
+        # HP, Attack, Defense, Speed and Special.
+        ("stat_exp", "<u2", (5,)),
+    ]
+)
+
+TEAM_DTYPE = np.dtype([("size", np.uint8), ("members", MEMBER_DTYPE, (MAX_MEMBERS,))])
+
+
+def empty_teams(n: int) -> np.ndarray:
+    """Produces n packed teams with every member and move slot empty."""
+    teams = np.zeros(n, dtype=TEAM_DTYPE)
+    teams["members"]["species"] = EMPTY
+    teams["members"]["moves"] = EMPTY
+    return teams
+
+
+def pack_dvs(atk_dv: int, def_dv: int, spe_dv: int, spc_dv: int) -> int:
+    return atk_dv << 12 | def_dv << 8 | spe_dv << 4 | spc_dv
+
+
+def unpack_dvs(dvs: int) -> List[int]:
+    return [dvs >> 12 & 0xF, dvs >> 8 & 0xF, dvs >> 4 & 0xF, dvs & 0xF]
+
+
+_EMPTY_MEMBER = (EMPTY, 0, (EMPTY,) * MAX_MOVES, 0, (0,) * 5)
+
+
+def _pack_member(pokemon: PartyPokemon) -> tuple:
+    move_indices = [EMPTY if move is None else move.index for move in pokemon.moves]
+    return (
+        pokemon.species.index,
+        pokemon.level,
+        move_indices + [EMPTY] * (MAX_MOVES - len(move_indices)),
+        pack_dvs(pokemon.atk_dv, pokemon.def_dv, pokemon.spe_dv, pokemon.spc_dv),
+        (
+            pokemon.hp_stat_exp,
+            pokemon.atk_stat_exp,
+            pokemon.def_stat_exp,
+            pokemon.spe_stat_exp,
+            pokemon.spc_stat_exp,
+        ),
+    )
+
+
+def pack_teams(teams: Iterable[Sequence[PartyPokemon]]) -> np.ndarray:
+    """Packs teams, each a Team or a list of PartyPokemon, into an array."""
+    records = []
+    for team in teams:
+        if not 1 <= len(team) <= MAX_MEMBERS:
+            raise ValueError(f"Teams must have 1 to {MAX_MEMBERS} members.")
+        members = [_pack_member(pokemon) for pokemon in team]
+        members += [_EMPTY_MEMBER] * (MAX_MEMBERS - len(members))
+        records.append((len(team), members))
+    return np.array(records, dtype=TEAM_DTYPE)
+
+
+@functools.lru_cache(maxsize=None)
+def _dex_by_index() -> Tuple[List[Move], List[PokemonSpecies]]:
+    movedex, pokedex = load_dex()
+    return list(movedex.values()), list(pokedex.values())
+
+
+def unpack_team(packed: np.void) -> List[PartyPokemon]:
+    """Rebuilds the PartyPokemon of one packed team record."""
+    moves, species = _dex_by_index()
+    # Subarray fields stay arrays after tolist(), so they are converted below.
+    members = packed["members"][: packed["size"]].tolist()
+    team = []
+    for species_index, level, move_indices, dvs, stat_exp in members:
+        team.append(
+            PartyPokemon(
+                species[species_index],
+                level,
+                [moves[i] for i in move_indices.tolist() if i != EMPTY],
+                *unpack_dvs(dvs),
+                *stat_exp.tolist(),
+            )
+        )
+    return team
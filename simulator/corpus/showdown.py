@@ -0,0 +1,234 @@
+"""A streaming importer for teams exported from Pokemon Showdown.
+
+Showdown's export format lists each Pokemon as a block of lines:
+
+    Nickname (Species) @ Item
+    Level: 50
+    EVs: 252 HP / 200 Atk
+    IVs: 30 Def
+    - Move One
+    - Move Two
+
+Blocks are separated by blank lines, and teams by "=== [format] Name ==="
+headers. Showdown's Generation 1 EVs range up to 252 and stand for Stat EXP,
+which is imported as EV squared (252 squared gives the same stats as the
+maximum Stat EXP). Its IVs are DVs doubled, so each DV is half the IV. Stats
+without an EV or IV default to the maximum, as they do on Showdown. Items,
+abilities, natures and other later-generation fields are ignored.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from simulator.corpus.team_corpus import TeamCorpusWriter
+from simulator.dex.movedex import MOVEDEX
+from simulator.dex.pokedex import POKEDEX
+from simulator.moves.move import Move
+from simulator.pokemon.party_pokemon import (
+    InvalidDiversificationValueException,
+    InvalidLevelException,
+    InvalidMoveCountException,
+    InvalidMoveException,
+    InvalidStatExperienceValueException,
+    PartyPokemon,
+)
+from simulator.pokemon.pokemon_species import PokemonSpecies
+
+# Showdown's stat abbreviations, with Special read from Sp. Atk.
+_STATS = {"hp": 0, "atk": 1, "def": 2, "spe": 3, "spa": 4, "spc": 4}
+_SPREAD = re.compile(r"(\d+)\s*(\w+)")
+_GENDER = re.compile(r" \([MF]\)$")
+_NAME_LINE = re.compile(
+    r"^(?:(?P<nickname>.*?) \((?P<species>[^()]+)\)|(?P<name>.*?))$"
+)
+
+
+class ShowdownParseException(Exception):
+    def __init__(self, line_number: int, reason: str):
+        super().__init__(f"Line {line_number}: {reason}")
+
+
+def _to_id(name: str) -> str:
+    """Normalizes a name the way Showdown does, e.g. "Mr. Mime" to "mrmime"."""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+class _Dex:
+    def __init__(self):
+        self.species: Dict[str, PokemonSpecies] = {
+            _to_id(name): species for name, species in POKEDEX.items()
+        }
+        self.moves: Dict[str, Move] = {
+            _to_id(name): move for name, move in MOVEDEX.items()
+        }
+
+
+class _PokemonBlock:
+    """The fields of one Pokemon's block of an export, as it is read."""
+
+    def __init__(self, species: PokemonSpecies, nickname: Optional[str]):
+        self.species = species
+        self.nickname = nickname
+        self.level = 100
+        self.moves: List[Move] = []
+        self.dvs = [PartyPokemon.MAX_DV] * 5
+        self.stat_exp = [PartyPokemon.MAX_STAT_EXP] * 5
+
+    def build(self) -> PartyPokemon:
+        return PartyPokemon(
+            self.species,
+            self.level,
+            self.moves,
+            *self.dvs[1:],
+            *self.stat_exp,
+            nickname=self.nickname,
+        )
+
+
+def _parse_spread(line_number: int, spread: str) -> Iterator[Tuple[int, int]]:
+    for part in spread.split("/"):
+        match = _SPREAD.fullmatch(part.strip())
+        if match is None or match.group(2).lower() not in _STATS:
+            raise ShowdownParseException(line_number, f"bad stat spread {part!r}")
+        yield _STATS[match.group(2).lower()], int(match.group(1))
+
+
+def parse_teams(
+    lines: Iterable[str], errors: Optional[List[ShowdownParseException]] = None
+) -> Iterator[List[PartyPokemon]]:
+    """Parses teams from the lines of a Showdown export, one team at a time.
+
+    Lines are consumed lazily, so an open file of any size can be passed.
+    Without any "===" headers, the whole export is one team.
+
+    Args:
+        lines: The lines of the export.
+        errors: If given, teams that cannot be parsed are skipped, and the
+          reason for each is appended here instead of being raised.
+
+    Yields:
+        Each team's Pokemon, in order.
+
+    Raises:
+        ShowdownParseException: If a team cannot be parsed, e.g. because it
+          names a species or move missing from the dex, and errors is None.
+    """
+    dex = _Dex()
+    team: List[PartyPokemon] = []
+    block: Optional[_PokemonBlock] = None
+    # Set when the current team could not be parsed, until the next header.
+    skipping = False
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line.startswith("==="):
+            if team or block is not None:
+                try:
+                    yield _finish_team(team, block, line_number)
+                except ShowdownParseException as exception:
+                    if errors is None:
+                        raise
+                    errors.append(exception)
+            team, block, skipping = [], None, False
+            continue
+        if skipping:
+            continue
+        try:
+            block = _parse_line(dex, team, block, line_number, line)
+        except ShowdownParseException as exception:
+            if errors is None:
+                raise
+            errors.append(exception)
+            team, block, skipping = [], None, True
+
+    if not skipping and (team or block is not None):
+        try:
+            yield _finish_team(team, block, line_number)
+        except ShowdownParseException as exception:
+            if errors is None:
+                raise
+            errors.append(exception)
+
+
+def _build(block: _PokemonBlock, line_number: int) -> PartyPokemon:
+    try:
+        return block.build()
+    except (
+        InvalidLevelException,
+        InvalidMoveException,
+        InvalidMoveCountException,
+        InvalidDiversificationValueException,
+        InvalidStatExperienceValueException,
+    ) as exception:
+        raise ShowdownParseException(line_number, str(exception)) from exception
+
+
+def _finish_team(
+    team: List[PartyPokemon], block: Optional[_PokemonBlock], line_number: int
+) -> List[PartyPokemon]:
+    if block is not None:
+        team.append(_build(block, line_number))
+    if not 1 <= len(team) <= 6:
+        raise ShowdownParseException(line_number, f"a team has {len(team)} Pokemon")
+    return team
+
+
+def _parse_line(
+    dex: _Dex,
+    team: List[PartyPokemon],
+    block: Optional[_PokemonBlock],
+    line_number: int,
+    line: str,
+) -> Optional[_PokemonBlock]:
+    """Parses one line into the current block, and produces the new block."""
+    if not line:
+        if block is not None:
+            team.append(_build(block, line_number))
+        return None
+    if block is None:
+        match = _NAME_LINE.match(_GENDER.sub("", line.split(" @ ")[0].strip()))
+        name = match.group("species") or match.group("name")
+        nickname = match.group("nickname")
+        species = dex.species.get(_to_id(name))
+        if species is None:
+            raise ShowdownParseException(line_number, f"unknown species {name}")
+        return _PokemonBlock(species, nickname)
+    if line.startswith("-"):
+        name = line[1:].strip()
+        move = dex.moves.get(_to_id(name))
+        if move is None:
+            raise ShowdownParseException(line_number, f"unknown move {name}")
+        block.moves.append(move)
+    elif line.startswith("Level:"):
+        try:
+            block.level = int(line[len("Level:") :])
+        except ValueError as exception:
+            raise ShowdownParseException(line_number, "bad level") from exception
+    elif line.startswith("EVs:"):
+        for stat, ev in _parse_spread(line_number, line[len("EVs:") :]):
+            block.stat_exp[stat] = min(ev * ev, PartyPokemon.MAX_STAT_EXP)
+    elif line.startswith("IVs:"):
+        for stat, iv in _parse_spread(line_number, line[len("IVs:") :]):
+            block.dvs[stat] = iv // 2
+    return block
+
+
+def import_teams(
+    lines: Iterable[str], writer: TeamCorpusWriter
+) -> List[ShowdownParseException]:
+    """Streams every team of a Showdown export into a corpus.
+
+    Teams that cannot be parsed, or whose Pokemon are invalid (e.g. with a
+    move their species cannot learn), are skipped rather than aborting the
+    import.
+
+    Args:
+        lines: The lines of the export.
+        writer: The corpus to append the teams to.
+
+    Returns:
+        The reason each skipped team was skipped.
+    """
+    errors: List[ShowdownParseException] = []
+    writer.write_teams(parse_teams(lines, errors))
+    return errors
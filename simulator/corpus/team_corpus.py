@@ -0,0 +1,159 @@
+"""A memory-mapped file of packed teams, shareable between processes.
+
+A corpus file is a 128-byte header followed by an array of TEAM_DTYPE records.
+The header holds a magic string, the format version, the number of teams and
+the dex_hash of the dex the teams were packed with. Opening a corpus maps the
+records into memory instead of reading them, so any number of worker processes
+can open the same corpus and share its pages, and a team is only unpacked into
+PartyPokemon when it is used.
+"""
+
+import os
+import struct
+from typing import Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from simulator.corpus.packed import TEAM_DTYPE, pack_teams, unpack_team
+from simulator.dex.cache import dex_hash
+from simulator.pokemon.party_pokemon import PartyPokemon
+from simulator.pokemon.team import Team
+
+MAGIC = b"LANCETMS"
+FORMAT_VERSION = 1
+HEADER_SIZE = 128
+_HEADER = struct.Struct("<8sIQ64s")
+
+
+class InvalidCorpusException(Exception):
+    def __init__(self, path: str, reason: str):
+        super().__init__(f"{path} is not a usable team corpus: {reason}")
+
+
+class TeamCorpusWriter:
+    """Writes teams to a new corpus file, appending them in chunks.
+
+    The file is written under a temporary name and only moved into place when
+    the writer is closed without an error, so readers never see a partial
+    corpus. Use it as a context manager.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._temporary_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._temporary_path, "wb")
+        try:
+            self._file.write(bytes(HEADER_SIZE))
+        except BaseException:
+            self._discard()
+            raise
+        self.count = 0
+
+    def __enter__(self) -> "TeamCorpusWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def _discard(self):
+        """Closes the file and removes it, leaving no partial corpus."""
+        try:
+            self._file.close()
+        finally:
+            if os.path.exists(self._temporary_path):
+                os.remove(self._temporary_path)
+
+    def write_packed(self, packed: np.ndarray):
+        """Appends an array of packed teams."""
+        if packed.dtype != TEAM_DTYPE:
+            raise ValueError(f"Packed teams must have dtype {TEAM_DTYPE}.")
+        self._file.write(packed.tobytes())
+        self.count += len(packed)
+
+    def write_teams(
+        self, teams: Iterable[Sequence[PartyPokemon]], chunk_size: int = 4096
+    ):
+        """Packs and appends teams, chunk_size at a time."""
+        chunk = []
+        for team in teams:
+            chunk.append(team)
+            if len(chunk) == chunk_size:
+                self.write_packed(pack_teams(chunk))
+                chunk = []
+        if chunk:
+            self.write_packed(pack_teams(chunk))
+
+    def close(self):
+        """Writes the header and moves the corpus into place.
+
+        If that fails, the temporary file is removed instead.
+        """
+        try:
+            self._file.seek(0)
+            self._file.write(
+                _HEADER.pack(MAGIC, FORMAT_VERSION, self.count, dex_hash().encode())
+            )
+            self._file.close()
+            os.replace(self._temporary_path, self.path)
+        except BaseException:
+            self._discard()
+            raise
+
+
+class TeamCorpus:
+    """A read-only, memory-mapped corpus of teams.
+
+    Pickling a TeamCorpus only pickles its path, so it can be sent to worker
+    processes cheaply; each worker maps the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            header = file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise InvalidCorpusException(path, "the header is truncated")
+        magic, version, count, packed_hash = _HEADER.unpack_from(header)
+        if magic != MAGIC:
+            raise InvalidCorpusException(path, "the magic string is wrong")
+        if version != FORMAT_VERSION:
+            raise InvalidCorpusException(path, f"format version {version}")
+        if packed_hash.decode() != dex_hash():
+            raise InvalidCorpusException(path, "it was packed with another dex")
+        expected_size = HEADER_SIZE + count * TEAM_DTYPE.itemsize
+        if os.path.getsize(path) != expected_size:
+            raise InvalidCorpusException(path, "the file size is wrong")
+
+        self._packed: Optional[np.ndarray] = (
+            np.memmap(path, TEAM_DTYPE, "r", HEADER_SIZE, (count,)) if count else None
+        )
+        self._count = count
+
+    def __getstate__(self):
+        return self.path
+
+    def __setstate__(self, path: str):
+        self.__init__(path)  # pylint: disable=unnecessary-dunder-call
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({repr(self.path)})"
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Team:
+        return Team(unpack_team(self.packed[index]))
+
+    def __iter__(self) -> Iterator[Team]:
+        for i in range(self._count):
+            yield self[i]
+
+    @property
+    def packed(self) -> np.ndarray:
+        """The read-only array of every packed team in the corpus."""
+        if self._packed is None:
+            return np.zeros(0, dtype=TEAM_DTYPE)
+        return self._packed
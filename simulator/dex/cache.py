@@ -0,0 +1,189 @@
+"""A precompiled binary cache of the Movedex and Pokedex for fast startup.
+
+Building the dexes from JSON means parsing both files and running every Move
+and PokemonSpecies constructor, including the type effectiveness tables. The
+compiled cache instead stores each object's attributes as plain pickled data
+and rebuilds the objects without calling their constructors.
+
+Cache files are keyed by a hash of the JSON files and of the source code of
+the classes being cached, so editing either invalidates the cache. They are
+written to the directory named by the LANCE_DEX_CACHE_DIR environment
+variable, or to this package's __pycache__ directory by default. If the cache
+cannot be read or written, the dexes are simply built from JSON.
+"""
+
+import functools
+import hashlib
+import os
+import pickle
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from simulator.pokemon.pokemon_species import PokemonSpecies
+from simulator.type import Type
+
+if TYPE_CHECKING:
+    from simulator.moves.move import Move
+
+_CACHE_FORMAT = 1
+_DEX_DIR = os.path.dirname(__file__)
+_SIMULATOR_DIR = os.path.dirname(_DEX_DIR)
+_DATA_FILES = ("movedex.json", "pokedex.json")
+_TYPES = list(Type)
+
+_CompiledMove = Tuple[str, str, Dict[str, Any]]
+_CompiledSpecies = Tuple[
+    Dict[str, Any], List[int], int, Optional[int], Tuple[float, ...]
+]
+
+
+def _source_files() -> List[str]:
+    moves_dir = os.path.join(_SIMULATOR_DIR, "moves")
+    return sorted(
+        [os.path.join(_DEX_DIR, f) for f in os.listdir(_DEX_DIR) if f.endswith(".py")]
+        + [
+            os.path.join(moves_dir, f)
+            for f in os.listdir(moves_dir)
+            if f.endswith(".py")
+        ]
+        + [os.path.join(_SIMULATOR_DIR, "pokemon", "pokemon_species.py")]
+    )
+
+
+def _hash_files(paths: List[str]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def dex_hash() -> str:
+    """Produces a hash identifying the contents of the dex JSON files.
+
+    Anything that stores dex indices or dex-derived data on disk should key it
+    by this hash, so that it is invalidated when the dex changes.
+    """
+    return _hash_files([os.path.join(_DEX_DIR, f) for f in _DATA_FILES])
+
+
+def cache_dir() -> str:
+    """Produces the directory that dex caches and dex-derived data are kept in."""
+    return os.environ.get("LANCE_DEX_CACHE_DIR", os.path.join(_DEX_DIR, "__pycache__"))
+
+
+def cache_path() -> str:
+    key = hashlib.sha256(
+        f"{_CACHE_FORMAT}:{dex_hash()}:{_hash_files(_source_files())}".encode()
+    ).hexdigest()[:16]
+    return os.path.join(cache_dir(), f"dex-{key}.pickle")
+
+
+def _compile(
+    movedex: Dict[str, "Move"], pokedex: Dict[str, PokemonSpecies]
+) -> Tuple[List[_CompiledMove], List[_CompiledSpecies]]:
+    moves = list(movedex.values())
+    move_indices = {move.name: i for i, move in enumerate(moves)}
+    compiled_moves = [
+        (type(move).__module__, type(move).__qualname__, dict(move.__dict__))
+        for move in moves
+    ]
+
+    derived = ("moveset", "types", "primary_type", "secondary_type", "_effectivenesses")
+    compiled_species = []
+    for species in pokedex.values():
+        compiled_species.append(
+            (
+                {k: v for k, v in species.__dict__.items() if k not in derived},
+                sorted(move_indices[move.name] for move in species.moveset),
+                _TYPES.index(species.primary_type),
+                None
+                if species.secondary_type is None
+                else _TYPES.index(species.secondary_type),
+                tuple(species.attack_effectiveness(t) for t in _TYPES),
+            )
+        )
+    return compiled_moves, compiled_species
+
+
+def _link(
+    compiled_moves: List[_CompiledMove], compiled_species: List[_CompiledSpecies]
+) -> Tuple[Dict[str, "Move"], Dict[str, PokemonSpecies]]:
+    moves = []
+    for module, qualname, attributes in compiled_moves:
+        cls = getattr(sys.modules[module], qualname)
+        move = cls.__new__(cls)
+        move.__dict__ = attributes
+        moves.append(move)
+
+    # Effectiveness tables only depend on the species' types, and are never
+    # mutated, so species with the same types can share one.
+    effectiveness_tables: Dict[Tuple[float, ...], Dict[Type, float]] = {}
+    pokedex = {}
+    for attributes, learnset, primary, secondary, effectivenesses in compiled_species:
+        species = PokemonSpecies.__new__(PokemonSpecies)
+        species.__dict__ = attributes
+        species.moveset = {moves[i] for i in learnset}
+        species.primary_type = _TYPES[primary]
+        species.secondary_type = None if secondary is None else _TYPES[secondary]
+        species.types = (
+            [species.primary_type]
+            if species.secondary_type is None
+            else [species.primary_type, species.secondary_type]
+        )
+        table = effectiveness_tables.get(effectivenesses)
+        if table is None:
+            table = effectiveness_tables[effectivenesses] = dict(
+                zip(_TYPES, effectivenesses)
+            )
+        species._effectivenesses = table  # pylint: disable=protected-access
+        pokedex[species.name] = species
+
+    return {move.name: move for move in moves}, pokedex
+
+
+def _build() -> Tuple[Dict[str, "Move"], Dict[str, PokemonSpecies]]:
+    # pylint: disable=import-outside-toplevel
+    from simulator.dex.movedex import _gen_movedex
+    from simulator.dex.pokedex import _gen_pokedex
+
+    movedex = _gen_movedex()
+    return movedex, _gen_pokedex(movedex)
+
+
+def _write(path: str, compiled: Tuple[List[_CompiledMove], List[_CompiledSpecies]]):
+    # Written under a temporary name and renamed, so that concurrently
+    # starting processes never read a partially written cache.
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary_path, "wb") as file:
+            pickle.dump(compiled, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def load_dex() -> Tuple[Dict[str, "Move"], Dict[str, PokemonSpecies]]:
+    """Loads the Movedex and Pokedex, from the compiled cache if possible.
+
+    Returns:
+        The Movedex and Pokedex, whose species' movesets share the Movedex's
+        Move objects.
+    """
+    # Make sure every Move class is imported before unpickling instances.
+    # pylint: disable=import-outside-toplevel,unused-import
+    import simulator.dex.movedex
+
+    path = cache_path()
+    try:
+        with open(path, "rb") as file:
+            return _link(*pickle.load(file))
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        pass
+
+    movedex, pokedex = _build()
+    _write(path, _compile(movedex, pokedex))
+    return movedex, pokedex
@@ -0,0 +1,213 @@
+"""A precomputed tensor of every species × move × species matchup.
+
+For every (attacker species, move, defender species) in the dex, the tensor
+holds the expected damage of one use of the move and the number of uses
+needed to knock the defender out at that expected damage. Both Pokemon are
+at the same level, with maximum DVs and Stat EXP and no stat modifiers, as in
+random battles. The expected damage follows the engine exactly: it averages
+the damage formula over every damage roll, weighted by the chance of a
+critical hit, and multiplies it by the chance to hit. Fixed-damage moves are
+handled as the engine handles them, and moves dealing no damage have 0
+expected damage and infinite hits to knock out.
+
+The tensor is built with NumPy in one vectorized pass per attacking species,
+saved as a .npy file next to the dex cache, keyed by the dex_hash and the
+level, and memory-mapped when loaded, so every process shares its pages.
+"""
+
+import functools
+import hashlib
+import os
+from math import floor, sqrt
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from simulator.dex.cache import cache_dir, dex_hash, load_dex
+from simulator.moves.damaging_move import (
+    ConstantDamageMove,
+    DamagingMove,
+    HighCriticalChanceDamagingMove,
+    LevelDamagingMove,
+)
+from simulator.moves.misc_moves import Psywave, SuperFang
+from simulator.pokemon.party_pokemon import PartyPokemon
+from simulator.type import Type
+
+if TYPE_CHECKING:
+    from simulator.moves.move import Move
+    from simulator.pokemon.pokemon_species import PokemonSpecies
+
+_MATCHUP_FORMAT = 1
+_TYPES = list(Type)
+_ROLLS = np.arange(217, 256, dtype=np.float64)
+
+EXPECTED_DAMAGE = 0
+HITS_TO_KO = 1
+
+
+def _stat(base: int, dv: int, level: int) -> int:
+    return floor((base + dv + floor(sqrt(PartyPokemon.MAX_STAT_EXP) / 4)) * level / 100)
+
+
+def _expected_rolls(unmodified: np.ndarray) -> np.ndarray:
+    """Averages the engine's damage over every roll, for each unrolled damage.
+
+    Args:
+        unmodified: Damage before the roll, i.e. the damage formula's base
+          damage times the same-type bonus and type effectiveness.
+    """
+    rolled = np.floor(unmodified[..., np.newaxis] * _ROLLS)
+    return (rolled // 255).mean(axis=-1)
+
+
+def build_matchups(level: int = 100) -> np.ndarray:
+    """Builds the matchup tensor for the current dex.
+
+    Returns:
+        A (2, species, moves, species) float32 array, of the expected damage
+        (EXPECTED_DAMAGE) and hits to knock out (HITS_TO_KO) of each attacker
+        species, move and defender species, indexed by dex index.
+    """
+    movedex, pokedex = load_dex()
+    species_list = sorted(pokedex.values(), key=lambda species: species.index)
+    moves = sorted(movedex.values(), key=lambda move: move.index)
+
+    max_dv = PartyPokemon.MAX_DV
+    hp_dv = 15 if max_dv % 2 else 0
+    hp = np.array(
+        [_stat(s.base_hp, hp_dv, level) + level + 10 for s in species_list], float
+    )
+    attack = np.array([_stat(s.base_atk, max_dv, level) + 5 for s in species_list])
+    defense = np.array([_stat(s.base_def, max_dv, level) + 5 for s in species_list])
+    special = np.array([_stat(s.base_spc, max_dv, level) + 5 for s in species_list])
+    # effectiveness[t, d] is type t's effectiveness against defender d.
+    effectiveness = np.array(
+        [[s.attack_effectiveness(t) for s in species_list] for t in _TYPES]
+    )
+
+    formula = np.array(
+        [
+            isinstance(m, DamagingMove)
+            and not isinstance(
+                m, (ConstantDamageMove, LevelDamagingMove, Psywave, SuperFang)
+            )
+            for m in moves
+        ]
+    )
+    power = np.array([getattr(m, "power", 0) for m in moves], float)
+    move_types = np.array([_TYPES.index(m.move_type) for m in moves])
+    physical = np.array([m.move_type.is_physical for m in moves])
+    high_critical = np.array(
+        [isinstance(m, HighCriticalChanceDamagingMove) for m in moves]
+    )
+    hit_chance = np.array(
+        [1.0 if m.accuracy is None else min(255, m.accuracy) / 256 for m in moves]
+    )
+
+    # Fixed damage, which depends on neither species' stats nor types.
+    fixed = np.zeros((len(moves), len(species_list)))
+    for i, move in enumerate(moves):
+        if isinstance(move, ConstantDamageMove):
+            fixed[i] = move.power
+        elif isinstance(move, LevelDamagingMove):
+            fixed[i] = level
+        elif isinstance(move, Psywave):
+            fixed[i] = max(floor(1.5 * level - 1), 1) / 2
+        elif isinstance(move, SuperFang):
+            fixed[i] = np.maximum(1, np.floor(hp / 2))
+
+    move_effectiveness = effectiveness[move_types]
+    defense_by_move = np.where(physical[:, np.newaxis], defense, special)
+    tensor = np.empty((2, len(species_list), len(moves), len(species_list)), np.float32)
+    for a, attacker in enumerate(species_list):
+        attack_by_move = np.where(physical, attack[a], special[a])
+        stab = np.where(
+            np.isin(move_types, [_TYPES.index(t) for t in attacker.types]), 1.5, 1.0
+        )
+        multiplier = stab[:, np.newaxis] * move_effectiveness
+        ratio = (power * attack_by_move)[:, np.newaxis] / defense_by_move
+        damage = _expected_rolls(((2 * level / 5 + 2) * ratio / 50 + 2) * multiplier)
+        # Critical hits double the level.
+        critical = _expected_rolls(((4 * level / 5 + 2) * ratio / 50 + 2) * multiplier)
+        critical_chance = np.where(
+            high_critical,
+            attacker.critical_hit_threshold(True) / 256,
+            attacker.critical_hit_threshold(False) / 256,
+        )[:, np.newaxis]
+        damage += critical_chance * (critical - damage)
+        damage = np.where(formula[:, np.newaxis], damage, fixed)
+        tensor[EXPECTED_DAMAGE, a] = damage * hit_chance[:, np.newaxis]
+    with np.errstate(divide="ignore"):
+        tensor[HITS_TO_KO] = np.ceil(hp / tensor[EXPECTED_DAMAGE])
+    return tensor
+
+
+def matchups_path(level: int = 100) -> str:
+    """Produces the cache file of a level's tensor, for the current dex."""
+    key = hashlib.sha256(
+        f"{_MATCHUP_FORMAT}:{dex_hash()}:{level}".encode()
+    ).hexdigest()[:16]
+    return os.path.join(cache_dir(), f"matchups-{key}.npy")
+
+
+def _write(path: str, tensor: np.ndarray) -> bool:
+    # Written under a temporary name and renamed, so that concurrently
+    # starting processes never map a partially written file.
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary_path, "wb") as file:
+            np.save(file, tensor)
+        os.replace(temporary_path, path)
+    except OSError:
+        return False
+    return True
+
+
+class MatchupTensor:
+    """The matchup tensor of a level, memory-mapped from its cache file.
+
+    Pickling a MatchupTensor only pickles its level, so it can be sent to
+    worker processes cheaply; each worker maps the same file.
+
+    Attributes:
+        expected_damage: A (species, moves, species) array of the expected
+          damage of each attacker species, move and defender species, indexed
+          by dex index.
+        hits_to_ko: The same, of the uses needed to knock the defender out.
+    """
+
+    def __init__(self, level: int = 100):
+        """Loads the tensor of a level, building and caching it if needed."""
+        self.level = level
+        path = matchups_path(level)
+        try:
+            tensor = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            tensor = build_matchups(level)
+            if _write(path, tensor):
+                tensor = np.load(path, mmap_mode="r")
+        self.expected_damage = tensor[EXPECTED_DAMAGE]
+        self.hits_to_ko = tensor[HITS_TO_KO]
+
+    def __reduce__(self):
+        return load_matchups, (self.level,)
+
+    def damage(
+        self, attacker: "PokemonSpecies", move: "Move", defender: "PokemonSpecies"
+    ) -> float:
+        """Produces the expected damage of one use of the move."""
+        return float(self.expected_damage[attacker.index, move.index, defender.index])
+
+    def hits(
+        self, attacker: "PokemonSpecies", move: "Move", defender: "PokemonSpecies"
+    ) -> float:
+        """Produces the uses of the move needed to knock the defender out."""
+        return float(self.hits_to_ko[attacker.index, move.index, defender.index])
+
+
+@functools.lru_cache(maxsize=None)
+def load_matchups(level: int = 100) -> MatchupTensor:
+    """Loads the matchup tensor of a level, once per process."""
+    return MatchupTensor(level)
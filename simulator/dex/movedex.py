@@ -1,9 +1,15 @@
-"""A dictionary containing a Move subclass for every Pokemon move."""
+"""A dictionary containing a Move subclass for every Pokemon move.
+
+MOVEDEX is loaded lazily, on first access, from the compiled dex cache. Each
+Move's index is its position in MOVEDEX, so that sets of moves can be stored as
+integer bitmasks.
+"""
 
 import json
 import os.path
-from typing import Dict
+from typing import Dict, Iterable, List, Optional
 
+from simulator.dex.cache import load_dex
 from simulator.modifiable_stat import ModifiableStat
 from simulator.moves.damaging_move import (
     ConstantDamageMove,
@@ -22,6 +28,7 @@ from simulator.moves.side_effect_damaging_move import (
 )
 from simulator.moves.stat_modifying_move import StatLoweringMove, StatRaisingMove
 from simulator.moves.status_effect_move import StatusEffectMove
+from simulator.status import Status
 
 
 def _gen_movedex() -> Dict[str, Move]:
@@ -72,10 +79,43 @@ def _gen_movedex() -> Dict[str, Move]:
             move_dict["stat"] = stat_mapping[move_dict["stat"]]
         if "debuff_stat" in move_dict:
             move_dict["debuff_stat"] = stat_mapping[move_dict["debuff_stat"]]
+        if "status" in move_dict:
+            move_dict["status"] = Status[move_dict["status"].upper()]
 
         movedex[move["name"]] = move_class(**move_dict)
+        movedex[move["name"]].index = len(movedex) - 1
 
     return movedex
 
 
-MOVEDEX = _gen_movedex()
+def move_mask(moves: Iterable[Optional[Move]]) -> int:
+    """Produces the bitmask with the bit at each of the given moves' indices set.
+
+    Empty move slots (None) are ignored.
+    """
+    mask = 0
+    for move in moves:
+        if move is not None:
+            mask |= 1 << move.index
+    return mask
+
+
+def full_move_mask() -> int:
+    """Produces the bitmask containing every move in the Movedex."""
+    return (1 << len(load_dex()[0])) - 1
+
+
+def moves_in_mask(mask: int) -> List[Move]:
+    """Produces the moves in a bitmask, in Movedex order."""
+    return [move for move in load_dex()[0].values() if mask >> move.index & 1]
+
+
+MOVEDEX: Dict[str, Move]
+
+
+def __getattr__(name: str):
+    if name == "MOVEDEX":
+        movedex, _ = load_dex()
+        globals()["MOVEDEX"] = movedex
+        return movedex
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,22 @@
-"""A dictionary containing a PokemonSpecies for every available Pokemon."""
+"""A dictionary containing a PokemonSpecies for every available Pokemon.
+
+POKEDEX is loaded lazily, on first access, from the compiled dex cache. Each
+species' index is its position in POKEDEX, so that sets of species can be
+stored as integer bitmasks.
+"""
 
 import json
 import os.path
-from typing import Dict
+from typing import Dict, Iterable, List
 
-from simulator.dex.movedex import MOVEDEX
+from simulator.dex.cache import load_dex
+from simulator.dex.movedex import move_mask
+from simulator.moves.move import Move
 from simulator.pokemon.pokemon_species import PokemonSpecies
 from simulator.type import Type
 
 
-def _gen_pokedex() -> Dict[str, PokemonSpecies]:
+def _gen_pokedex(movedex: Dict[str, Move]) -> Dict[str, PokemonSpecies]:
     with open(
         os.path.join(os.path.dirname(__file__), "pokedex.json"), encoding="utf-8"
     ) as json_file:
@@ -26,14 +33,44 @@ def _gen_pokedex() -> Dict[str, PokemonSpecies]:
             pokemon["base_def"],
             pokemon["base_spe"],
             pokemon["base_spc"],
-            set(MOVEDEX[move] for move in pokemon["learnset"] if move in MOVEDEX),
+            set(movedex[move] for move in pokemon["learnset"] if move in movedex),
             Type[pokemon["primary_type"].upper()],
             None
             if pokemon["secondary_type"] is None
             else Type[pokemon["secondary_type"].upper()],
         )
 
+    for index, species in enumerate(pokedex.values()):
+        species.index = index
+        species.learnset_mask = move_mask(species.moveset)
+
     return pokedex
 
 
-POKEDEX = _gen_pokedex()
+def species_mask(species: Iterable[PokemonSpecies]) -> int:
+    """Produces the bitmask with the bit at each of the given species' indices set."""
+    mask = 0
+    for pokemon in species:
+        mask |= 1 << pokemon.index
+    return mask
+
+
+def full_species_mask() -> int:
+    """Produces the bitmask containing every species in the Pokedex."""
+    return (1 << len(load_dex()[1])) - 1
+
+
+def species_in_mask(mask: int) -> List[PokemonSpecies]:
+    """Produces the species in a bitmask, in Pokedex order."""
+    return [species for species in load_dex()[1].values() if mask >> species.index & 1]
+
+
+POKEDEX: Dict[str, PokemonSpecies]
+
+
+def __getattr__(name: str):
+    if name == "POKEDEX":
+        _, pokedex = load_dex()
+        globals()["POKEDEX"] = pokedex
+        return pokedex
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,312 @@
+"""Indexes over the Pokedex and Movedex, and a query API built on them.
+
+Queries are answered with integer bitmasks over species and move indices (see
+simulator.dex.pokedex.species_mask and simulator.dex.movedex.move_mask), so
+filters are a few bitwise operations instead of scans over every learnset:
+
+    all Electric-immune species that learn Surf:
+        species_query().immune_to(Type.ELECTRIC).learns(MOVEDEX["Surf"]).all()
+    the 5 fastest species that learn a STAB move:
+        species_query().learns_stab_move().top(5, "base_spe")
+"""
+
+import functools
+import typing
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from simulator.dex.cache import load_dex
+from simulator.moves.damaging_move import DamagingMove
+from simulator.moves.move import Move
+from simulator.pokemon.pokemon_species import PokemonSpecies
+from simulator.ruleset import Ruleset
+from simulator.type import Type
+
+BASE_STATS = ("base_hp", "base_atk", "base_def", "base_spe", "base_spc")
+
+MoveClass = typing.Type[Move]
+
+
+def _union(masks: Iterable[int]) -> int:
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """Produces the indices of the set bits of a mask, in ascending order."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+class DexIndex:
+    """Precomputed bitmask indexes over a Pokedex and Movedex.
+
+    Species and moves are indexed by their index attributes, so the dexes
+    must be the ones produced by simulator.dex.cache.load_dex.
+    """
+
+    def __init__(self, movedex: Dict[str, Move], pokedex: Dict[str, PokemonSpecies]):
+        self.moves: List[Move] = list(movedex.values())
+        self.species: List[PokemonSpecies] = list(pokedex.values())
+        assert all(move.index == i for i, move in enumerate(self.moves))
+        assert all(species.index == i for i, species in enumerate(self.species))
+
+        self.all_moves = (1 << len(self.moves)) - 1
+        self.all_species = (1 << len(self.species)) - 1
+
+        # Species-move legality, in both directions.
+        self.learnsets: List[int] = [s.learnset_mask for s in self.species]
+        self.learners: List[int] = [0] * len(self.moves)
+        for species in self.species:
+            for move_index in _bits(species.learnset_mask):
+                self.learners[move_index] |= 1 << species.index
+
+        self.species_by_type: Dict[Type, int] = {
+            t: _union(1 << s.index for s in self.species if t in s.types) for t in Type
+        }
+        self.moves_by_type: Dict[Type, int] = {
+            t: _union(1 << m.index for m in self.moves if m.move_type == t)
+            for t in Type
+        }
+        self.immune: Dict[Type, int] = self._by_effectiveness(lambda e: e == 0)
+        self.resistant: Dict[Type, int] = self._by_effectiveness(lambda e: 0 < e < 1)
+        self.weak: Dict[Type, int] = self._by_effectiveness(lambda e: e > 1)
+
+        # Every class in a move's MRO, so that e.g. DamagingMove matches all
+        # of its subclasses.
+        self.moves_by_class: Dict[MoveClass, int] = {}
+        for move in self.moves:
+            for cls in type(move).__mro__:
+                if issubclass(cls, Move):
+                    self.moves_by_class[cls] = (
+                        self.moves_by_class.get(cls, 0) | 1 << move.index
+                    )
+
+        # Status moves get no same-type attack bonus.
+        damaging_moves = self.moves_by_class.get(DamagingMove, 0)
+        self.stab_moves: List[int] = [
+            s.learnset_mask
+            & damaging_moves
+            & _union(self.moves_by_type[t] for t in s.types)
+            for s in self.species
+        ]
+
+        # Indices sorted by decreasing value, ties broken by dex order.
+        self.species_by_stat: Dict[str, List[int]] = {
+            stat: sorted(
+                range(len(self.species)),
+                key=lambda i, stat=stat: -getattr(self.species[i], stat),
+            )
+            for stat in BASE_STATS
+        }
+        self.moves_by_power: List[int] = sorted(
+            (m.index for m in self.moves if isinstance(m, DamagingMove)),
+            key=lambda i: -self.moves[i].power,
+        )
+        self.power_at_least: Dict[int, int] = {}
+
+    def _by_effectiveness(self, predicate: Callable[[float], bool]) -> Dict[Type, int]:
+        return {
+            t: _union(
+                1 << s.index
+                for s in self.species
+                if predicate(s.attack_effectiveness(t))
+            )
+            for t in Type
+        }
+
+    def moves_with_power(self, minimum: int) -> int:
+        """Produces the mask of damaging moves with at least the given power."""
+        mask = self.power_at_least.get(minimum)
+        if mask is None:
+            mask = self.power_at_least[minimum] = _union(
+                1 << i for i in self.moves_by_power if self.moves[i].power >= minimum
+            )
+        return mask
+
+
+@functools.lru_cache(maxsize=None)
+def dex_index() -> DexIndex:
+    """Produces the shared DexIndex over the loaded Movedex and Pokedex."""
+    return DexIndex(*load_dex())
+
+
+class SpeciesQuery:
+    """An immutable, chainable filter over the species of the Pokedex."""
+
+    def __init__(self, index: DexIndex, mask: int):
+        self._index = index
+        self._mask = mask
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({[str(item) for item in self.all()]})"
+
+    def __iter__(self) -> Iterator[PokemonSpecies]:
+        return iter(self.all())
+
+    def __len__(self) -> int:
+        return bin(self._mask).count("1")
+
+    def __contains__(self, species: PokemonSpecies) -> bool:
+        return bool(self._mask >> species.index & 1)
+
+    def _filter(self, mask: int) -> "SpeciesQuery":
+        return SpeciesQuery(self._index, self._mask & mask)
+
+    @property
+    def mask(self) -> int:
+        return self._mask
+
+    def of_type(self, species_type: Type) -> "SpeciesQuery":
+        return self._filter(self._index.species_by_type[species_type])
+
+    def immune_to(self, attacking_type: Type) -> "SpeciesQuery":
+        return self._filter(self._index.immune[attacking_type])
+
+    def resists(self, attacking_type: Type) -> "SpeciesQuery":
+        """Keeps species that take reduced, but not zero, damage from a type."""
+        return self._filter(self._index.resistant[attacking_type])
+
+    def weak_to(self, attacking_type: Type) -> "SpeciesQuery":
+        return self._filter(self._index.weak[attacking_type])
+
+    def learns(self, *moves: Move) -> "SpeciesQuery":
+        """Keeps species that learn every one of the given moves."""
+        mask = self._mask
+        for move in moves:
+            mask &= self._index.learners[move.index]
+        return SpeciesQuery(self._index, mask)
+
+    def learns_any(self, moves: "MoveQuery") -> "SpeciesQuery":
+        """Keeps species that learn at least one of the moves in a MoveQuery."""
+        learnsets = self._index.learnsets
+        return SpeciesQuery(
+            self._index,
+            _union(1 << i for i in _bits(self._mask) if learnsets[i] & moves.mask),
+        )
+
+    def learns_stab_move(self) -> "SpeciesQuery":
+        """Keeps species that learn a damaging move sharing one of their types."""
+        stab_moves = self._index.stab_moves
+        return SpeciesQuery(
+            self._index, _union(1 << i for i in _bits(self._mask) if stab_moves[i])
+        )
+
+    def allowed_by(self, ruleset: Ruleset) -> "SpeciesQuery":
+        return self._filter(ruleset.species_mask)
+
+    def where(self, predicate: Callable[[PokemonSpecies], bool]) -> "SpeciesQuery":
+        """Keeps species satisfying an arbitrary predicate, by linear scan."""
+        species = self._index.species
+        return SpeciesQuery(
+            self._index,
+            _union(1 << i for i in _bits(self._mask) if predicate(species[i])),
+        )
+
+    def all(self) -> List[PokemonSpecies]:
+        """Produces the matching species, in Pokedex order."""
+        return [self._index.species[i] for i in _bits(self._mask)]
+
+    def top(self, n: int, stat: str) -> List[PokemonSpecies]:
+        """Produces the n matching species with the highest of a base stat.
+
+        Args:
+            n: The maximum number of species to produce.
+            stat: The base stat to sort by, one of BASE_STATS.
+
+        Returns:
+            Up to n species in decreasing order of the stat, with ties broken
+            by Pokedex order.
+        """
+        result: List[PokemonSpecies] = []
+        for i in self._index.species_by_stat[stat]:
+            if len(result) == n:
+                break
+            if self._mask >> i & 1:
+                result.append(self._index.species[i])
+        return result
+
+
+class MoveQuery:
+    """An immutable, chainable filter over the moves of the Movedex."""
+
+    def __init__(self, index: DexIndex, mask: int):
+        self._index = index
+        self._mask = mask
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({[str(item) for item in self.all()]})"
+
+    def __iter__(self) -> Iterator[Move]:
+        return iter(self.all())
+
+    def __len__(self) -> int:
+        return bin(self._mask).count("1")
+
+    def __contains__(self, move: Move) -> bool:
+        return bool(self._mask >> move.index & 1)
+
+    def _filter(self, mask: int) -> "MoveQuery":
+        return MoveQuery(self._index, self._mask & mask)
+
+    @property
+    def mask(self) -> int:
+        return self._mask
+
+    def of_type(self, move_type: Type) -> "MoveQuery":
+        return self._filter(self._index.moves_by_type[move_type])
+
+    def of_class(self, move_class: MoveClass) -> "MoveQuery":
+        """Keeps moves that are instances of a Move class or its subclasses."""
+        return self._filter(self._index.moves_by_class.get(move_class, 0))
+
+    def with_power(self, minimum: int) -> "MoveQuery":
+        """Keeps damaging moves with at least the given base power."""
+        return self._filter(self._index.moves_with_power(minimum))
+
+    def learnable_by(self, species: PokemonSpecies) -> "MoveQuery":
+        return self._filter(self._index.learnsets[species.index])
+
+    def stab_for(self, species: PokemonSpecies) -> "MoveQuery":
+        """Keeps damaging moves the species learns that share one of its types."""
+        return self._filter(self._index.stab_moves[species.index])
+
+    def allowed_by(self, ruleset: Ruleset) -> "MoveQuery":
+        return self._filter(ruleset.move_mask)
+
+    def where(self, predicate: Callable[[Move], bool]) -> "MoveQuery":
+        """Keeps moves satisfying an arbitrary predicate, by linear scan."""
+        moves = self._index.moves
+        return MoveQuery(
+            self._index,
+            _union(1 << i for i in _bits(self._mask) if predicate(moves[i])),
+        )
+
+    def all(self) -> List[Move]:
+        """Produces the matching moves, in Movedex order."""
+        return [self._index.moves[i] for i in _bits(self._mask)]
+
+    def top(self, n: int) -> List[Move]:
+        """Produces the n matching damaging moves with the highest base power."""
+        result: List[Move] = []
+        for i in self._index.moves_by_power:
+            if len(result) == n:
+                break
+            if self._mask >> i & 1:
+                result.append(self._index.moves[i])
+        return result
+
+
+def species_query(index: Optional[DexIndex] = None) -> SpeciesQuery:
+    """Starts a query over every species in the Pokedex."""
+    index = dex_index() if index is None else index
+    return SpeciesQuery(index, index.all_species)
+
+
+def move_query(index: Optional[DexIndex] = None) -> MoveQuery:
+    """Starts a query over every move in the Movedex."""
+    index = dex_index() if index is None else index
+    return MoveQuery(index, index.all_moves)
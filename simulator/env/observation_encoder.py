@@ -0,0 +1,253 @@
+"""An observation encoder for full 6v6 battles, writing into NumPy buffers.
+
+Each species and move is described by a fixed row of features (base stats and
+types, or type, power, accuracy, priority, PP and kind of effect), which are
+computed once for the whole dex and copied into observations by slice. How
+well each active Pokemon's moves fare against the opposing active species is
+looked up in the matchup tensor (see simulator.dex.matchups).
+
+An encoder also remembers, for every row it has written, which battle it
+encoded there and what it wrote. Encoding the same battle into the same row
+again only rewrites what has changed: the species rows of both teams are only
+written when a battle is first encoded, an active Pokemon's move rows only
+when it switches, their matchups only when either active Pokemon switches,
+and team HP and status only when they change. Rows that an
+encoder writes to must not be modified by anything else.
+"""
+
+import functools
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from simulator.battle.battle import Battle, Player
+from simulator.battle.battling_pokemon import BattlingPokemon
+from simulator.dex.cache import load_dex
+from simulator.dex.matchups import load_matchups
+from simulator.moves.damaging_move import DamagingMove
+from simulator.moves.move import Move
+from simulator.pokemon.pokemon_species import PokemonSpecies
+from simulator.status import Status
+from simulator.type import Type
+
+_TYPES = list(Type)
+_STATUSES = list(Status)
+
+SPECIES_FEATURES = 5 + len(_TYPES)
+MOVE_FEATURES = len(_TYPES) + 7
+
+# The layout of each side's block, from the encoding player's side first.
+_ACTIVE_SLOT = 0
+_MODIFIERS = _ACTIVE_SLOT + 6
+_VOLATILES = _MODIFIERS + 6
+_MOVES = _VOLATILES + 7
+# Move features, the fraction of PP left and the matchup.
+_MOVE_SIZE = MOVE_FEATURES + 2
+_TEAM = _MOVES + 4 * _MOVE_SIZE
+# Presence, species features, HP fraction and one-hot status.
+_MEMBER_SIZE = 1 + SPECIES_FEATURES + 1 + len(_STATUSES)
+_SIDE_SIZE = _TEAM + 6 * _MEMBER_SIZE
+_MAX_ROWS = 4096
+
+
+def species_features(species: PokemonSpecies) -> np.ndarray:
+    """Describes a species by its base stats divided by 255 and its types."""
+    features = np.zeros(SPECIES_FEATURES)
+    features[:5] = (
+        species.base_hp,
+        species.base_atk,
+        species.base_def,
+        species.base_spe,
+        species.base_spc,
+    )
+    features[:5] /= 255
+    for species_type in species.types:
+        features[5 + _TYPES.index(species_type)] = 1.0
+    return features
+
+
+def move_features(move: Move) -> np.ndarray:
+    """Describes a move by its type, power, accuracy, priority, PP and effects.
+
+    Power is divided by 255, accuracy is the chance to hit (1 for moves that
+    never miss) and PP is divided by 40. The last three features flag damaging
+    moves, moves inflicting a status and moves modifying a stat.
+    """
+    features = np.zeros(MOVE_FEATURES)
+    features[_TYPES.index(move.move_type)] = 1.0
+    offset = len(_TYPES)
+    features[offset] = getattr(move, "power", 0) / 255
+    features[offset + 1] = 1.0 if move.accuracy is None else move.accuracy / 255
+    features[offset + 2] = move.priority
+    features[offset + 3] = move.pp / 40
+    features[offset + 4] = isinstance(move, DamagingMove)
+    features[offset + 5] = getattr(move, "status", None) is not None
+    features[offset + 6] = getattr(move, "stat", None) is not None
+    return features
+
+
+@functools.lru_cache(maxsize=None)
+def _feature_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """Produces the features of every species and move, by dex index."""
+    movedex, pokedex = load_dex()
+    species_table = np.zeros((len(pokedex), SPECIES_FEATURES))
+    for species in pokedex.values():
+        species_table[species.index] = species_features(species)
+    move_table = np.zeros((len(movedex), MOVE_FEATURES))
+    for move in movedex.values():
+        move_table[move.index] = move_features(move)
+    return species_table, move_table
+
+
+class _Row:
+    """What an encoder last wrote into a row of a buffer."""
+
+    __slots__ = ("buffer", "battle", "player", "actives", "members")
+
+    def __init__(self, buffer: Any, battle: Battle, player: Player):
+        self.buffer = buffer
+        self.battle = weakref.ref(battle)
+        self.player = player
+        self.actives: List[Optional[BattlingPokemon]] = [None, None]
+        self.members: List[List[Optional[Tuple[int, Status]]]] = [
+            [None] * 6,
+            [None] * 6,
+        ]
+
+
+class ObservationEncoder:
+    """Encodes both full teams and active Pokemon, as seen by one player.
+
+    For the player's side, then the opponent's: the one-hot team slot of the
+    active Pokemon, its stat modifiers divided by 6, its volatile conditions
+    (confusion, Leech Seed, Toxic, Reflect, Light Screen, Focus Energy and
+    Mist), then the features of each of its moves with the fraction of PP
+    left and one over the hits the move is expected to need to knock out the
+    opposing active species (0 if it deals no damage), then for each team slot a presence flag, the species' features, the
+    fraction of HP left and its one-hot status. Empty slots are zeros.
+    """
+
+    size = 2 * _SIDE_SIZE
+
+    def __init__(self):
+        self._species_table, self._move_table = _feature_tables()
+        self._hits_to_ko = load_matchups().hits_to_ko
+        # Keyed by the address of each row written.
+        self._rows: Dict[int, _Row] = {}
+
+    def reset(self):
+        """Forgets every row written, so the next encodings are written in full."""
+        self._rows.clear()
+
+    def _species_row(self, species: PokemonSpecies) -> np.ndarray:
+        if species.index < 0:
+            return species_features(species)
+        return self._species_table[species.index]
+
+    def _move_row(self, move: Move) -> np.ndarray:
+        if move.index < 0:
+            return move_features(move)
+        return self._move_table[move.index]
+
+    def _matchup(
+        self, attacker: PokemonSpecies, move: Move, defender: PokemonSpecies
+    ) -> float:
+        """Produces one over the hits the move needs to knock the defender out."""
+        if attacker.index < 0 or move.index < 0 or defender.index < 0:
+            return 0.0
+        return 1.0 / self._hits_to_ko[attacker.index, move.index, defender.index]
+
+    def _row(self, battle: Battle, player: Player, out: np.ndarray) -> _Row:
+        """Finds what was last written to the row, clearing it if it was stale."""
+        buffer = out if out.base is None else out.base
+        address = out.__array_interface__["data"][0]
+        row = self._rows.get(address)
+        if (
+            row is not None
+            and row.buffer() is buffer
+            and row.battle() is battle
+            and row.player is player
+        ):
+            return row
+        if len(self._rows) >= _MAX_ROWS:
+            self._rows.clear()
+        row = self._rows[address] = _Row(weakref.ref(buffer), battle, player)
+        out[:] = 0.0
+        for side, offset in ((player, 0), (player.opponent, _SIDE_SIZE)):
+            for i, pokemon in enumerate(battle.teams[side]):
+                start = offset + _TEAM + i * _MEMBER_SIZE
+                out[start] = 1.0
+                out[start + 1 : start + 1 + SPECIES_FEATURES] = self._species_row(
+                    pokemon.species
+                )
+        return row
+
+    def encode(self, battle: Battle, player: Player, out: np.ndarray):
+        """Writes the battle, as seen by the player, into a row of an array.
+
+        Args:
+            battle: The Battle to encode.
+            player: The Player whose side is encoded first.
+            out: A (size,) array, e.g. a row of a batch of observations.
+        """
+        row = self._row(battle, player, out)
+        switched = False
+        for s, (side, offset) in enumerate(
+            ((player, 0), (player.opponent, _SIDE_SIZE))
+        ):
+            active = battle.actives[side]
+            pokemon = active.pokemon
+            if row.actives[s] is not pokemon:
+                row.actives[s] = pokemon
+                switched = True
+                out[offset + _ACTIVE_SLOT : offset + _MODIFIERS] = 0.0
+                out[offset + _ACTIVE_SLOT + battle.team_cursors[side]] = 1.0
+                out[offset + _MOVES : offset + _TEAM] = 0.0
+                for i, move in enumerate(pokemon.moves):
+                    start = offset + _MOVES + i * _MOVE_SIZE
+                    out[start : start + MOVE_FEATURES] = self._move_row(move)
+
+            out[offset + _MODIFIERS : offset + _MOVES] = active.stat_modifiers + [
+                active.confused,
+                active.leech_seed,
+                active.toxic_counter is not None,
+                active.reflect,
+                active.light_screen,
+                active.focus_energy,
+                active.mist,
+            ]
+            out[offset + _MODIFIERS : offset + _VOLATILES] /= 6
+            for i, (move, pp) in enumerate(zip(pokemon.moves, pokemon.pp)):
+                out[offset + _MOVES + i * _MOVE_SIZE + MOVE_FEATURES] = pp / move.pp
+
+            members = row.members[s]
+            for i, member in enumerate(battle.teams[side]):
+                state = (member.hp, member.status)
+                if members[i] == state:
+                    continue
+                members[i] = state
+                start = offset + _TEAM + i * _MEMBER_SIZE + 1 + SPECIES_FEATURES
+                out[start] = member.hp / member.max_hp
+                out[start + 1 : start + 1 + len(_STATUSES)] = 0.0
+                out[start + member.status.value] = 1.0
+
+        if switched:
+            for s, offset in enumerate((0, _SIDE_SIZE)):
+                attacker = row.actives[s].species
+                defender = row.actives[1 - s].species
+                for i, move in enumerate(row.actives[s].moves):
+                    out[
+                        offset + _MOVES + i * _MOVE_SIZE + MOVE_FEATURES + 1
+                    ] = self._matchup(attacker, move, defender)
+
+    def encode_batch(self, battles: Sequence[Battle], player: Player, out: np.ndarray):
+        """Writes each battle, as seen by the player, into a row of an array.
+
+        Args:
+            battles: The Battles to encode.
+            player: The Player whose side is encoded first.
+            out: A (len(battles), size) array, e.g. a slice of a larger batch.
+        """
+        for battle, row in zip(battles, out):
+            self.encode(battle, player, row)
@@ -0,0 +1,234 @@
+"""A vectorized, step-driven environment of many battles, for training agents.
+
+Battle.play pulls every decision from its agents, one battle at a time, so a
+learning policy cannot see the decisions of many battles at once. VecBattleEnv
+inverts that control: it holds N battles in which the learner plays P1, and
+each call to step takes one Action per battle as a NumPy array, plays each
+battle forward to P1's next decision (asking the opponent Agent for P2's
+decisions along the way), and returns every battle's observation, reward, done
+flag and valid-action mask as NumPy arrays, so that a policy can be evaluated
+on the whole batch at once.
+
+Finished battles are replaced by new ones automatically. The observation
+returned for a finished battle is the first observation of its replacement,
+and its result is kept in results.
+"""
+
+from typing import List, Optional, Protocol, Tuple
+
+import numpy as np
+
+import simulator.ruleset
+from simulator.agents.agent import Agent
+from simulator.agents.random_agent import RandomAgent
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player, Result
+from simulator.battle.deadline import Deadline
+from simulator.env.observation_encoder import ObservationEncoder
+from simulator.pokemon.team import Team
+from simulator.ruleset import Ruleset
+from simulator.status import Status
+from simulator.team_generators.random_battle_team_generator import (
+    RandomBattleTeamGenerator,
+)
+from simulator.team_generators.team_generator import (
+    NoMorePossibleTeamsException,
+    TeamGenerator,
+)
+
+
+class Encoder(Protocol):
+    """Writes a battle as seen by one player into a row of an array."""
+
+    size: int
+
+    def encode(self, battle: Battle, player: Player, out: np.ndarray):
+        ...
+
+
+class BasicEncoder:
+    """Encodes each side's active Pokemon and the HP left in each team.
+
+    For the player, then the opponent: the active Pokemon's HP fraction, stat
+    modifiers divided by 6, one-hot status and the fraction of PP left in each
+    move slot, followed by the HP fraction of each team slot (0 if empty).
+    """
+
+    _SIDE_SIZE = 1 + 6 + len(Status) + 4 + 6
+    size = 2 * _SIDE_SIZE
+
+    def encode(self, battle: Battle, player: Player, out: np.ndarray):
+        out[:] = 0.0
+        for side, offset in ((player, 0), (player.opponent, self._SIDE_SIZE)):
+            active = battle.actives[side]
+            out[offset] = active.hp / active.max_hp
+            out[offset + 1 : offset + 7] = active.stat_modifiers
+            out[offset + 1 : offset + 7] /= 6
+            out[offset + 7 + active.status.value - 1] = 1.0
+            moves_offset = offset + 7 + len(Status)
+            for i, (move, pp) in enumerate(zip(active.moves, active.pp)):
+                out[moves_offset + i] = pp / move.pp
+            team_offset = moves_offset + 4
+            for i, pokemon in enumerate(battle.teams[side]):
+                out[team_offset + i] = pokemon.hp / pokemon.max_hp
+
+
+class ExternalAgent(Agent):
+    """Stands in for a side whose decisions are passed in from outside."""
+
+    def request_action(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        raise RuntimeError(f"{player}'s decisions must be passed to Battle.advance.")
+
+
+_REWARDS = {Result.P1_WIN: 1.0, Result.P2_WIN: -1.0, Result.DRAW: 0.0}
+
+
+class VecBattleEnv:
+    """N battles stepped together, with the learner playing P1 in each."""
+
+    def __init__(
+        self,
+        num_envs: int,
+        opponent: Optional[Agent] = None,
+        team_generator: Optional[TeamGenerator] = None,
+        ruleset: Optional[Ruleset] = None,
+        encoder: Optional[Encoder] = None,
+    ):
+        """Sets up the environment. Battles are started by reset.
+
+        Args:
+            num_envs: The number of battles.
+            opponent: The Agent playing P2 in every battle. Defaults to a
+              RandomAgent.
+            team_generator: Generates both teams of each battle, and is reset
+              when it runs out of teams. Defaults to a
+              RandomBattleTeamGenerator for the ruleset.
+            ruleset: The rules of every battle. Defaults to FULL_RULESET.
+            encoder: Encodes each battle into a row of the observations.
+              Defaults to an ObservationEncoder.
+        """
+        self.num_envs = num_envs
+        self.ruleset = simulator.ruleset.FULL_RULESET if ruleset is None else ruleset
+        self.opponent = RandomAgent() if opponent is None else opponent
+        self.team_generator = (
+            RandomBattleTeamGenerator(self.ruleset)
+            if team_generator is None
+            else team_generator
+        )
+        self.encoder = ObservationEncoder() if encoder is None else encoder
+        self._learner = ExternalAgent()
+
+        self.battles: List[Battle] = []
+        # The result of the last battle to finish in each slot.
+        self.results: List[Optional[Result]] = [None] * num_envs
+        self.observations = np.zeros((num_envs, self.encoder.size), np.float32)
+        self.action_masks = np.zeros((num_envs, len(Action)), bool)
+        self.rewards = np.zeros(num_envs, np.float32)
+        self.dones = np.zeros(num_envs, bool)
+
+    def _team(self) -> Team:
+        try:
+            return self.team_generator.generate_team()
+        except NoMorePossibleTeamsException:
+            self.team_generator.reset()
+            return self.team_generator.generate_team()
+
+    def _new_battle(self) -> Battle:
+        return Battle(
+            self._team(), self._team(), self._learner, self.opponent, self.ruleset
+        )
+
+    def _play_opponent(self, battle: Battle):
+        """Plays the battle until it ends or P1 has a decision to make."""
+        while not battle.finished:
+            if battle.choices(Player.P1):
+                return
+            battle.advance(None, self._opponent_choice(battle))
+
+    def _opponent_choice(self, battle: Battle) -> Optional[Action]:
+        choices = battle.choices(Player.P2)
+        if not choices:
+            return None
+        if battle.pending_switches():
+            return self.opponent.request_switch(battle, Player.P2, choices)
+        return self.opponent.request_action(battle, Player.P2, choices)
+
+    def _observe(self, i: int):
+        battle = self.battles[i]
+        self.encoder.encode(battle, Player.P1, self.observations[i])
+        mask = self.action_masks[i]
+        mask[:] = False
+        mask[battle.choices(Player.P1)] = True
+
+    def _outputs(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.observations.copy(), self.action_masks.copy()
+
+    def reset(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Starts a new battle in every slot.
+
+        Returns:
+            The (num_envs, encoder.size) observations, and the (num_envs, 10)
+            masks of P1's valid Actions.
+        """
+        self.battles = [self._new_battle() for _ in range(self.num_envs)]
+        self.results = [None] * self.num_envs
+        for i in range(self.num_envs):
+            self._observe(i)
+        return self._outputs()
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Plays each battle's next decision, with the given Actions for P1.
+
+        Args:
+            actions: A (num_envs,) array of Action values, each valid under
+              the last returned action mask.
+
+        Returns:
+            The observations; rewards of 1 for a win, -1 for a loss and 0
+            otherwise; whether each battle finished, in which case it has been
+            replaced; and the masks of P1's valid Actions.
+
+        Raises:
+            ValueError: An Action is invalid, or reset has not been called, in
+              which case no battle is advanced.
+        """
+        actions = np.asarray(actions)
+        if not self.battles:
+            raise ValueError("reset must be called before step.")
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Expected {self.num_envs} actions, got {actions.shape}.")
+        if not np.issubdtype(actions.dtype, np.integer):
+            raise ValueError(f"Actions must be integers, got {actions.dtype}.")
+        # Every action is checked before any battle is advanced, so that an
+        # invalid one leaves the whole batch as it was.
+        valid = (actions >= 0) & (actions < len(Action))
+        valid[valid] = self.action_masks[valid.nonzero()[0], actions[valid]]
+        if not valid.all():
+            i = int(np.argmin(valid))
+            raise ValueError(f"Action {actions[i]} is not valid in battle {i}.")
+
+        self.rewards[:] = 0.0
+        self.dones[:] = False
+        for i, action in enumerate(actions.tolist()):
+            battle = self.battles[i]
+            battle.advance(Action(action), self._opponent_choice(battle))
+            self._play_opponent(battle)
+            if battle.finished:
+                result = Result.DRAW if battle.result is None else battle.result
+                self.results[i] = result
+                self.rewards[i] = _REWARDS[result]
+                self.dones[i] = True
+                self.battles[i] = self._new_battle()
+            self._observe(i)
+
+        observations, action_masks = self._outputs()
+        return observations, self.rewards.copy(), self.dones.copy(), action_masks
@@ -100,11 +100,43 @@ class DamagingMove(Move):
             else 255
         )
 
+        return self.damage_formula(
+            level,
+            self.power,
+            effective_attack,
+            effective_defense,
+            stab,
+            type_effectiveness,
+            rand,
+        )
+
+    @staticmethod
+    def damage_formula(
+        level: int,
+        power: int,
+        attack: float,
+        defense: float,
+        stab: float,
+        type_effectiveness: float,
+        rand: float,
+    ) -> int:
+        """Produces the damage of a hit, by the Generation I damage formula.
+
+        Args:
+            level: The attacker's level, doubled for a critical hit.
+            power: The move's base power.
+            attack: The attacker's effective Attack or Special.
+            defense: The target's effective Defense or Special.
+            stab: 1.5 if the move has the same type as the attacker, else 1.
+            type_effectiveness: The move's type effectiveness on the target.
+            rand: The random factor, between 217 and 255.
+
+        Returns:
+            The damage (in HP) of the hit.
+        """
         adjusted_level = (2 * level) / 5 + 2
-        attack_defense_ratio = effective_attack / effective_defense
-        unmodified_damage = (
-            adjusted_level * self.power * attack_defense_ratio
-        ) / 50 + 2
+        attack_defense_ratio = attack / defense
+        unmodified_damage = (adjusted_level * power * attack_defense_ratio) / 50 + 2
 
         return int(unmodified_damage * stab * type_effectiveness * rand) // 255
 
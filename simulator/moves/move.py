@@ -56,6 +56,8 @@ class Move(metaclass=ABCMeta):
         self.move_type = Type[move_type.upper()]
         self.accuracy = None if accuracy is None else (accuracy * 255) // 100
         self.priority = priority
+        # Assigned by the Movedex, which indexes moves by position.
+        self.index = -1
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, Move):
@@ -65,6 +67,13 @@ class Move(metaclass=ABCMeta):
     def __hash__(self) -> int:
         return hash(self.name)
 
+    def __reduce_ex__(self, protocol):
+        # Moves from the Movedex are pickled by name, so that pickled teams and
+        # battles stay small and unpickle to the Movedex's own objects.
+        if self.index < 0:
+            return super().__reduce_ex__(protocol)
+        return _from_movedex, (self.name,)
+
     def __str__(self):
         return self.name
 
@@ -111,3 +120,10 @@ class Move(metaclass=ABCMeta):
             target: The Pokemon targeted by this move.
         """
         pass
+
+
+def _from_movedex(name: str) -> Move:
+    # pylint: disable=import-outside-toplevel
+    from simulator.dex.cache import load_dex
+
+    return load_dex()[0][name]
@@ -54,6 +54,10 @@ class PokemonSpecies:
             else [self.primary_type, self.secondary_type]
         )
 
+        # Assigned by the Pokedex, which indexes species and moves by position.
+        self.index = -1
+        self.learnset_mask = 0
+
         self._effectivenesses = {
             attacking_type: prod(
                 get_attack_effectiveness(attacking_type, own_type)
@@ -70,6 +74,13 @@ class PokemonSpecies:
     def __hash__(self) -> int:
         return hash((self.name, self.dex_num))
 
+    def __reduce_ex__(self, protocol):
+        # Species from the Pokedex are pickled by name, along with their whole
+        # movesets, so that pickled teams and battles stay small.
+        if self.index < 0:
+            return super().__reduce_ex__(protocol)
+        return _from_pokedex, (self.name,)
+
     def __str__(self):
         return self.name
 
@@ -116,3 +127,10 @@ class PokemonSpecies:
         if not focus_energy:
             return min(8 * floor(self.base_spe / 2), 255)
         return 4 * floor(self.base_spe / 4)
+
+
+def _from_pokedex(name: str) -> PokemonSpecies:
+    # pylint: disable=import-outside-toplevel
+    from simulator.dex.cache import load_dex
+
+    return load_dex()[1][name]
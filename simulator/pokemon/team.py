@@ -0,0 +1,84 @@
+"""An immutable team of Pokemon, which remembers which rulesets allow it."""
+
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Tuple, overload
+
+from simulator.dex.movedex import move_mask
+from simulator.dex.pokedex import species_mask
+from simulator.pokemon.party_pokemon import PartyPokemon
+
+if TYPE_CHECKING:
+    from simulator.ruleset import Ruleset
+
+
+class Team:
+    """A fixed sequence of PartyPokemon, with precomputed legality bitmasks.
+
+    Validity is computed once per Ruleset and then memoized, so a Team can be
+    reused across any number of Battles without being validated again. The
+    members themselves must not be modified after the Team is created.
+    """
+
+    def __init__(
+        self, members: Iterable[PartyPokemon], valid_for: Iterable["Ruleset"] = ()
+    ):
+        """Creates a team from its members.
+
+        Args:
+            members: The team's Pokemon, in order.
+            valid_for: Rulesets the team is already known to be valid under,
+              e.g. because its generator only produces valid teams.
+        """
+        self._members: Tuple[PartyPokemon, ...] = tuple(members)
+        self._species_mask = species_mask(p.species for p in self._members)
+        self._move_mask = move_mask(m for p in self._members for m in p.moves)
+        self._validity: Dict["Ruleset", bool] = dict.fromkeys(valid_for, True)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self._members)})"
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self) -> Iterator[PartyPokemon]:
+        return iter(self._members)
+
+    @overload
+    def __getitem__(self, index: int) -> PartyPokemon:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Tuple[PartyPokemon, ...]:
+        ...
+
+    def __getitem__(self, index):
+        return self._members[index]
+
+    @property
+    def members(self) -> Tuple[PartyPokemon, ...]:
+        return self._members
+
+    @property
+    def species_mask(self) -> int:
+        """The bitmask of the Pokedex indices of every member's species."""
+        return self._species_mask
+
+    @property
+    def move_mask(self) -> int:
+        """The bitmask of the Movedex indices of every move any member knows."""
+        return self._move_mask
+
+    def is_valid(self, ruleset: "Ruleset") -> bool:
+        """Checks whether this team may be used under the given ruleset.
+
+        Args:
+            ruleset: The ruleset to check against.
+
+        Returns:
+            Whether the team is valid, as memoized from the first check.
+        """
+        valid = self._validity.get(ruleset)
+        if valid is None:
+            valid = self._validity[ruleset] = ruleset.masks_are_valid(
+                len(self._members), self._species_mask, self._move_mask
+            )
+        return valid
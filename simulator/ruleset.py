@@ -2,24 +2,31 @@
 
 import dataclasses
 import warnings
-from typing import List, Optional, Set
+from typing import FrozenSet, Iterable, Optional, Union
 
-from simulator.dex.movedex import MOVEDEX
-from simulator.dex.pokedex import POKEDEX
+import simulator.dex.movedex
+import simulator.dex.pokedex
 from simulator.moves.move import Move
 from simulator.pokemon.party_pokemon import PartyPokemon
 from simulator.pokemon.pokemon_species import PokemonSpecies
+from simulator.pokemon.team import Team
 
 
 @dataclasses.dataclass(frozen=True)
 class Ruleset:
-    """A set of parameters specifying the rules for a Battle."""
+    """A set of parameters specifying the rules for a Battle.
 
-    pokedex: Set[PokemonSpecies] = dataclasses.field(
-        default_factory=lambda: set(POKEDEX.values())
+    The allowed species and moves are stored as bitmasks over the Pokedex and
+    Movedex indices (see simulator.dex.pokedex.species_mask and
+    simulator.dex.movedex.move_mask), so that rulesets are cheap to build, hash
+    and compare, and legality checks are a few integer operations.
+    """
+
+    species_mask: int = dataclasses.field(
+        default_factory=lambda: simulator.dex.pokedex.full_species_mask()
     )
-    movedex: Set[Move] = dataclasses.field(
-        default_factory=lambda: set(MOVEDEX.values())
+    move_mask: int = dataclasses.field(
+        default_factory=lambda: simulator.dex.movedex.full_move_mask()
     )
     max_team_size: int = 6
     max_turns: Optional[int] = 1000
@@ -31,20 +38,22 @@ class Ruleset:
     species_clause: bool = True
     ohko_clause: bool = True
     evasion_clause: bool = True
+    decision_time_limit: Optional[float] = None
 
     def __post_init__(self):
-        if not set() < self.pokedex <= set(POKEDEX.values()):
+        if not 0 < self.species_mask <= simulator.dex.pokedex.full_species_mask():
             raise ValueError(
                 "Pokedex must be a non-empty subset of Generation 1 Pokedex."
             )
-        if not set() < self.movedex <= set(MOVEDEX.values()):
+        if not 0 < self.move_mask <= simulator.dex.movedex.full_move_mask():
             raise ValueError(
                 "Movedex must be a non-empty subset of Generation 1 Movedex."
             )
-        if (MOVEDEX["Struggle"] not in self.movedex) and self.use_pp:
+        struggle = simulator.dex.movedex.MOVEDEX["Struggle"]
+        if not self.move_mask >> struggle.index & 1 and self.use_pp:
             raise ValueError("Struggle must be usable if PP are being used.")
-        for pokemon in self.pokedex:
-            if not any(move in self.movedex for move in pokemon.moveset):
+        for pokemon in simulator.dex.pokedex.species_in_mask(self.species_mask):
+            if not pokemon.learnset_mask & self.move_mask:
                 warnings.warn(
                     f"{pokemon} cannot learn any of the allowed moves.", stacklevel=3
                 )
@@ -52,20 +61,77 @@ class Ruleset:
             raise ValueError("The maximum size of teams must be between 1 and 6.")
         if self.max_turns is not None and self.max_turns <= 0:
             raise ValueError("Maximum turns must be positive")
+        if self.decision_time_limit is not None and self.decision_time_limit <= 0:
+            raise ValueError("Decision time limit must be positive")
+
+    @classmethod
+    def from_dex(
+        cls,
+        pokedex: Optional[Iterable[PokemonSpecies]] = None,
+        movedex: Optional[Iterable[Move]] = None,
+        **kwargs,
+    ) -> "Ruleset":
+        """Creates a ruleset allowing the given species and moves.
+
+        Args:
+            pokedex: The allowed species, or the whole Pokedex if None.
+            movedex: The allowed moves, or the whole Movedex if None.
+            **kwargs: Any other Ruleset fields.
+        """
+        if pokedex is not None:
+            kwargs["species_mask"] = simulator.dex.pokedex.species_mask(pokedex)
+        if movedex is not None:
+            kwargs["move_mask"] = simulator.dex.movedex.move_mask(movedex)
+        return cls(**kwargs)
+
+    @property
+    def pokedex(self) -> FrozenSet[PokemonSpecies]:
+        return frozenset(simulator.dex.pokedex.species_in_mask(self.species_mask))
+
+    @property
+    def movedex(self) -> FrozenSet[Move]:
+        return frozenset(simulator.dex.movedex.moves_in_mask(self.move_mask))
 
     def pokemon_is_legal(self, pokemon: PartyPokemon):
-        if pokemon.species not in self.pokedex:
-            return False
-        if any(m not in self.movedex for m in pokemon.moves):
+        if not self.species_mask >> pokemon.species.index & 1:
             return False
-        return True
+        return not simulator.dex.movedex.move_mask(pokemon.moves) & ~self.move_mask
 
-    def team_is_valid(self, team: List[PartyPokemon]):
-        if not 1 <= len(team) <= self.max_team_size:
+    def masks_are_valid(self, size: int, species_mask: int, move_mask: int) -> bool:
+        """Checks a team's validity from its size and species and move bitmasks.
+
+        Args:
+            size: The number of Pokemon on the team.
+            species_mask: The bitmask of every species on the team.
+            move_mask: The bitmask of every move known by any team member.
+
+        Returns:
+            Whether a team with these properties is valid under this ruleset.
+        """
+        if not 1 <= size <= self.max_team_size:
             return False
-        if self.species_clause and (len(set(p.species for p in team)) < len(team)):
+        if self.species_clause and bin(species_mask).count("1") < size:
             return False
-        return all(self.pokemon_is_legal(p) for p in team)
+        return not (species_mask & ~self.species_mask or move_mask & ~self.move_mask)
+
+    def team_is_valid(self, team: Union[Team, Iterable[PartyPokemon]]):
+        if isinstance(team, Team):
+            return team.is_valid(self)
+        team = list(team)
+        return self.masks_are_valid(
+            len(team),
+            simulator.dex.pokedex.species_mask(p.species for p in team),
+            simulator.dex.movedex.move_mask(m for p in team for m in p.moves),
+        )
+
+
+FULL_RULESET: Ruleset
 
 
-FULL_RULESET = Ruleset()
+def __getattr__(name: str):
+    # FULL_RULESET needs the dex, so it is only built when first used.
+    if name == "FULL_RULESET":
+        ruleset = Ruleset()
+        globals()["FULL_RULESET"] = ruleset
+        return ruleset
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,322 @@
+"""Plays many battles between two agents in parallel and reports the results.
+
+Example:
+
+    python -m simulator.run random random -n 10000 --teams random -o out.jsonl
+
+Agents are given as a short name (see AGENTS) or as "module:callable", where
+the callable builds an Agent, optionally followed by comma-separated keyword
+arguments, e.g. "my_bots.search:SearchAgent,depth=2". Teams come from the
+random battle generator ("random"), or from a team corpus file ("PATH.corpus").
+
+Each battle's teams, random rolls and agents (see Agent.reseed) are seeded
+from the run's seed and the battle's number, so a run can be reproduced
+exactly, whatever the number of processes. Agents alternate sides between battles. Every battle's result is
+written to the output file as a line of JSON as soon as it finishes, and live
+throughput and win rates are reported on stderr.
+"""
+
+import argparse
+import ast
+import contextlib
+import dataclasses
+import importlib
+import json
+import multiprocessing
+import random
+import sys
+import time
+from math import sqrt
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import simulator.ruleset
+from simulator.agents.agent import Agent
+from simulator.battle.battle import Battle, Player
+from simulator.corpus.team_corpus import TeamCorpus
+from simulator.pokemon.team import Team
+from simulator.ruleset import Ruleset
+from simulator.team_generators.random_battle_team_generator import (
+    RandomBattleTeamGenerator,
+)
+
+AGENTS = {
+    "random": "simulator.agents.random_agent:RandomAgent",
+    "mcts": "simulator.agents.mcts_agent:MCTSAgent",
+    "expectiminimax": "simulator.agents.expectiminimax_agent:ExpectiminimaxAgent",
+    "maxdamage": "simulator.agents.max_damage_agent:MaxDamageAgent",
+}
+RULESETS: Dict[str, Callable[[], Ruleset]] = {
+    "full": lambda: simulator.ruleset.FULL_RULESET,
+}
+
+
+def load_agent(spec: str) -> Agent:
+    """Builds an Agent from a spec, e.g. "random" or "pkg.module:Class,k=v".
+
+    Keyword argument values are parsed as Python literals where possible, and
+    are otherwise passed as strings.
+    """
+    target, *options = spec.split(",")
+    target = AGENTS.get(target, target)
+    module_name, separator, attribute = target.partition(":")
+    if not separator:
+        raise ValueError(f"{spec} is not a known agent or a module:callable path.")
+    factory = getattr(importlib.import_module(module_name), attribute)
+
+    kwargs: Dict[str, Any] = {}
+    for option in options:
+        key, _, value = option.partition("=")
+        try:
+            kwargs[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            kwargs[key] = value
+    return factory(**kwargs)
+
+
+@dataclasses.dataclass(frozen=True)
+class RunConfig:
+    """Everything a worker process needs to play any battle of a run."""
+
+    agent_a: str
+    agent_b: str
+    teams: str
+    ruleset: Ruleset
+    seed: int
+    team_size: Optional[int] = None
+
+
+class _Worker:
+    """The agents and team source of a run, built once per worker process."""
+
+    def __init__(self, config: RunConfig):
+        self.config = config
+        self.agents = (load_agent(config.agent_a), load_agent(config.agent_b))
+        self.corpus: Optional[TeamCorpus] = None
+        self.generator: Optional[RandomBattleTeamGenerator] = None
+        if config.teams == "random":
+            self.generator = RandomBattleTeamGenerator(config.ruleset, config.team_size)
+        else:
+            self.corpus = TeamCorpus(config.teams)
+
+    def teams(self, battle_number: int) -> Tuple[Team, Team]:
+        seed = (self.config.seed, battle_number)
+        if self.generator is not None:
+            self.generator.reseed(seed)
+            team_a, team_b = self.generator.generate_teams(2)
+            return team_a, team_b
+        indices = random.Random(str(seed)).choices(range(len(self.corpus)), k=2)
+        return self.corpus[indices[0]], self.corpus[indices[1]]
+
+    def play(self, battle_number: int) -> Dict[str, Any]:
+        team_a, team_b = self.teams(battle_number)
+        random.seed(str((self.config.seed, battle_number)))
+        # Agents are kept between battles, so their own generators are
+        # reseeded too, or each battle would depend on those played before.
+        for agent in self.agents:
+            agent.reseed(random.getrandbits(64))
+        # Agent A plays P1 in even battles and P2 in odd ones.
+        a_side = Player(battle_number % 2)
+        if a_side == Player.P1:
+            battle = Battle(team_a, team_b, *self.agents, self.config.ruleset)
+        else:
+            battle = Battle(team_b, team_a, *reversed(self.agents), self.config.ruleset)
+        start = time.perf_counter()
+        winner, turns, _ = battle.play()
+        return {
+            "battle": battle_number,
+            "a_side": a_side.name,
+            "winner": None if winner is None else ("a" if winner == a_side else "b"),
+            "turns": turns,
+            "seconds": round(time.perf_counter() - start, 6),
+        }
+
+
+_worker: Optional[_Worker] = None
+
+
+def _init_worker(config: RunConfig):
+    global _worker  # pylint: disable=global-statement
+    _worker = _Worker(config)
+
+
+def _play(battle_number: int) -> Dict[str, Any]:
+    return _worker.play(battle_number)
+
+
+def default_chunksize(battles: int, processes: int) -> int:
+    """Picks how many battles to hand a worker at a time.
+
+    Larger chunks amortise inter-process overhead, but leave workers idle at
+    the end of a run while the last chunks finish. Aiming for about 16 chunks
+    per worker, capped at 64 battles so results keep streaming, balances the
+    two for battles that take around a millisecond.
+    """
+    return max(1, min(64, battles // (processes * 16)))
+
+
+def wilson_interval(
+    successes: float, trials: int, z: float = 1.96
+) -> Tuple[float, float]:
+    """Produces the Wilson score interval for a binomial proportion.
+
+    Args:
+        successes: The number of successes.
+        trials: The number of trials.
+        z: The standard normal quantile of the confidence level, 1.96 for 95%.
+
+    Returns:
+        The lower and upper bounds of the interval.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    proportion = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (proportion + z * z / (2 * trials)) / denominator
+    margin = (
+        z
+        * sqrt(proportion * (1 - proportion) / trials + z * z / (4 * trials * trials))
+        / denominator
+    )
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+class RunStats:
+    """Running totals of a run's results."""
+
+    def __init__(self):
+        self.battles = 0
+        self.wins = {"a": 0, "b": 0, None: 0}
+        self.turns = 0
+        self.started = time.perf_counter()
+
+    def add(self, result: Dict[str, Any]):
+        self.battles += 1
+        self.wins[result["winner"]] += 1
+        self.turns += result["turns"]
+
+    @property
+    def battles_per_second(self) -> float:
+        return self.battles / max(time.perf_counter() - self.started, 1e-9)
+
+    def summary(self) -> str:
+        if self.battles == 0:
+            return "0 battles"
+        low, high = wilson_interval(self.wins["a"], self.battles)
+        return (
+            f"{self.battles} battles, {self.battles_per_second:.1f}/s | "
+            f"A wins {self.wins['a'] / self.battles:.1%} "
+            f"(95% CI {low:.1%}-{high:.1%}), "
+            f"B wins {self.wins['b'] / self.battles:.1%}, "
+            f"draws {self.wins[None] / self.battles:.1%} | "
+            f"{self.turns / self.battles:.1f} turns on average"
+        )
+
+
+def run(
+    config: RunConfig,
+    battles: int,
+    processes: int,
+    chunksize: Optional[int] = None,
+    on_result: Optional[Callable[[Dict[str, Any], RunStats], None]] = None,
+) -> RunStats:
+    """Plays a run's battles over a process pool, in order of completion.
+
+    Args:
+        config: The run's agents, teams, ruleset and seed.
+        battles: The number of battles to play.
+        processes: The number of worker processes, or 1 to play in-process.
+        chunksize: Battles handed to a worker at a time. Defaults to
+          default_chunksize.
+        on_result: Called with each result, and the totals including it, as
+          soon as the battle finishes.
+
+    Returns:
+        The totals of every battle.
+    """
+    stats = RunStats()
+    if chunksize is None:
+        chunksize = default_chunksize(battles, processes)
+
+    results: Iterator[Dict[str, Any]]
+    if processes == 1:
+        worker = _Worker(config)
+        results = (worker.play(i) for i in range(battles))
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, _init_worker, (config,))
+        results = pool.imap_unordered(_play, range(battles), chunksize)
+
+    try:
+        for result in results:
+            stats.add(result)
+            if on_result is not None:
+                on_result(result, stats)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return stats
+
+
+def _reporter(output: Optional[TextIO], interval: float):
+    last_report = [0.0]
+
+    def on_result(result: Dict[str, Any], stats: RunStats):
+        if output is not None:
+            output.write(json.dumps(result) + "\n")
+            # Results survive the run being interrupted.
+            output.flush()
+        now = time.perf_counter()
+        if now - last_report[0] >= interval:
+            last_report[0] = now
+            print(f"\r{stats.summary()}", end="", file=sys.stderr, flush=True)
+
+    return on_result
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("agent_a", help="The first agent's spec.")
+    parser.add_argument("agent_b", help="The second agent's spec.")
+    parser.add_argument("-n", "--battles", type=int, default=1000)
+    parser.add_argument(
+        "--teams", default="random", help='"random", or a team corpus file.'
+    )
+    parser.add_argument("--team-size", type=int)
+    parser.add_argument("--ruleset", choices=sorted(RULESETS), default="full")
+    parser.add_argument("--max-turns", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "-p", "--processes", type=int, default=multiprocessing.cpu_count()
+    )
+    parser.add_argument("--chunksize", type=int)
+    parser.add_argument("-o", "--output", help="Write results here as JSON lines.")
+    args = parser.parse_args(argv)
+
+    ruleset = RULESETS[args.ruleset]()
+    if args.max_turns is not None:
+        ruleset = dataclasses.replace(ruleset, max_turns=args.max_turns)
+    config = RunConfig(
+        args.agent_a, args.agent_b, args.teams, ruleset, args.seed, args.team_size
+    )
+
+    output_file = (
+        contextlib.nullcontext()
+        if args.output is None
+        else open(args.output, "w", encoding="utf-8")
+    )
+    with output_file as output:
+        stats = run(
+            config,
+            args.battles,
+            args.processes,
+            args.chunksize,
+            _reporter(output, interval=0.5),
+        )
+    print(f"\r{stats.summary()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
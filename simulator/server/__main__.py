@@ -0,0 +1,34 @@
+"""Runs a BattleServer on a local TCP port or Unix socket."""
+
+import argparse
+import asyncio
+
+from simulator.server.battle_server import BattleServer
+
+
+async def serve(args: argparse.Namespace):
+    server = BattleServer(
+        max_battles=args.max_battles, max_connections=args.max_connections
+    )
+    if args.unix is not None:
+        listener = await server.start_unix(args.unix)
+    else:
+        listener = await server.start_tcp(args.host, args.port)
+    for sock in listener.sockets:
+        print(f"Serving battles on {sock.getsockname()}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--unix", help="Listen on this Unix socket path instead.")
+    parser.add_argument("--max-battles", type=int, default=1000)
+    parser.add_argument("--max-connections", type=int, default=2000)
+    asyncio.run(serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""An asyncio server hosting many concurrent battles over local sockets."""
+
+import asyncio
+import dataclasses
+import itertools
+from typing import Callable, Dict, List, Optional, Set
+
+from simulator.agents.agent import Agent
+from simulator.agents.async_agent import AsyncAgent
+from simulator.agents.random_agent import RandomAgent
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player
+from simulator.battle.deadline import Deadline
+from simulator.ruleset import Ruleset
+from simulator.server import protocol
+from simulator.team_generators.basic_rival_team_generator import BasicRivalTeamGenerator
+from simulator.team_generators.team_generator import TeamGenerator
+
+
+class ForfeitException(Exception):
+    pass
+
+
+class ConnectionClosedException(Exception):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class BattleFormat:
+    """How the server sets up a battle in one of the formats it offers."""
+
+    team_generator: Callable[[], TeamGenerator]
+    opponent: Callable[[], Agent]
+    ruleset: Optional[Ruleset] = None
+
+
+DEFAULT_FORMATS = {
+    "gen1basic": BattleFormat(BasicRivalTeamGenerator, RandomAgent),
+}
+
+_FORFEIT = object()
+_CLOSED = object()
+
+
+class RemoteAgent(AsyncAgent):
+    """An agent whose decisions are sent by a client over a connection."""
+
+    def __init__(self, connection: "_Connection"):
+        self._connection = connection
+
+    async def request_action_async(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        return await self._connection.request_choice(
+            battle, player, choices, False, deadline
+        )
+
+    async def request_switch_async(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Action:
+        return await self._connection.request_choice(
+            battle, player, choices, True, deadline
+        )
+
+
+class _Connection:
+    """A client connection, which may be playing at most one battle at a time."""
+
+    def __init__(
+        self,
+        server: "BattleServer",
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        name: str,
+    ):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.name = name
+        self.battle_task: Optional["asyncio.Task[None]"] = None
+        self._choices: "asyncio.Queue[object]" = asyncio.Queue(maxsize=1)
+        self._rqids = itertools.count(1)
+        self._awaiting_choice = False
+
+    async def send(self, lines: List[str]):
+        """Writes the given lines, waiting for the client to drain its buffer.
+
+        Raises:
+            ConnectionClosedException: The client did not read its messages
+              within the server's write timeout, or has disconnected.
+        """
+        self.writer.write("".join(line + "\n" for line in lines).encode("utf-8"))
+        try:
+            await asyncio.wait_for(self.writer.drain(), self.server.write_timeout)
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            self.writer.close()
+            raise ConnectionClosedException() from e
+
+    async def request_choice(
+        self,
+        battle: Battle,
+        player: Player,
+        choices: List[Action],
+        force_switch: bool,
+        deadline: Optional[Deadline],
+    ) -> Action:
+        """Sends a request to the client and waits for a valid choice.
+
+        If the decision is timed, the Battle cancels this request once the
+        deadline passes. A choice sent later is rejected, either as out of
+        turn or, once the next request is sent, by its stale rqid.
+
+        Raises:
+            ForfeitException: The client forfeited the battle.
+            ConnectionClosedException: The client disconnected.
+        """
+        rqid = next(self._rqids)
+        self._awaiting_choice = True
+        try:
+            await self.send(
+                [
+                    protocol.request(
+                        battle,
+                        player,
+                        choices,
+                        force_switch,
+                        rqid,
+                        None if deadline is None else deadline.remaining(),
+                    )
+                ]
+            )
+            while True:
+                item = await self._choices.get()
+                if item is _FORFEIT:
+                    raise ForfeitException()
+                if item is _CLOSED:
+                    raise ConnectionClosedException()
+                assert isinstance(item, str)
+                try:
+                    action, choice_rqid = protocol.parse_choose(item)
+                except protocol.ProtocolError as e:
+                    await self.send(
+                        [protocol.message("error", f"[Invalid choice] {e}")]
+                    )
+                    continue
+                if choice_rqid != rqid:
+                    await self.send(
+                        [
+                            protocol.message(
+                                "error",
+                                f"[Invalid choice] {item} answers request "
+                                f"{choice_rqid}, not {rqid}.",
+                            )
+                        ]
+                    )
+                    continue
+                if action not in choices:
+                    await self.send(
+                        [protocol.message("error", f"[Invalid choice] {item}")]
+                    )
+                    continue
+                return action
+        finally:
+            self._awaiting_choice = False
+
+    def offer(self, item: object) -> bool:
+        """Hands a client message to the battle, if it is waiting for one."""
+        if item is not _CLOSED and not self._awaiting_choice:
+            return False
+        try:
+            self._choices.put_nowait(item)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+
+class BattleServer:
+    """Hosts battles between connected clients and the server's own agents.
+
+    Clients join a battle with "/search FORMAT" and play it by answering each
+    |request| with "/choose CHOICE|RQID". Each connection plays at most one
+    battle at a time, as P1 against the format's opponent agent.
+
+    Load is shed by refusing new connections past max_connections and new
+    battles past max_battles, with an "[Unavailable]" error. Backpressure is
+    applied per connection: a battle only advances once its client has read
+    the previous turn's messages, and clients that stop reading for longer
+    than write_timeout seconds are disconnected.
+    """
+
+    def __init__(
+        self,
+        formats: Optional[Dict[str, BattleFormat]] = None,
+        max_battles: int = 1000,
+        max_connections: int = 2000,
+        write_buffer_limit: int = 64 * 1024,
+        write_timeout: float = 30.0,
+        line_limit: int = 4096,
+    ):
+        self.formats = DEFAULT_FORMATS if formats is None else formats
+        self.max_battles = max_battles
+        self.max_connections = max_connections
+        self.write_buffer_limit = write_buffer_limit
+        self.write_timeout = write_timeout
+        self.line_limit = line_limit
+        self._connections: Set[_Connection] = set()
+        self._battles = 0
+        self._names = itertools.count(1)
+
+    @property
+    def active_battles(self) -> int:
+        return self._battles
+
+    @property
+    def active_connections(self) -> int:
+        return len(self._connections)
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0):
+        """Starts listening on a local TCP port (any free port by default)."""
+        return await asyncio.start_server(
+            self._handle_connection, host, port, limit=self.line_limit
+        )
+
+    async def start_unix(self, path: str):
+        """Starts listening on a Unix domain socket at the given path."""
+        return await asyncio.start_unix_server(
+            self._handle_connection, path, limit=self.line_limit
+        )
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        writer.transport.set_write_buffer_limits(high=self.write_buffer_limit)
+        connection = _Connection(self, reader, writer, f"guest{next(self._names)}")
+
+        if len(self._connections) >= self.max_connections:
+            writer.write(b"|error|[Unavailable] The server is full.\n")
+            writer.close()
+            return
+
+        self._connections.add(connection)
+        try:
+            await self._read_commands(connection)
+        except (ConnectionClosedException, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.discard(connection)
+            connection.offer(_CLOSED)
+            if connection.battle_task is not None:
+                await asyncio.gather(connection.battle_task, return_exceptions=True)
+            writer.close()
+
+    async def _read_commands(self, connection: _Connection):
+        while True:
+            raw_line = await connection.reader.readline()
+            if not raw_line:
+                return
+            try:
+                command, argument = protocol.parse_command(raw_line.decode("utf-8"))
+            except (protocol.ProtocolError, UnicodeDecodeError) as e:
+                await connection.send([protocol.message("error", str(e))])
+                continue
+
+            if command == "search":
+                await self._search(connection, argument or next(iter(self.formats)))
+            elif command == "choose":
+                if not connection.offer(argument):
+                    await connection.send(
+                        [protocol.message("error", "[Invalid choice] Not your turn.")]
+                    )
+            elif command == "forfeit":
+                connection.offer(_FORFEIT)
+            else:
+                await connection.send(
+                    [protocol.message("error", f"Unknown command /{command}")]
+                )
+
+    async def _search(self, connection: _Connection, format_id: str):
+        if connection.battle_task is not None and not connection.battle_task.done():
+            await connection.send(
+                [protocol.message("error", "You are already in a battle.")]
+            )
+        elif format_id not in self.formats:
+            await connection.send(
+                [protocol.message("error", f"Unknown format {format_id}")]
+            )
+        elif self._battles >= self.max_battles:
+            await connection.send(
+                [protocol.message("error", "[Unavailable] The server is busy.")]
+            )
+        else:
+            self._battles += 1
+            connection.battle_task = asyncio.create_task(
+                self._run_battle(connection, self.formats[format_id])
+            )
+
+    async def _run_battle(self, connection: _Connection, battle_format: BattleFormat):
+        async def stream_turn(battle: Battle):
+            lines = protocol.turn_summary(battle)
+            max_turns = battle.ruleset.max_turns
+            if battle.result is None and (max_turns is None or battle.turn < max_turns):
+                lines.append(protocol.message("turn", battle.turn + 1))
+            await connection.send(lines)
+
+        try:
+            team_generator = battle_format.team_generator()
+            battle = Battle(
+                team_generator.generate_team(),
+                team_generator.generate_team(),
+                RemoteAgent(connection),
+                battle_format.opponent(),
+                battle_format.ruleset,
+            )
+            await connection.send(
+                protocol.battle_start(battle, (connection.name, "house"))
+                + [protocol.message("turn", 1)]
+            )
+            try:
+                await battle.play_async(do_logging=True, on_turn_end=stream_turn)
+            except ForfeitException:
+                battle.forfeit(Player.P1)
+            await connection.send([protocol.battle_end(battle)])
+        except ConnectionClosedException:
+            pass
+        except Exception:
+            connection.writer.close()
+            raise
+        finally:
+            self._battles -= 1
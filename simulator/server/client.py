@@ -0,0 +1,73 @@
+"""A scripted client for the battle server, for bots and local testing."""
+
+import asyncio
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from simulator.server import protocol
+
+Policy = Callable[[Dict[str, Any]], str]
+
+
+def random_policy(request: Dict[str, Any]) -> str:
+    """Picks a uniformly random choice from a request."""
+    return random.choice(request["choices"])
+
+
+class BattleClient:
+    """A client that plays battles on a BattleServer with a scripted policy."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect_tcp(cls, host: str, port: int) -> "BattleClient":
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path: str) -> "BattleClient":
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def send(self, line: str):
+        self._writer.write((line + "\n").encode("utf-8"))
+        await self._writer.drain()
+
+    async def read_line(self) -> Optional[str]:
+        """Reads the next server message, or None if the server hung up."""
+        raw_line = await self._reader.readline()
+        if not raw_line:
+            return None
+        return raw_line.decode("utf-8").rstrip("\n")
+
+    async def play(
+        self, format_id: str = "", policy: Policy = random_policy
+    ) -> Tuple[Optional[str], List[str]]:
+        """Searches for a battle and plays it to completion.
+
+        Args:
+            format_id: The format to play, or the server's default if empty.
+            policy: Produces a choice, e.g. "move 1", from a decoded request.
+
+        Returns:
+            The final |win|, |tie| or |error| line (or None if the server hung
+            up), and every line received during the battle.
+        """
+        await self.send(f"/search {format_id}".rstrip())
+        transcript = []
+        while True:
+            line = await self.read_line()
+            if line is None:
+                return None, transcript
+            transcript.append(line)
+            if line.startswith(("|win|", "|tie")):
+                return line, transcript
+            if line.startswith("|error|[Unavailable]"):
+                return line, transcript
+            if line.startswith("|request|"):
+                request = protocol.parse_request(line)
+                await self.send(f"/choose {policy(request)}|{request['rqid']}")
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
@@ -0,0 +1,226 @@
+"""Encoding and parsing for the Showdown-style battle server line protocol.
+
+Every message is a single UTF-8 line. Server messages are pipe-delimited, e.g.
+``|request|{...}``, ``|turn|3`` or ``|win|p1``. Client messages are slash
+commands, e.g. ``/search gen1basic``, ``/choose move 1|3`` or ``/forfeit``.
+As in Pokemon Showdown, slot numbers in choices are one-based, and a choice
+ends with the rqid of the request it answers, so that a choice sent too late
+for one request is not taken as the answer to the next.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player
+from simulator.battle.battling_pokemon import BattlingPokemon
+from simulator.status import Status
+
+
+class ProtocolError(Exception):
+    pass
+
+
+SIDE_IDS = {Player.P1: "p1", Player.P2: "p2"}
+
+_STATUS_IDS = {
+    Status.NONE: "",
+    Status.SLEEP: "slp",
+    Status.POISON: "psn",
+    Status.BURN: "brn",
+    Status.FREEZE: "frz",
+    Status.PARALYZE: "par",
+}
+
+
+def message(*parts: Any) -> str:
+    """Produces a server message line from its pipe-delimited parts."""
+    return "|" + "|".join(str(p) for p in parts)
+
+
+def pokemon_id(player: Player, pokemon: BattlingPokemon) -> str:
+    return f"{SIDE_IDS[player]}a: {pokemon}"
+
+
+def hp_status(pokemon: BattlingPokemon) -> str:
+    """Produces Showdown's "HP STATUS" field for the given Pokemon."""
+    condition = f"{pokemon.hp}/{pokemon.max_hp}"
+    if pokemon.knocked_out:
+        return "0 fnt"
+    if pokemon.status != Status.NONE:
+        condition += f" {_STATUS_IDS[pokemon.status]}"
+    return condition
+
+
+def choice_string(action: Action) -> str:
+    if action.is_move:
+        return f"move {action.move_slot + 1}"
+    return f"switch {action.switch_slot + 1}"
+
+
+def parse_choice(choice: str) -> Action:
+    """Parses the argument of a /choose command into an Action.
+
+    Args:
+        choice: A choice such as "move 1" or "switch 3".
+
+    Returns:
+        The corresponding Action.
+
+    Raises:
+        ProtocolError: The choice is malformed or out of range.
+    """
+    try:
+        kind, slot_str = choice.split()
+        slot = int(slot_str) - 1
+    except ValueError as e:
+        raise ProtocolError(f"Malformed choice: {choice!r}") from e
+    if kind == "move" and 0 <= slot < 4:
+        return Action(Action.MOVE_1 + slot)
+    if kind == "switch" and 0 <= slot < 6:
+        return Action(Action.SWITCH_1 + slot)
+    raise ProtocolError(f"Unknown choice: {choice!r}")
+
+
+def parse_choose(argument: str) -> Tuple[Action, int]:
+    """Parses the argument of a /choose command into an Action and an rqid.
+
+    Args:
+        argument: A choice and the rqid of the request it answers, such as
+          "move 1|3".
+
+    Returns:
+        The chosen Action, and the rqid.
+
+    Raises:
+        ProtocolError: The choice or rqid is malformed or missing.
+    """
+    choice, separator, rqid_str = argument.rpartition("|")
+    if not separator:
+        raise ProtocolError(f"Missing request id: {argument!r}")
+    try:
+        rqid = int(rqid_str)
+    except ValueError as e:
+        raise ProtocolError(f"Malformed request id: {rqid_str!r}") from e
+    return parse_choice(choice), rqid
+
+
+def parse_command(line: str) -> Tuple[str, str]:
+    """Splits a client line into its command and argument.
+
+    Args:
+        line: A line sent by a client, e.g. "/choose move 1|3".
+
+    Returns:
+        The command name without its slash, and the (possibly empty) argument.
+
+    Raises:
+        ProtocolError: The line is not a slash command.
+    """
+    line = line.strip()
+    if not line.startswith("/"):
+        raise ProtocolError(f"Expected a command, got {line!r}")
+    command, _, argument = line[1:].partition(" ")
+    return command, argument.strip()
+
+
+def parse_request(line: str) -> Dict[str, Any]:
+    """Decodes the JSON body of a |request| line."""
+    return json.loads(line.split("|", 2)[2])
+
+
+def battle_start(battle: Battle, names: Tuple[str, str]) -> List[str]:
+    """Produces the messages introducing a battle to one of its players."""
+    lines = [message("init", "battle")]
+    for player in Player:
+        lines.append(message("player", SIDE_IDS[player], names[player]))
+    for player in Player:
+        team = battle.teams[player]
+        lines.append(message("teamsize", SIDE_IDS[player], len(team)))
+    for player in Player:
+        active = battle.actives[player]
+        lines.append(
+            message(
+                "switch",
+                pokemon_id(player, active.pokemon),
+                f"{active.species}, L{active.party_member.level}",
+                hp_status(active.pokemon),
+            )
+        )
+    lines.append(message("start"))
+    return lines
+
+
+def request(
+    battle: Battle,
+    player: Player,
+    choices: List[Action],
+    force_switch: bool,
+    rqid: int,
+    time_limit: Optional[float] = None,
+) -> str:
+    """Produces the request message asking a player for a choice.
+
+    Args:
+        battle: The Battle in which the choice is made.
+        player: The Player being asked.
+        choices: The Actions the player may choose between.
+        force_switch: Whether the player must replace a knocked out Pokemon.
+        rqid: A number identifying this request.
+        time_limit: The seconds the player has to choose, if timed.
+
+    Returns:
+        A |request| line with a JSON description of the player's side.
+    """
+    active = battle.actives[player]
+    body: Dict[str, Any] = {
+        "rqid": rqid,
+        "forceSwitch": force_switch,
+        "choices": [choice_string(c) for c in choices],
+        "side": {
+            "id": SIDE_IDS[player],
+            "pokemon": [
+                {
+                    "ident": pokemon_id(player, p),
+                    "details": f"{p.species}, L{p.pokemon.level}",
+                    "condition": hp_status(p),
+                    "active": p is active.pokemon,
+                    "moves": [m.name for m in p.moves],
+                }
+                for p in battle.teams[player]
+            ],
+        },
+    }
+    if time_limit is not None:
+        body["timeLimit"] = round(time_limit, 3)
+    if not force_switch:
+        body["active"] = {
+            "moves": [
+                {"move": m.name, "pp": pp, "maxpp": m.pp}
+                for m, pp in zip(active.moves, active.pp)
+            ]
+        }
+    return message("request", json.dumps(body, separators=(",", ":")))
+
+
+def turn_summary(battle: Battle) -> List[str]:
+    """Produces the messages describing the turn that was just played."""
+    lines = []
+    if battle.log is not None and battle.turn > 0:
+        for entry in battle.log.get_log()[battle.turn - 1]:
+            lines.append(message("message", entry))
+    for player in Player:
+        active = battle.actives[player]
+        lines.append(
+            message(
+                "-hp", pokemon_id(player, active.pokemon), hp_status(active.pokemon)
+            )
+        )
+    return lines
+
+
+def battle_end(battle: Battle) -> str:
+    victor: Optional[Player] = None if battle.result is None else battle.result.victor
+    if victor is None:
+        return message("tie")
+    return message("win", SIDE_IDS[victor])
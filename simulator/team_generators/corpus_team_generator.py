@@ -0,0 +1,41 @@
+"""A TeamGenerator that draws pre-built teams from a TeamCorpus."""
+
+from typing import Optional
+
+import numpy as np
+
+from simulator.corpus.team_corpus import TeamCorpus
+from simulator.pokemon.team import Team
+from simulator.team_generators.team_generator import (
+    NoMorePossibleTeamsException,
+    TeamGenerator,
+)
+
+
+class CorpusTeamGenerator(TeamGenerator):
+    """A team generator that deals out the teams of a corpus in a seeded order.
+
+    Each team is produced at most once until the generator is reset, which
+    restarts the same order, so evaluations using the same corpus and seed see
+    the same teams. Teams are unpacked from the memory-mapped corpus on demand,
+    and are not recorded.
+    """
+
+    def __init__(self, corpus: TeamCorpus, seed: Optional[int] = None):
+        super().__init__()
+        self.corpus = corpus
+        self.seed = seed
+        self.MAX_ALLOWED_TEAMS = len(corpus)  # pylint: disable=invalid-name
+        self._order = np.random.default_rng(seed).permutation(len(corpus))
+        self._cursor = 0
+
+    def generate_team(self) -> Team:
+        if self._cursor >= len(self._order):
+            raise NoMorePossibleTeamsException()
+        team = self.corpus[int(self._order[self._cursor])]
+        self._cursor += 1
+        return team
+
+    def reset(self):
+        super().reset()
+        self._cursor = 0
@@ -0,0 +1,171 @@
+"""A TeamGenerator for random battles drawn from the whole Pokedex."""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+import simulator.ruleset
+from simulator.corpus.packed import EMPTY, MAX_MOVES, empty_teams, pack_dvs
+from simulator.dex.movedex import moves_in_mask
+from simulator.dex.pokedex import species_in_mask
+from simulator.moves.move import Move
+from simulator.pokemon.party_pokemon import PartyPokemon
+from simulator.pokemon.pokemon_species import PokemonSpecies
+from simulator.pokemon.team import Team
+from simulator.ruleset import Ruleset
+from simulator.team_generators.team_generator import TeamGenerator
+
+
+class RandomBattleTeamGenerator(TeamGenerator):
+    """A team generator that produces random, legal teams for random battles.
+
+    Every species that can learn at least one move allowed by the ruleset is
+    eligible. Each team has distinct species, and each member knows up to four
+    distinct moves drawn uniformly from its legal move pool. DVs and Stat EXPs
+    are at their maximums.
+
+    Legal move pools are precomputed, and teams are sampled in batches with
+    numpy, so no team needs to be validated against the ruleset. Generated
+    teams are Teams already marked valid for the ruleset. Unlike other
+    generators, generated teams are not recorded, and the supply of teams
+    never runs out.
+    """
+
+    MAX_ALLOWED_TEAMS = None
+
+    def __init__(
+        self,
+        ruleset: Optional[Ruleset] = None,
+        team_size: Optional[int] = None,
+        level: int = 100,
+        seed: Optional[int] = None,
+        batch_size: int = 1024,
+    ):
+        """Precomputes the legal species and move pools for a ruleset.
+
+        Args:
+            ruleset: The ruleset teams must be valid under. Defaults to
+              FULL_RULESET.
+            team_size: The number of Pokemon per team. Defaults to the
+              ruleset's maximum team size.
+            level: The level of every generated Pokemon.
+            seed: Seeds the generator, for reproducible teams.
+            batch_size: The number of teams sampled at once.
+        """
+        super().__init__()
+        self.ruleset = simulator.ruleset.FULL_RULESET if ruleset is None else ruleset
+        self.team_size = self.ruleset.max_team_size if team_size is None else team_size
+        if not 1 <= self.team_size <= self.ruleset.max_team_size:
+            raise ValueError(
+                f"Team size must be between 1 and {self.ruleset.max_team_size}."
+            )
+        self.level = level
+        self.batch_size = batch_size
+        self._rng = np.random.default_rng(seed)
+
+        self.species: List[PokemonSpecies] = [
+            species
+            for species in species_in_mask(self.ruleset.species_mask)
+            if species.learnset_mask & self.ruleset.move_mask
+        ]
+        if len(self.species) < self.team_size:
+            raise ValueError(
+                f"Only {len(self.species)} species can be used under this ruleset."
+            )
+        self.move_pools: List[List[Move]] = [
+            moves_in_mask(species.learnset_mask & self.ruleset.move_mask)
+            for species in self.species
+        ]
+
+        # Move pools padded into one array, so that every slot of a batch can
+        # draw its moves at once. Padding is never drawn while real moves
+        # remain, since its sort keys are infinite.
+        self._pool_sizes = np.array([len(pool) for pool in self.move_pools])
+        self._padding = (
+            np.arange(self._pool_sizes.max()) >= self._pool_sizes[:, np.newaxis]
+        )
+        self._move_counts = np.minimum(self._pool_sizes, MAX_MOVES)
+        self._species_indices = np.array([s.index for s in self.species])
+        self._pool_move_indices = np.full(self._padding.shape, EMPTY, np.uint8)
+        for i, pool in enumerate(self.move_pools):
+            self._pool_move_indices[i, : len(pool)] = [move.index for move in pool]
+
+        self._batch: List[Team] = []
+
+    def sample_indices(self, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Samples n teams as arrays of indices, without building any objects.
+
+        Args:
+            n: The number of teams to sample.
+
+        Returns:
+            A (n, team_size) array of indices into self.species, a
+            (n, team_size, 4) array of indices into each member's move pool,
+            and a (n, team_size) array of how many of those moves are used.
+        """
+        # The team_size smallest of a row of random keys form a uniformly
+        # random subset, which enforces the species clause.
+        species_keys = self._rng.random((n, len(self.species)))
+        species = np.argpartition(species_keys, self.team_size - 1, axis=1)[
+            :, : self.team_size
+        ]
+
+        move_keys = self._rng.random((n, self.team_size, self._padding.shape[1]))
+        move_keys[self._padding[species]] = np.inf
+        moves = np.argsort(move_keys, axis=2)[:, :, :MAX_MOVES]
+        return species, moves, self._move_counts[species]
+
+    def generate_packed(self, n: int) -> np.ndarray:
+        """Generates n random teams directly in the packed corpus encoding."""
+        species, moves, move_counts = self.sample_indices(n)
+        packed = empty_teams(n)
+        packed["size"] = self.team_size
+        members = packed["members"][:, : self.team_size]
+        members["species"] = self._species_indices[species]
+        members["level"] = self.level
+        move_indices = self._pool_move_indices[species[:, :, np.newaxis], moves]
+        move_indices[np.arange(MAX_MOVES) >= move_counts[:, :, np.newaxis]] = EMPTY
+        members["moves"] = move_indices
+        members["dvs"] = pack_dvs(*[PartyPokemon.MAX_DV] * 4)
+        members["stat_exp"] = PartyPokemon.MAX_STAT_EXP
+        return packed
+
+    def generate_teams(self, n: int) -> List[Team]:
+        """Generates n random teams at once."""
+        species, moves, move_counts = self.sample_indices(n)
+        teams = []
+        for team_species, team_moves, team_move_counts in zip(
+            species.tolist(), moves.tolist(), move_counts.tolist()
+        ):
+            members = []
+            for i, slots, count in zip(team_species, team_moves, team_move_counts):
+                pool = self.move_pools[i]
+                members.append(
+                    PartyPokemon(
+                        self.species[i],
+                        self.level,
+                        [pool[slot] for slot in slots[:count]],
+                    )
+                )
+            teams.append(Team(members, valid_for=(self.ruleset,)))
+        return teams
+
+    def generate_team(self) -> Team:
+        if not self._batch:
+            self._batch = self.generate_teams(self.batch_size)
+            self._batch.reverse()
+        return self._batch.pop()
+
+    def reset(self):
+        super().reset()
+        self._batch = []
+
+    def reseed(self, seed):
+        """Restarts sampling from a new seed, discarding any pre-sampled teams.
+
+        Args:
+            seed: Any seed accepted by numpy.random.default_rng, e.g. a tuple
+              of a run's seed and a battle's number.
+        """
+        self._rng = np.random.default_rng(seed)
+        self._batch = []
@@ -0,0 +1,159 @@
+"""Regression tests for the Battle engine."""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from simulator.agents.random_agent import RandomAgent
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player
+from simulator.dex.movedex import MOVEDEX
+from simulator.dex.pokedex import POKEDEX
+from simulator.pokemon.party_pokemon import PartyPokemon
+from simulator.ruleset import Ruleset
+
+
+def _pokemon(species: str, *moves: str) -> PartyPokemon:
+    return PartyPokemon(POKEDEX[species], 17, [MOVEDEX[move] for move in moves])
+
+
+class RecordingAgent(RandomAgent):
+    """A RandomAgent recording whether its active Pokemon was knocked out at
+    each request."""
+
+    def __init__(self):
+        self.switches = []
+        self.actions = []
+
+    def request_switch(self, battle, player, choices, *, deadline=None):
+        self.switches.append(battle.actives[player].knocked_out)
+        return random.choice(choices)
+
+    def request_action(self, battle, player, choices, *, deadline=None):
+        self.actions.append(battle.actives[player].knocked_out)
+        return random.choice(choices)
+
+
+def test_knocked_out_pokemon_are_replaced_through_request_switch():
+    random.seed(0)
+    agents = (RecordingAgent(), RecordingAgent())
+    for _ in range(30):
+        team = [
+            _pokemon("Charmander", "Scratch", "Ember"),
+            _pokemon("Squirtle", "Tackle", "Water Gun"),
+        ]
+        Battle(team, list(team), *agents).play()
+
+    for agent in agents:
+        assert agent.switches and all(agent.switches)
+        assert not any(agent.actions)
+
+
+def test_both_teams_are_validated():
+    ruleset = Ruleset.from_dex(pokedex=[POKEDEX["Bulbasaur"], POKEDEX["Squirtle"]])
+    legal = [_pokemon("Bulbasaur", "Tackle")]
+    illegal = [_pokemon("Charmander", "Scratch")]
+
+    Battle(legal, legal, RandomAgent(), RandomAgent(), ruleset)
+    with pytest.raises(ValueError):
+        Battle(illegal, legal, RandomAgent(), RandomAgent(), ruleset)
+    with pytest.raises(ValueError):
+        Battle(legal, illegal, RandomAgent(), RandomAgent(), ruleset)
+
+
+def test_switching_updates_only_the_switching_players_choices():
+    p1_team = [
+        _pokemon("Bulbasaur", "Tackle", "Growl", "Leech Seed", "Vine Whip"),
+        _pokemon("Charmander", "Scratch"),
+        _pokemon("Squirtle", "Tackle", "Tail Whip"),
+    ]
+    p2_team = [
+        _pokemon("Squirtle", "Tackle", "Tail Whip"),
+        _pokemon("Bulbasaur", "Tackle", "Growl", "Leech Seed", "Vine Whip"),
+    ]
+    battle = Battle(p1_team, p2_team, RandomAgent(), RandomAgent())
+    p2_choices = [Action.MOVE_1, Action.MOVE_2, Action.SWITCH_2]
+    assert battle.choices(Player.P1) == [
+        Action.MOVE_1,
+        Action.MOVE_2,
+        Action.MOVE_3,
+        Action.MOVE_4,
+        Action.SWITCH_2,
+        Action.SWITCH_3,
+    ]
+    assert battle.choices(Player.P2) == p2_choices
+
+    # Tail Whip deals no damage, so no Pokemon can be knocked out.
+    battle.advance(Action.SWITCH_2, Action.MOVE_2)
+    assert battle.team_cursors[Player.P1] == 1
+    assert battle.choices(Player.P1) == [
+        Action.MOVE_1,
+        Action.SWITCH_1,
+        Action.SWITCH_3,
+    ]
+    assert battle.choices(Player.P2) == p2_choices
+
+
+def test_a_pokemon_without_pp_can_still_struggle():
+    team = [_pokemon("Charmander", "Scratch"), _pokemon("Squirtle", "Tackle")]
+    battle = Battle(team, list(team), RandomAgent(), RandomAgent())
+    battle.actives[Player.P1].pp[0] = 1
+    # pylint: disable=protected-access
+    battle._execute_action(Player.P1, Action.MOVE_1)
+
+    assert battle.choices(Player.P1) == [Action.MOVE_1, Action.SWITCH_2]
+
+
+class SteppingAgent(RandomAgent):
+    """A RandomAgent checking that the step API agrees with play at each
+    request."""
+
+    def __init__(self):
+        self.turns = []
+
+    def request_action(self, battle, player, choices, *, deadline=None):
+        assert not battle.finished
+        assert battle.choices(player) == choices
+        clone = battle.clone()
+        clone.advance(*(clone.choices(p)[0] for p in Player))
+        assert clone.turn == battle.turn
+        self.turns.append(battle.turn)
+        return choices[0]
+
+
+def test_the_step_api_counts_turns_as_play_does():
+    # Neither side deals damage, so the battle lasts until the turn limit.
+    team = [_pokemon("Charmander", "Growl")]
+    ruleset = Ruleset(max_turns=3)
+    agents = (SteppingAgent(), SteppingAgent())
+    winner, turns, _ = Battle(team, list(team), *agents, ruleset).play()
+
+    assert (winner, turns) == (None, 3)
+    assert agents[0].turns == agents[1].turns == [1, 2, 3]
+
+    battle = Battle(team, list(team), RandomAgent(), RandomAgent(), ruleset)
+    decisions = 0
+    while not battle.finished:
+        battle.advance(*(battle.choices(player)[0] for player in Player))
+        decisions += 1
+    assert (decisions, battle.turn) == (3, 3)
+    assert battle.choices(Player.P1) == battle.choices(Player.P2) == []
+
+
+class FailingAgent(RandomAgent):
+    """A RandomAgent that overruns its deadline and then fails."""
+
+    def request_action(self, battle, player, choices, *, deadline=None):
+        time.sleep(0.05)
+        raise RuntimeError("The agent failed.")
+
+
+def test_an_agent_failing_after_its_deadline_raises_in_async_battles():
+    team = [_pokemon("Charmander", "Scratch")]
+    battle = Battle(
+        team, list(team), FailingAgent(), RandomAgent(), decision_time_limit=0.01
+    )
+    with pytest.raises(RuntimeError):
+        asyncio.run(battle.play_async())
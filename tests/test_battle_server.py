@@ -0,0 +1,154 @@
+import asyncio
+import random
+
+from simulator.agents.random_agent import RandomAgent
+from simulator.ruleset import Ruleset
+from simulator.server import protocol
+from simulator.server.battle_server import BattleFormat, BattleServer
+from simulator.server.client import BattleClient
+from simulator.team_generators.basic_rival_team_generator import BasicRivalTeamGenerator
+
+
+def _serve(server, play):
+    """Runs a server on a free localhost port while play(port) drives it."""
+
+    async def run():
+        listener = await server.start_tcp()
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.wait_for(play(port), 30)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+
+    return asyncio.run(run())
+
+
+async def _read_until(client, prefix):
+    lines = []
+    while True:
+        line = await client.read_line()
+        assert line is not None, lines
+        lines.append(line)
+        if line.startswith(prefix):
+            return line, lines
+
+
+def test_a_scripted_client_plays_a_battle_to_the_end():
+    random.seed(0)
+
+    async def play(port):
+        client = await BattleClient.connect_tcp("127.0.0.1", port)
+        try:
+            return await client.play("gen1basic")
+        finally:
+            await client.close()
+
+    last_line, transcript = _serve(BattleServer(), play)
+
+    assert last_line.startswith(("|win|", "|tie"))
+    assert "|turn|1" in transcript
+    rqids = [
+        protocol.parse_request(line)["rqid"]
+        for line in transcript
+        if line.startswith("|request|")
+    ]
+    assert rqids == list(range(1, len(rqids) + 1))
+    assert not any(line.startswith("|error|") for line in transcript)
+
+
+def test_choices_for_another_request_are_rejected():
+    async def play(port):
+        client = await BattleClient.connect_tcp("127.0.0.1", port)
+        try:
+            await client.send("/search gen1basic")
+            line, _ = await _read_until(client, "|request|")
+            request = protocol.parse_request(line)
+            choice = request["choices"][0]
+
+            await client.send(f"/choose {choice}")
+            missing, _ = await _read_until(client, "|error|")
+            await client.send(f"/choose {choice}|{request['rqid'] + 1}")
+            stale, _ = await _read_until(client, "|error|")
+            await client.send(f"/choose {choice}|{request['rqid']}")
+            line, _ = await _read_until(client, "|request|")
+            await client.send("/forfeit")
+            end, _ = await _read_until(client, "|win|")
+            return missing, stale, protocol.parse_request(line)["rqid"], end
+        finally:
+            await client.close()
+
+    missing, stale, next_rqid, end = _serve(BattleServer(), play)
+
+    assert missing.startswith("|error|[Invalid choice] Missing request id")
+    assert stale.startswith("|error|[Invalid choice]")
+    assert "answers request 2, not 1" in stale
+    assert next_rqid == 2
+    assert end == "|win|p2"
+
+
+def test_a_choice_sent_after_a_timeout_does_not_answer_the_next_request():
+    formats = {
+        "timed": BattleFormat(
+            BasicRivalTeamGenerator,
+            RandomAgent,
+            Ruleset(decision_time_limit=0.05),
+        )
+    }
+
+    async def play(port):
+        client = await BattleClient.connect_tcp("127.0.0.1", port)
+        try:
+            await client.send("/search timed")
+            line, _ = await _read_until(client, "|request|")
+            late_request = protocol.parse_request(line)
+            # The server plays the turn on the client's behalf, and asks for
+            # the next choice.
+            line, turn_lines = await _read_until(client, "|request|")
+            next_request = protocol.parse_request(line)
+
+            await client.send(
+                f"/choose {late_request['choices'][0]}|{late_request['rqid']}"
+            )
+            stale, _ = await _read_until(client, "|error|")
+            await client.send("/forfeit")
+            await _read_until(client, "|win|")
+            return next_request["rqid"], turn_lines, stale
+        finally:
+            await client.close()
+
+    next_rqid, turn_lines, stale = _serve(BattleServer(formats), play)
+
+    assert next_rqid == 2
+    assert any("ran out of time" in line for line in turn_lines)
+    assert "answers request 1, not 2" in stale
+
+
+def test_load_is_shed_past_the_battle_and_connection_limits():
+    async def play(port):
+        busy = await BattleClient.connect_tcp("127.0.0.1", port)
+        waiting = await BattleClient.connect_tcp("127.0.0.1", port)
+        try:
+            await busy.send("/search")
+            await _read_until(busy, "|request|")
+            await waiting.send("/search")
+            battles_full, _ = await _read_until(waiting, "|error|")
+
+            refused = await BattleClient.connect_tcp("127.0.0.1", port)
+            try:
+                connections_full = await refused.read_line()
+                hung_up = await refused.read_line()
+            finally:
+                await refused.close()
+            return battles_full, connections_full, hung_up
+        finally:
+            await busy.close()
+            await waiting.close()
+
+    battles_full, connections_full, hung_up = _serve(
+        BattleServer(max_battles=1, max_connections=2), play
+    )
+
+    assert battles_full == "|error|[Unavailable] The server is busy."
+    assert connections_full == "|error|[Unavailable] The server is full."
+    assert hung_up is None
@@ -0,0 +1,113 @@
+import pickle
+from enum import Enum
+
+import pytest
+
+from simulator.agents.basic_nn_agent import BasicNeuralNetworkAgent
+from simulator.agents.random_agent import RandomAgent
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player
+from simulator.battle.battle_view import BattleView, MemberView, SideView
+from simulator.dex.movedex import MOVEDEX
+from simulator.dex.pokedex import POKEDEX
+from simulator.moves.move import Move
+from simulator.pokemon.party_pokemon import PartyPokemon
+from simulator.pokemon.pokemon_species import PokemonSpecies
+from simulator.status import Status
+
+
+def _battle() -> Battle:
+    team = [
+        PartyPokemon(POKEDEX["Charmander"], 17, [MOVEDEX["Scratch"], MOVEDEX["Growl"]]),
+        PartyPokemon(
+            POKEDEX["Squirtle"], 17, [MOVEDEX["Tackle"], MOVEDEX["Tail Whip"]]
+        ),
+    ]
+    return Battle(team, list(team), RandomAgent(), RandomAgent())
+
+
+def _plain_values(value):
+    """Produces every value held by a view, recursively."""
+    if isinstance(value, tuple):
+        for element in value:
+            yield from _plain_values(element)
+    else:
+        yield value
+
+
+def test_the_opponent_side_holds_only_what_was_seen():
+    battle = _battle()
+    opponent = battle.view(Player.P1).opponent
+    assert opponent.species == POKEDEX["Charmander"]
+    assert (opponent.moves, opponent.pp) == ((), ())
+    assert opponent.team[1] is None
+
+    # Growl deals no damage, and P2 switches first.
+    battle.advance(Action.MOVE_2, Action.SWITCH_2)
+    battle.advance(Action.MOVE_2, Action.MOVE_2)
+    p1_view, p2_view = battle.view(Player.P1), battle.view(Player.P2)
+
+    assert p1_view.opponent.active_slot == 1
+    assert p1_view.opponent.moves == (MOVEDEX["Tail Whip"],)
+    assert p1_view.opponent.pp == (MOVEDEX["Tail Whip"].pp - 1,)
+    assert p1_view.opponent.team[0].moves == ()
+    assert p2_view.opponent.moves == (MOVEDEX["Growl"],)
+    assert p2_view.opponent.pp == (MOVEDEX["Growl"].pp - 2,)
+    assert p2_view.opponent.team[1] is None
+
+    own = p1_view.own
+    assert own.moves == (MOVEDEX["Scratch"], MOVEDEX["Growl"])
+    assert own.team[1] == MemberView(
+        POKEDEX["Squirtle"],
+        17,
+        own.team[1].max_hp,
+        own.team[1].max_hp,
+        own.status,
+        (MOVEDEX["Tackle"], MOVEDEX["Tail Whip"]),
+        (MOVEDEX["Tackle"].pp, MOVEDEX["Tail Whip"].pp),
+    )
+    assert p1_view.choices == tuple(battle.choices(Player.P1))
+
+
+def test_views_hold_only_plain_values():
+    battle = _battle()
+    view = battle.view(Player.P1)
+    allowed = (int, float, Enum, type(None), PokemonSpecies, Move)
+
+    assert all(isinstance(value, allowed) for value in _plain_values(view))
+    assert pickle.loads(pickle.dumps(view)) == view
+    with pytest.raises(AttributeError):
+        view.own.hp = 0
+
+
+def test_views_are_snapshots():
+    battle = _battle()
+    view = battle.view(Player.P1)
+    battle.advance(Action.MOVE_1, Action.MOVE_1)
+
+    assert isinstance(view, BattleView) and isinstance(view.own, SideView)
+    assert view.turn == 0
+    assert view.own.pp[0] == MOVEDEX["Scratch"].pp
+    assert battle.view(Player.P1).own.pp[0] == MOVEDEX["Scratch"].pp - 1
+
+
+def test_the_basic_agent_encodes_the_active_pokemon_through_views():
+    class Agent(BasicNeuralNetworkAgent):
+        def evaluate_network(self, input_vector):
+            return input_vector
+
+    battle = _battle()
+    # P1's Growl lowers P2's Attack, and P2's Scratch damages P1.
+    battle.advance(Action.MOVE_2, Action.MOVE_1)
+    p1_active, p2_active = battle.actives
+    none = [1.0] + [0.0] * (len(Status) - 1)
+
+    assert Agent().vectorize_battle(battle, Player.P1) == (
+        [0.0, 1.0, 0.0, p1_active.hp / p1_active.max_hp]
+        + [0.0] * 6
+        + none
+        + [0.0, 1.0, 0.0, 1.0]
+        + [float(m) for m in p2_active.stat_modifiers]
+        + none
+    )
+    assert -1 in p2_active.stat_modifiers
@@ -0,0 +1,135 @@
+"""CompiledNetwork must activate exactly as neat.nn.FeedForwardNetwork does.
+
+NetworkCache must reuse each genome's network while the genome is unchanged.
+"""
+
+import os
+import random
+
+import neat
+import numpy as np
+import pytest
+from neat.nn import FeedForwardNetwork
+
+from basic_neat_model.compiled_network import CompiledNetwork, NetworkCache
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "basic_neat_model",
+    "config",
+)
+
+ACTIVATIONS = (
+    "sigmoid tanh sin gauss relu softplus identity clamped abs hat square cube"
+)
+
+
+def _config(activations: str, aggregations: str) -> neat.Config:
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        CONFIG_PATH,
+    )
+    genome_config = config.genome_config
+    # Grow larger networks than the model's own mutation rates would.
+    genome_config.conn_add_prob = 0.5
+    genome_config.conn_delete_prob = 0.1
+    genome_config.node_add_prob = 0.3
+    genome_config.node_delete_prob = 0.1
+    genome_config.activation_options = activations.split()
+    genome_config.activation_mutate_rate = 0.3 if " " in activations else 0.0
+    genome_config.aggregation_options = aggregations.split()
+    genome_config.aggregation_mutate_rate = 0.3 if " " in aggregations else 0.0
+    return config
+
+
+def _genomes(config: neat.Config, count: int = 50, mutations: int = 30):
+    random.seed(0)
+    genomes = []
+    for key in range(count):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        for _ in range(mutations):
+            genome.mutate(config.genome_config)
+        genomes.append(genome)
+    return genomes
+
+
+@pytest.mark.parametrize(
+    "activations,aggregations",
+    [("relu", "sum"), (ACTIVATIONS, "sum mean")],
+    ids=["basic-config", "every-activation"],
+)
+def test_matches_feed_forward_network(activations, aggregations):
+    config = _config(activations, aggregations)
+    inputs = np.random.default_rng(0).normal(size=(16, config.genome_config.num_inputs))
+    for genome in _genomes(config):
+        expected = FeedForwardNetwork.create(genome, config)
+        compiled = CompiledNetwork.create(genome, config)
+        expected_outputs = np.array([expected.activate(row) for row in inputs])
+
+        assert np.allclose(
+            [compiled.activate(row.tolist()) for row in inputs],
+            expected_outputs,
+            rtol=1e-9,
+            atol=1e-9,
+        )
+        assert np.allclose(
+            compiled.activate_batch(inputs), expected_outputs, rtol=1e-9, atol=1e-9
+        )
+
+
+def test_rejects_wrong_input_sizes():
+    config = _config("relu", "sum")
+    network = CompiledNetwork.create(_genomes(config, count=1)[0], config)
+    with pytest.raises(RuntimeError):
+        network.activate([0.0])
+    with pytest.raises(RuntimeError):
+        network.activate_batch(np.zeros((2, 1)))
+
+
+def test_networks_are_reused_until_unused_for_a_generation():
+    config = _config("relu", "sum")
+    first, second = _genomes(config, count=2, mutations=5)
+    cache = NetworkCache()
+
+    network = cache.get(first, config)
+    assert cache.get(first, config) is network
+    cache.new_generation()
+    cache.get(second, config)
+    assert cache.get(first, config) is network
+    cache.new_generation()
+    cache.get(second, config)
+    cache.new_generation()
+
+    assert len(cache) == 1
+    assert cache.get(first, config) is not network
+    assert (cache.hits, cache.misses) == (3, 3)
+
+
+def test_changed_genomes_are_recompiled():
+    config = _config("relu", "sum")
+    genome = _genomes(config, count=1, mutations=5)[0]
+    cache = NetworkCache()
+    network = cache.get(genome, config)
+
+    genome.nodes[0].bias += 1.0
+
+    assert cache.get(genome, config) is not network
+
+
+def test_the_least_recently_used_networks_are_evicted_beyond_the_size():
+    config = _config("relu", "sum")
+    genomes = _genomes(config, count=4, mutations=5)
+    cache = NetworkCache(max_size=3)
+    networks = [cache.get(genome, config) for genome in genomes[:3]]
+
+    cache.get(genomes[0], config)
+    cache.get(genomes[3], config)
+
+    assert len(cache) == 3
+    assert cache.get(genomes[0], config) is networks[0]
+    assert cache.get(genomes[2], config) is networks[2]
+    assert cache.get(genomes[1], config) is not networks[1]
@@ -0,0 +1,53 @@
+import os
+import pickle
+import random
+
+import neat
+
+from basic_neat_model import distill
+from basic_neat_model.agents.neat_agent import NEATAgent
+from simulator.agents.basic_nn_agent import BasicNeuralNetworkAgent
+from simulator.battle.battle import Battle, Player
+from simulator.status import Status
+from simulator.team_generators.basic_rival_team_generator import BasicRivalTeamGenerator
+
+MODEL_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "basic_neat_model"
+)
+
+
+def _winner() -> NEATAgent:
+    config = neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        os.path.join(MODEL_DIR, "config"),
+    )
+    with open(os.path.join(MODEL_DIR, "winner.p"), "rb") as file:
+        return NEATAgent(pickle.load(file), config)
+
+
+def test_distilled_inputs_are_encoded_as_battles_are():
+    charmander, squirtle = sorted(
+        BasicRivalTeamGenerator.STARTERS, key=lambda p: p.species.dex_num
+    )[1:]
+    battle = Battle([charmander], [squirtle], None, None)
+
+    expected = BasicNeuralNetworkAgent.encode_active_pokemon(
+        charmander.species, 1.0, [0] * 6, Status.NONE
+    ) + BasicNeuralNetworkAgent.encode_active_pokemon(
+        squirtle.species, 1.0, [0] * 6, Status.NONE
+    )
+    assert _winner().vectorize_battle(battle, Player.P1) == expected
+
+
+def test_a_distilled_table_agrees_with_its_source_network():
+    random.seed(0)
+    source = _winner()
+    table = distill.distill(source, distill.basic_discretization(hp_buckets=2))
+
+    rate, decisions = distill.agreement(source, table, battles=3)
+
+    assert decisions > 100
+    assert rate >= 0.95
@@ -0,0 +1,45 @@
+import pytest
+
+from simulator.agents.expectiminimax_agent import ExpectiminimaxAgent, solve_matrix_game
+from simulator.battle.battle import Battle, Player
+from simulator.dex.movedex import MOVEDEX
+from simulator.dex.pokedex import POKEDEX
+from simulator.pokemon.party_pokemon import PartyPokemon
+from simulator.ruleset import Ruleset
+
+
+def _team():
+    return [
+        PartyPokemon(POKEDEX["Charmander"], 17, [MOVEDEX["Scratch"], MOVEDEX["Growl"]]),
+        PartyPokemon(POKEDEX["Squirtle"], 17, [MOVEDEX["Tackle"]]),
+    ]
+
+
+def test_matching_pennies_is_solved_with_mixed_strategies():
+    value, rows, columns = solve_matrix_game([[1.0, 0.0], [0.0, 1.0]], 1000)
+
+    assert value == pytest.approx(0.5, abs=0.01)
+    assert rows == pytest.approx([0.5, 0.5], abs=0.01)
+    assert columns == pytest.approx([0.5, 0.5], abs=0.01)
+
+
+def test_a_battle_is_searched_through_its_last_turn():
+    agents = (
+        ExpectiminimaxAgent(seconds=0.01, max_depth=2, samples=2, seed=0),
+        ExpectiminimaxAgent(seconds=0.01, max_depth=2, samples=2, seed=1),
+    )
+    _, turns, _ = Battle(_team(), _team(), *agents, Ruleset(max_turns=3)).play()
+
+    assert turns <= 3
+
+
+def test_a_battle_without_choices_falls_back_to_the_given_choices():
+    agent = ExpectiminimaxAgent(seconds=0.01, max_depth=2, samples=2, seed=0)
+    battle = Battle(_team(), _team(), agent, agent, Ruleset(max_turns=1))
+    # One Scratch cannot knock out a Pokemon at full HP.
+    battle.advance(*(battle.choices(player)[0] for player in Player))
+    assert battle.finished
+    choices = battle._action_choices(Player.P1)  # pylint: disable=protected-access
+
+    assert agent.strategy(battle, Player.P1) == {}
+    assert agent.request_action(battle, Player.P1, choices) in choices
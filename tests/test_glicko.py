@@ -0,0 +1,141 @@
+import os
+from math import sqrt
+
+import neat
+import pytest
+
+from basic_neat_model.glicko import Glicko
+from basic_neat_model.parallel_utils import ParallelSelfPlayEvaluator
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "basic_neat_model",
+    "config",
+)
+
+
+def test_ratings_follow_the_example_of_glickmans_paper():
+    # Example from Glickman, "The Glicko system": a player rated 1500 (RD 200)
+    # beats a 1400 (RD 30), and loses to a 1550 (RD 100) and a 1700 (RD 300).
+    ratings = Glicko(deviation_growth=0.0)
+    ratings.ratings = {
+        "player": (1500.0, 200.0),
+        "first": (1400.0, 30.0),
+        "second": (1550.0, 100.0),
+        "third": (1700.0, 300.0),
+    }
+
+    ratings.update(
+        [("player", "first", 1.0), ("player", "second", 0.0), ("third", "player", 1.0)]
+    )
+
+    rating, deviation = ratings.get("player")
+    assert rating == pytest.approx(1464.1, abs=0.05)
+    assert deviation == pytest.approx(151.4, abs=0.05)
+
+
+def test_deviations_grow_between_periods_up_to_the_initial_deviation():
+    ratings = Glicko(initial_deviation=350.0, deviation_growth=60.0)
+    ratings.ratings = {"certain": (1600.0, 50.0), "uncertain": (1400.0, 345.0)}
+
+    ratings.update([])
+
+    assert ratings.get("certain") == (1600.0, pytest.approx(sqrt(50**2 + 60**2)))
+    assert ratings.get("uncertain") == (1400.0, 350.0)
+
+
+def test_a_draw_between_equals_only_makes_them_more_certain():
+    ratings = Glicko()
+
+    ratings.update([("one", "two", 0.5)])
+
+    for player in ("one", "two"):
+        rating, deviation = ratings.get(player)
+        assert rating == pytest.approx(1500.0)
+        assert deviation < 350.0
+
+
+def test_games_move_both_players_ratings_apart():
+    ratings = Glicko()
+
+    ratings.update([("winner", "loser", 1.0)])
+
+    assert ratings.get("winner")[0] - 1500 == pytest.approx(
+        1500 - ratings.get("loser")[0]
+    )
+    assert ratings.get("winner")[0] > 1500
+
+
+def test_only_the_given_players_are_kept():
+    ratings = Glicko()
+    ratings.update([("kept", "forgotten", 1.0)])
+
+    ratings.update([], players=["kept", "new"])
+
+    assert set(ratings.ratings) == {"kept", "new"}
+    assert ratings.get("new") == (1500.0, 350.0)
+
+
+def stronger_wins(genome, competitors, config):
+    """Rewards the genome with the larger key, as if it always won."""
+    del config
+    rewards = {genome[0]: 0.0}
+    for competitor in competitors:
+        winner = max(genome[0], competitor[0])
+        rewards[winner] = rewards.get(winner, 0.0) + 1.0
+    return rewards
+
+
+def _config() -> neat.Config:
+    return neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        CONFIG_PATH,
+    )
+
+
+def _population(config, size):
+    genomes = []
+    for key in range(1, size + 1):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        genomes.append((key, genome))
+    return genomes
+
+
+def test_sampled_opponents_are_distinct_and_reproducible():
+    config = _config()
+    genomes = _population(config, 8)
+
+    def sample(seed):
+        evaluator = ParallelSelfPlayEvaluator(1, stronger_wins, opponents=3, seed=seed)
+        return evaluator._sample_pairs(genomes)  # pylint: disable=protected-access
+
+    pairs = sample(0)
+
+    assert pairs == sample(0)
+    assert len(set(pairs)) == len(pairs)
+    assert all(genome_id < opponent_id for genome_id, opponent_id in pairs)
+    for genome_id, _ in genomes:
+        assert sum(genome_id in pair for pair in pairs) >= 3
+
+
+def test_the_evaluator_rates_genomes_by_their_results():
+    config = _config()
+    genomes = _population(config, 6)
+    evaluator = ParallelSelfPlayEvaluator(
+        1, stronger_wins, config=config, opponents=3, seed=0
+    )
+    try:
+        for _ in range(3):
+            evaluator.evaluate(genomes, config)
+    finally:
+        evaluator.pool.close()
+        evaluator.pool.join()
+
+    fitnesses = [genome.fitness for _, genome in genomes]
+    assert fitnesses == sorted(fitnesses)
+    assert fitnesses[0] < 1500 < fitnesses[-1]
+    assert fitnesses == [evaluator.ratings.get(key)[0] for key, _ in genomes]
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from simulator.agents.basic_nn_agent import BasicNeuralNetworkAgent
+from simulator.agents.inference_broker import InferenceBroker, batched
+from simulator.battle.battle import Battle, Player
+from simulator.team_generators.basic_rival_team_generator import BasicRivalTeamGenerator
+
+
+class RecordingNetwork:
+    """Doubles its inputs, recording the size of every batch."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, inputs: np.ndarray) -> np.ndarray:
+        self.batch_sizes.append(len(inputs))
+        return 2 * inputs
+
+
+def test_submitted_vectors_are_evaluated_in_full_batches():
+    network = RecordingNetwork()
+    with InferenceBroker(network, max_batch_size=10, max_latency=10.0) as broker:
+        futures = [broker.submit([i, -i]) for i in range(20)]
+        outputs = [future.result(5) for future in futures]
+
+    assert outputs == [[2 * i, -2 * i] for i in range(20)]
+    assert network.batch_sizes == [10, 10]
+    assert broker.batches == 2 and broker.mean_batch_size == 10
+
+
+def test_closing_evaluates_the_vectors_already_submitted():
+    network = RecordingNetwork()
+    broker = InferenceBroker(network, max_batch_size=10, max_latency=10.0)
+    futures = [broker.submit([i]) for i in range(3)]
+
+    broker.close()
+
+    assert [future.result(0) for future in futures] == [[0], [2], [4]]
+    assert network.batch_sizes == [3]
+    with pytest.raises(RuntimeError):
+        broker.submit([0])
+
+
+def test_a_lone_vector_waits_at_most_the_latency():
+    with InferenceBroker(RecordingNetwork(), max_latency=0.01) as broker:
+        assert broker.submit([1.5]).result(5) == [3.0]
+
+
+def test_vectors_from_many_threads_are_batched_together():
+    network = RecordingNetwork()
+    with InferenceBroker(network, max_batch_size=8, max_latency=0.05) as broker:
+        outputs = [None] * 32
+
+        def evaluate(i):
+            outputs[i] = broker.evaluate([i])
+
+        threads = [threading.Thread(target=evaluate, args=(i,)) for i in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+    assert outputs == [[2 * i] for i in range(32)]
+    assert sum(network.batch_sizes) == 32
+    assert max(network.batch_sizes) <= 8
+    assert len(network.batch_sizes) < 32
+
+
+def test_coroutines_are_batched_on_their_event_loop():
+    network = RecordingNetwork()
+
+    async def evaluate_all(broker):
+        return await asyncio.gather(*(broker.evaluate_async([i]) for i in range(7)))
+
+    with InferenceBroker(network, max_batch_size=3) as broker:
+        outputs = asyncio.run(evaluate_all(broker))
+
+    assert outputs == [[2 * i] for i in range(7)]
+    assert network.batch_sizes == [3, 3, 1]
+
+
+def test_cancelled_coroutines_are_left_out_of_their_batch():
+    network = RecordingNetwork()
+
+    async def evaluate_some(broker):
+        tasks = [asyncio.create_task(broker.evaluate_async([i])) for i in range(3)]
+        # Every task submits its vector before the batch is evaluated.
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    with InferenceBroker(network) as broker:
+        first, second, third = asyncio.run(evaluate_some(broker))
+
+    assert (first, third) == ([0], [4])
+    assert isinstance(second, asyncio.CancelledError)
+    assert network.batch_sizes == [2]
+
+
+def test_errors_are_raised_to_every_caller_in_the_batch():
+    def failing_network(inputs):
+        raise ValueError("The network failed.")
+
+    with InferenceBroker(failing_network, max_batch_size=2) as broker:
+        futures = [broker.submit([i]) for i in range(2)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(5)
+
+
+class LinearAgent(BasicNeuralNetworkAgent):
+    WEIGHTS = np.random.default_rng(0).normal(size=(32, 10))
+
+    def evaluate_network(self, input_vector):
+        return list(np.asarray(input_vector) @ self.WEIGHTS)
+
+
+def test_agents_rank_the_same_through_a_broker():
+    starters = list(BasicRivalTeamGenerator.STARTERS)
+    battles = [
+        Battle([first], [second], None, None)
+        for first in starters
+        for second in starters
+    ]
+    agent = LinearAgent()
+    expected = [agent.rank_actions(battle, Player.P1) for battle in battles]
+
+    with InferenceBroker(batched(agent.evaluate_network)) as broker:
+        agent.broker = broker
+        assert [agent.rank_actions(battle, Player.P1) for battle in battles] == (
+            expected
+        )
+
+        async def rank_all():
+            return await asyncio.gather(
+                *(agent.rank_actions_async(battle, Player.P1) for battle in battles)
+            )
+
+        assert asyncio.run(rank_all()) == expected
+    assert broker.mean_batch_size > 1
@@ -0,0 +1,96 @@
+from simulator.agents.mcts_agent import MCTSAgent, evaluate, rollout
+from simulator.agents.random_agent import RandomAgent
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player
+from simulator.dex.movedex import MOVEDEX
+from simulator.dex.pokedex import POKEDEX
+from simulator.pokemon.party_pokemon import PartyPokemon
+
+# pylint: disable=protected-access
+
+SCRATCH, GROWL = Action(Action.MOVE_1), Action(Action.MOVE_1 + 1)
+
+
+def _battle() -> Battle:
+    """A battle P1 wins with a few Scratches, and cannot win with Growl."""
+    p1_team = [
+        PartyPokemon(POKEDEX["Charmander"], 30, [MOVEDEX["Scratch"], MOVEDEX["Growl"]])
+    ]
+    p2_team = [
+        PartyPokemon(POKEDEX["Bulbasaur"], 10, [MOVEDEX["Tackle"], MOVEDEX["Growl"]]),
+        PartyPokemon(POKEDEX["Squirtle"], 10, [MOVEDEX["Tackle"]]),
+    ]
+    return Battle(p1_team, p2_team, RandomAgent(), RandomAgent())
+
+
+def _search(agent: MCTSAgent, battle: Battle):
+    return agent.root_stats(battle, Player.P1)
+
+
+def test_battles_are_scored_by_result_or_hp_left():
+    battle = _battle()
+    assert evaluate(battle) == 0.5
+
+    opponent = battle.teams[Player.P2][0]
+    opponent._hp = 0
+    assert evaluate(battle) > 0.5
+
+    battle.forfeit(Player.P2)
+    assert evaluate(battle) == 1.0
+
+
+def test_rollouts_play_the_battle_forward():
+    battle = _battle()
+
+    value = rollout(battle, 2)
+
+    assert 0.0 <= value <= 1.0
+    assert len(battle.history) == 2
+
+
+def test_the_search_prefers_the_winning_move():
+    agent = MCTSAgent(seconds=10, iterations=400, seed=0)
+    battle = _battle()
+
+    stats = _search(agent, battle)
+
+    assert sum(visits for visits, _ in stats.values()) == 400
+    assert stats[SCRATCH][0] > stats[GROWL][0]
+    assert agent.request_action(battle, Player.P1, [SCRATCH, GROWL]) == SCRATCH
+
+
+def test_searches_with_the_same_seed_are_reproducible():
+    first = _search(MCTSAgent(seconds=10, iterations=200, seed=1), _battle())
+    second = _search(MCTSAgent(seconds=10, iterations=200, seed=1), _battle())
+
+    assert first == second
+
+
+def test_the_tree_is_kept_between_decisions_of_a_battle():
+    agent = MCTSAgent(seconds=10, iterations=200, seed=0)
+    battle = _battle()
+    _search(agent, battle)
+    decision = (SCRATCH, Action(Action.MOVE_1))
+    child = agent._searcher.root.children[decision]
+    child_visits = child.visits
+
+    battle.advance(*decision)
+    _search(agent, battle)
+
+    assert agent._searcher.root is child
+    assert child.visits == child_visits + 200
+
+    _search(agent, _battle())
+    assert agent._searcher.root is not child
+    assert agent._searcher.root.visits == 200
+
+
+def test_root_parallel_workers_split_the_iterations():
+    agent = MCTSAgent(seconds=10, workers=2, iterations=200, seed=0)
+    try:
+        stats = _search(agent, _battle())
+    finally:
+        agent.close()
+
+    assert sum(visits for visits, _ in stats.values()) == 200
+    assert set(stats) == {SCRATCH, GROWL}
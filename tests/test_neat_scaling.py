@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import pickle
+
+import neat
+import pytest
+from benchmarks import neat_scaling
+
+from basic_neat_model.parallel_utils import ParallelSelfPlayEvaluator
+
+
+def _config() -> neat.Config:
+    return neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        neat_scaling.CONFIG_PATH,
+    )
+
+
+def _pairs(population: int) -> int:
+    return population * (population - 1) // 2
+
+
+@pytest.mark.parametrize("base_population", [4, 24])
+def test_weak_populations_keep_the_pairs_per_worker_constant(base_population):
+    for workers in range(1, 9):
+        population = neat_scaling.weak_population(base_population, workers)
+        # Rounding the population is off by at most one genome's pairs.
+        assert abs(_pairs(population) - workers * _pairs(base_population)) <= (
+            population
+        )
+    assert neat_scaling.weak_population(base_population, 1) == base_population
+
+
+def test_populations_are_reproducible_from_their_seed():
+    # New node keys are numbered by the config, so each population gets its own.
+    first = neat_scaling.make_population(_config(), 3, seed=0, mutations=5)
+    second = neat_scaling.make_population(_config(), 3, seed=0, mutations=5)
+
+    assert [key for key, _ in first] == [1, 2, 3]
+    assert [str(genome) for _, genome in first] == [str(genome) for _, genome in second]
+    assert len({str(genome) for _, genome in first}) == 3
+
+
+def test_the_measuring_pool_records_every_job():
+    with multiprocessing.Pool(1) as pool:
+        measuring_pool = neat_scaling.MeasuringPool(pool)
+        assert measuring_pool.apply_async(os.getpid).get(5) != os.getpid()
+        assert sorted(measuring_pool.imap_unordered(abs, [-1, -2, -3])) == [1, 2, 3]
+
+    assert len(measuring_pool.jobs) == 4
+    for job in measuring_pool.jobs:
+        assert job.pid != os.getpid()
+        assert job.start <= job.end
+        assert job.bytes_sent > 0 and job.bytes_received > 0
+
+
+def test_an_evaluation_reports_its_jobs_and_ipc():
+    config = _config()
+    genomes = neat_scaling.make_population(config, 4, seed=0, mutations=3)
+    broadcast = pickle.dumps(genomes, pickle.HIGHEST_PROTOCOL)
+
+    result = neat_scaling.run_evaluation(config, genomes, 1)
+
+    pairs = _pairs(len(genomes)) + len(genomes) - 1
+    assert result["jobs"] == min(pairs, ParallelSelfPlayEvaluator.CHUNKS_PER_WORKER)
+    assert result["broadcast_bytes"] == len(broadcast)
+    assert result["bytes_sent"] > result["broadcast_bytes"]
+    assert result["bytes_received"] > 0
+    assert len(result["utilisation"]) == 1
+    assert 0 < result["utilisation"][0] <= 1
+    assert 0 < result["slowest_job"] <= result["wall"]
+    assert 0 <= result["tail"] <= result["wall"]
+    assert all(genome.fitness is not None for _, genome in genomes)
@@ -0,0 +1,123 @@
+import random
+
+import numpy as np
+import pytest
+
+from simulator.agents.random_agent import RandomAgent
+from simulator.battle.action import Action
+from simulator.battle.battle import Battle, Player
+from simulator.dex.matchups import load_matchups
+from simulator.dex.movedex import MOVEDEX
+from simulator.dex.pokedex import POKEDEX
+from simulator.env import observation_encoder
+from simulator.env.observation_encoder import ObservationEncoder
+from simulator.pokemon.party_pokemon import PartyPokemon
+from simulator.ruleset import Ruleset
+from simulator.team_generators.random_battle_team_generator import (
+    RandomBattleTeamGenerator,
+)
+
+# pylint: disable=protected-access
+
+
+def _battle() -> Battle:
+    team = [
+        PartyPokemon(POKEDEX["Charmander"], 17, [MOVEDEX["Scratch"], MOVEDEX["Growl"]]),
+        PartyPokemon(
+            POKEDEX["Squirtle"], 17, [MOVEDEX["Tackle"], MOVEDEX["Tail Whip"]]
+        ),
+    ]
+    return Battle(team, list(team), RandomAgent(), RandomAgent())
+
+
+def _matchups(observation: np.ndarray, side: int) -> list:
+    offset = side * observation_encoder._SIDE_SIZE + observation_encoder._MOVES
+    return [
+        observation[
+            offset
+            + i * observation_encoder._MOVE_SIZE
+            + observation_encoder.MOVE_FEATURES
+            + 1
+        ]
+        for i in range(4)
+    ]
+
+
+def test_move_matchups_are_read_from_the_matchup_tensor():
+    matchups = load_matchups()
+    charmander, squirtle = POKEDEX["Charmander"], POKEDEX["Squirtle"]
+    battle = _battle()
+    encoder = ObservationEncoder()
+    observation = np.zeros(encoder.size)
+
+    encoder.encode(battle, Player.P1, observation)
+    scratch = 1 / matchups.hits(charmander, MOVEDEX["Scratch"], charmander)
+    assert scratch > 0
+    assert _matchups(observation, 0) == pytest.approx([scratch, 0.0, 0.0, 0.0])
+    assert _matchups(observation, 1) == pytest.approx([scratch, 0.0, 0.0, 0.0])
+
+    battle.advance(Action(Action.SWITCH_1 + 1), Action(Action.MOVE_1 + 1))
+    encoder.encode(battle, Player.P1, observation)
+    tackle = 1 / matchups.hits(squirtle, MOVEDEX["Tackle"], charmander)
+    assert _matchups(observation, 0) == pytest.approx([tackle, 0.0, 0.0, 0.0])
+    scratch = 1 / matchups.hits(charmander, MOVEDEX["Scratch"], squirtle)
+    assert _matchups(observation, 1) == pytest.approx([scratch, 0.0, 0.0, 0.0])
+
+
+def _random_battle(seed: int) -> Battle:
+    generator = RandomBattleTeamGenerator(seed=seed)
+    return Battle(
+        generator.generate_team(), generator.generate_team(), None, None, Ruleset()
+    )
+
+
+def _random_choice(battle: Battle, player: Player):
+    choices = battle.choices(player)
+    return random.choice(choices) if choices else None
+
+
+def test_incremental_encodings_match_fresh_ones():
+    random.seed(0)
+    encoder = ObservationEncoder()
+    battles = [_random_battle(seed) for seed in range(3)]
+    rows = np.zeros((len(battles), 2, encoder.size))
+
+    for _ in range(60):
+        for i, battle in enumerate(battles):
+            for p, player in enumerate(Player):
+                encoder.encode(battle, player, rows[i, p])
+                fresh = np.zeros(encoder.size)
+                ObservationEncoder().encode(battle, player, fresh)
+                assert (rows[i, p] == fresh).all()
+            if not battle.finished:
+                battle.advance(
+                    _random_choice(battle, Player.P1),
+                    _random_choice(battle, Player.P2),
+                )
+
+
+def test_a_row_given_another_battle_is_rewritten():
+    encoder = ObservationEncoder()
+    first, second = _random_battle(0), _random_battle(1)
+    row = np.zeros(encoder.size)
+    fresh = np.zeros(encoder.size)
+
+    encoder.encode(first, Player.P1, row)
+    encoder.encode(second, Player.P1, row)
+    ObservationEncoder().encode(second, Player.P1, fresh)
+
+    assert (row == fresh).all()
+
+
+def test_batches_are_encoded_row_by_row():
+    encoder = ObservationEncoder()
+    battles = [_random_battle(seed) for seed in range(3)]
+    batch = np.zeros((5, encoder.size))
+
+    encoder.encode_batch(battles, Player.P2, batch[1:4])
+
+    for battle, row in zip(battles, batch[1:4]):
+        fresh = np.zeros(encoder.size)
+        ObservationEncoder().encode(battle, Player.P2, fresh)
+        assert (row == fresh).all()
+    assert not batch[0].any() and not batch[4].any()
@@ -0,0 +1,100 @@
+import os
+from itertools import combinations_with_replacement
+
+import neat
+
+from basic_neat_model import parallel_utils
+from basic_neat_model.parallel_utils import ParallelSelfPlayEvaluator
+
+# pylint: disable=protected-access
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "basic_neat_model",
+    "config",
+)
+
+
+def stronger_wins(genome, competitors, config):
+    """Rewards the genome with the larger key, as if it always won."""
+    del config
+    rewards = {genome[0]: 0.0}
+    for competitor in competitors:
+        winner = max(genome[0], competitor[0])
+        rewards[winner] = rewards.get(winner, 0.0) + 1.0
+    return rewards
+
+
+def _config() -> neat.Config:
+    return neat.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        CONFIG_PATH,
+    )
+
+
+def _population(config, size):
+    genomes = []
+    for key in range(1, size + 1):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        genomes.append((key, genome))
+    return genomes
+
+
+def _cost(evaluator, pair):
+    return (evaluator.genome_costs[pair[0]] + evaluator.genome_costs[pair[1]]) / 2
+
+
+def test_pairs_are_split_into_balanced_chunks_longest_first():
+    evaluator = ParallelSelfPlayEvaluator(2, stronger_wins)
+    evaluator.genome_costs = {key: float(key**2) for key in range(1, 11)}
+    pairs = list(combinations_with_replacement(range(1, 11), 2))
+
+    chunks = evaluator._chunks(pairs)
+
+    assert len(chunks) == 2 * ParallelSelfPlayEvaluator.CHUNKS_PER_WORKER
+    assert sorted(pair for chunk in chunks for pair in chunk) == sorted(pairs)
+    loads = [sum(_cost(evaluator, pair) for pair in chunk) for chunk in chunks]
+    assert loads == sorted(loads, reverse=True)
+    # Greedy longest-first placement leaves chunks within a pair of each other.
+    assert loads[0] - loads[-1] <= max(_cost(evaluator, pair) for pair in pairs)
+
+
+def test_small_generations_get_one_chunk_per_pair():
+    evaluator = ParallelSelfPlayEvaluator(4, stronger_wins)
+
+    chunks = evaluator._chunks([(1, 2), (1, 3), (2, 3)])
+
+    assert sorted(chunks) == [[(1, 2)], [(1, 3)], [(2, 3)]]
+
+
+def test_round_robin_rewards_are_summed_from_every_chunk():
+    config = _config()
+    genomes = _population(config, 7)
+    evaluator = ParallelSelfPlayEvaluator(2, stronger_wins, config=config)
+    try:
+        evaluator.evaluate(genomes, config)
+    finally:
+        evaluator.pool.close()
+        evaluator.pool.join()
+
+    # Genome k has the larger key in its pairs with genomes 1 to k, itself
+    # included, except for the last genome, which has never played itself.
+    expected = [float(key) for key, _ in genomes]
+    expected[-1] -= 1
+    assert [genome.fitness for _, genome in genomes] == expected
+    assert set(evaluator.genome_costs) == {key for key, _ in genomes}
+    assert all(cost > 0 for cost in evaluator.genome_costs.values())
+
+
+def test_agents_outside_the_evaluator_keep_the_network_cache_bounded():
+    config = _config()
+    genomes = _population(config, parallel_utils.MAX_CACHED_NETWORKS + 10)
+
+    for _, genome in genomes:
+        parallel_utils._agent(genome, config)
+
+    assert len(parallel_utils._networks) == parallel_utils.MAX_CACHED_NETWORKS
@@ -0,0 +1,70 @@
+from simulator.dex.movedex import MOVEDEX
+from simulator.dex.pokedex import POKEDEX
+from simulator.dex.query import BASE_STATS, move_query, species_query
+from simulator.moves.damaging_move import DamagingMove
+from simulator.ruleset import Ruleset
+from simulator.type import Type
+
+
+def test_species_filters_match_a_linear_scan():
+    species = list(POKEDEX.values())
+    surf = MOVEDEX["Surf"]
+
+    assert species_query().of_type(Type.WATER).all() == [
+        s for s in species if Type.WATER in s.types
+    ]
+    assert species_query().immune_to(Type.ELECTRIC).learns(surf).all() == [
+        s
+        for s in species
+        if s.attack_effectiveness(Type.ELECTRIC) == 0 and surf in s.moveset
+    ]
+    assert species_query().weak_to(Type.FIRE).resists(Type.WATER).all() == [
+        s
+        for s in species
+        if s.attack_effectiveness(Type.FIRE) > 1
+        and 0 < s.attack_effectiveness(Type.WATER) < 1
+    ]
+
+
+def test_only_damaging_moves_are_stab():
+    for name in ("Caterpie", "Paras", "Venonat"):
+        assert POKEDEX[name] not in species_query().learns_stab_move()
+
+    bulbasaur = POKEDEX["Bulbasaur"]
+    stab_moves = move_query().stab_for(bulbasaur).all()
+    assert stab_moves == [
+        m
+        for m in MOVEDEX.values()
+        if m in bulbasaur.moveset
+        and isinstance(m, DamagingMove)
+        and m.move_type in bulbasaur.types
+    ]
+    assert MOVEDEX["Vine Whip"] in stab_moves
+    assert MOVEDEX["Poison Powder"] not in stab_moves
+
+
+def test_top_sorts_by_decreasing_stat_then_dex_order():
+    for stat in BASE_STATS:
+        top = species_query().top(10, stat)
+        assert top == sorted(POKEDEX.values(), key=lambda s: -getattr(s, stat))[:10]
+
+    top = move_query().of_type(Type.FIRE).top(2)
+    assert [m.power for m in top] == sorted(
+        (m.power for m in MOVEDEX.values() if m in move_query().of_type(Type.FIRE)),
+        reverse=True,
+    )[:2]
+
+
+def test_queries_are_restricted_by_a_ruleset():
+    allowed = [POKEDEX["Bulbasaur"], POKEDEX["Squirtle"]]
+    moves = [MOVEDEX["Tackle"], MOVEDEX["Struggle"]]
+    ruleset = Ruleset.from_dex(pokedex=allowed, movedex=moves)
+
+    assert species_query().allowed_by(ruleset).all() == allowed
+    assert move_query().allowed_by(ruleset).all() == [
+        m for m in MOVEDEX.values() if m in moves
+    ]
+    assert (
+        move_query().of_class(DamagingMove).with_power(100).allowed_by(ruleset).all()
+        == []
+    )
@@ -0,0 +1,78 @@
+import dataclasses
+import json
+
+import pytest
+
+import simulator.ruleset
+from simulator import run
+from simulator.agents.max_damage_agent import MaxDamageAgent
+
+
+def _config(seed: int = 0) -> run.RunConfig:
+    ruleset = dataclasses.replace(simulator.ruleset.FULL_RULESET, max_turns=50)
+    return run.RunConfig("random", "maxdamage", "random", ruleset, seed, team_size=2)
+
+
+def _results(config: run.RunConfig, battles: int, processes: int) -> list:
+    results = []
+    run.run(
+        config,
+        battles,
+        processes,
+        chunksize=2,
+        on_result=lambda result, _: results.append(result),
+    )
+    for result in results:
+        del result["seconds"]
+    return sorted(results, key=lambda result: result["battle"])
+
+
+def test_runs_are_reproducible_from_their_seed():
+    first = _results(_config(), 12, 1)
+
+    assert [result["battle"] for result in first] == list(range(12))
+    assert _results(_config(), 12, 1) == first
+    assert _results(_config(seed=1), 12, 1) != first
+
+
+def test_runs_do_not_depend_on_the_number_of_processes():
+    assert _results(_config(), 12, 2) == _results(_config(), 12, 1)
+
+
+def test_agents_alternate_sides():
+    results = _results(_config(), 4, 1)
+
+    assert [result["a_side"] for result in results] == ["P1", "P2", "P1", "P2"]
+
+
+def test_agents_are_loaded_from_their_specs():
+    agent = run.load_agent("maxdamage,switch_ratio=4.5,seed=3")
+    assert isinstance(agent, MaxDamageAgent)
+    assert agent.switch_ratio == 4.5
+
+    assert isinstance(
+        run.load_agent("simulator.agents.max_damage_agent:MaxDamageAgent"),
+        MaxDamageAgent,
+    )
+    with pytest.raises(ValueError):
+        run.load_agent("unknown")
+
+
+def test_win_rate_intervals_are_wilson_score_intervals():
+    low, high = run.wilson_interval(50, 100)
+    assert low == pytest.approx(0.4038, abs=1e-4)
+    assert high == pytest.approx(0.5962, abs=1e-4)
+    assert run.wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_results_are_streamed_to_the_output_file(tmp_path, capsys):
+    output = tmp_path / "results.jsonl"
+
+    run.main(
+        ["random", "random", "-n", "5", "-p", "1", "--team-size", "1"]
+        + ["--max-turns", "30", "-o", str(output)]
+    )
+
+    lines = output.read_text().splitlines()
+    assert sorted(json.loads(line)["battle"] for line in lines) == list(range(5))
+    assert "5 battles" in capsys.readouterr().err
@@ -0,0 +1,186 @@
+import io
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from simulator.corpus import team_corpus
+from simulator.corpus.packed import TEAM_DTYPE
+from simulator.corpus.showdown import import_teams
+from simulator.corpus.team_corpus import (
+    InvalidCorpusException,
+    TeamCorpus,
+    TeamCorpusWriter,
+)
+from simulator.team_generators.random_battle_team_generator import (
+    RandomBattleTeamGenerator,
+)
+
+
+def test_an_empty_corpus_round_trips(tmp_path):
+    path = str(tmp_path / "teams.corpus")
+    with TeamCorpusWriter(path) as writer:
+        writer.write_packed(np.zeros(0, dtype=TEAM_DTYPE))
+
+    assert len(TeamCorpus(path)) == 0
+    assert [p.name for p in tmp_path.iterdir()] == ["teams.corpus"]
+
+
+def test_an_error_while_writing_leaves_no_files(tmp_path):
+    path = str(tmp_path / "teams.corpus")
+    with pytest.raises(ValueError):
+        with TeamCorpusWriter(path) as writer:
+            writer.write_packed(np.zeros(1, dtype=np.uint8))
+
+    assert writer._file.closed  # pylint: disable=protected-access
+    assert not list(tmp_path.iterdir())
+
+
+def test_an_error_while_closing_leaves_no_files(tmp_path, monkeypatch):
+    def broken_dex_hash():
+        raise RuntimeError("The dex could not be hashed.")
+
+    monkeypatch.setattr(team_corpus, "dex_hash", broken_dex_hash)
+    path = str(tmp_path / "teams.corpus")
+    with pytest.raises(RuntimeError):
+        with TeamCorpusWriter(path) as writer:
+            writer.write_packed(np.zeros(0, dtype=TEAM_DTYPE))
+
+    assert writer._file.closed  # pylint: disable=protected-access
+    assert not list(tmp_path.iterdir())
+
+
+def _describe(team) -> list:
+    return [
+        (
+            pokemon.species.name,
+            pokemon.level,
+            [move.name for move in pokemon.moves],
+            (pokemon.atk_dv, pokemon.def_dv, pokemon.spe_dv, pokemon.spc_dv),
+            (
+                pokemon.hp_stat_exp,
+                pokemon.atk_stat_exp,
+                pokemon.def_stat_exp,
+                pokemon.spe_stat_exp,
+                pokemon.spc_stat_exp,
+            ),
+        )
+        for pokemon in team
+    ]
+
+
+def _write(path: str, teams) -> None:
+    with TeamCorpusWriter(path) as writer:
+        writer.write_teams(teams, chunk_size=2)
+
+
+def test_teams_round_trip_across_chunks(tmp_path):
+    teams = RandomBattleTeamGenerator(seed=0).generate_teams(5)
+    path = str(tmp_path / "teams.corpus")
+
+    _write(path, teams)
+    corpus = TeamCorpus(path)
+
+    assert len(corpus) == 5
+    assert [_describe(team) for team in corpus] == [_describe(t) for t in teams]
+    assert corpus.packed.shape == (5,) and not corpus.packed.flags.writeable
+
+
+def test_a_pickled_corpus_reopens_its_file(tmp_path):
+    path = str(tmp_path / "teams.corpus")
+    _write(path, RandomBattleTeamGenerator(seed=1).generate_teams(3))
+    corpus = TeamCorpus(path)
+
+    data = pickle.dumps(corpus)
+    copy = pickle.loads(data)
+
+    assert len(data) < 200
+    assert [_describe(team) for team in copy] == [_describe(t) for t in corpus]
+
+
+def test_generated_corpora_are_reproducible_from_their_seed():
+    first = RandomBattleTeamGenerator(team_size=3, seed=2).generate_packed(4)
+    second = RandomBattleTeamGenerator(team_size=3, seed=2).generate_packed(4)
+
+    assert (first == second).all()
+    assert (first["size"] == 3).all()
+
+
+def _corrupt(path: str, offset: int, data: bytes) -> None:
+    with open(path, "r+b") as file:
+        file.seek(offset)
+        file.write(data)
+
+
+@pytest.mark.parametrize(
+    "corruption, reason",
+    [
+        (lambda path: _corrupt(path, 0, b"NOTTEAMS"), "magic"),
+        (lambda path: _corrupt(path, 8, (2).to_bytes(4, "little")), "version"),
+        (lambda path: _corrupt(path, 12, (9).to_bytes(8, "little")), "size"),
+        (lambda path: _corrupt(path, os.path.getsize(path), b"\0"), "size"),
+        (lambda path: os.truncate(path, 100), "truncated"),
+    ],
+)
+def test_invalid_corpora_are_rejected(tmp_path, corruption, reason):
+    path = str(tmp_path / "teams.corpus")
+    _write(path, RandomBattleTeamGenerator(seed=0).generate_teams(2))
+
+    corruption(path)
+
+    with pytest.raises(InvalidCorpusException, match=reason):
+        TeamCorpus(path)
+
+
+def test_corpora_packed_with_another_dex_are_rejected(tmp_path, monkeypatch):
+    path = str(tmp_path / "teams.corpus")
+    _write(path, RandomBattleTeamGenerator(seed=0).generate_teams(1))
+
+    monkeypatch.setattr(team_corpus, "dex_hash", lambda: "0" * 64)
+
+    with pytest.raises(InvalidCorpusException, match="another dex"):
+        TeamCorpus(path)
+
+
+SHOWDOWN_EXPORT = """\
+=== [gen1ou] Kept ===
+
+Sparky (Pikachu) @ Leftovers
+Level: 50
+EVs: 252 HP / 100 Spe
+IVs: 2 Atk / 30 Def
+- Thunderbolt
+- Thunder Wave
+
+=== [gen1ou] Skipped ===
+
+Missingno
+- Water Gun
+
+=== [gen1ou] Also kept ===
+
+Mew
+- Psychic
+"""
+
+
+def test_showdown_exports_are_imported_skipping_invalid_teams(tmp_path):
+    path = str(tmp_path / "teams.corpus")
+
+    with TeamCorpusWriter(path) as writer:
+        errors = import_teams(io.StringIO(SHOWDOWN_EXPORT), writer)
+    corpus = TeamCorpus(path)
+
+    assert len(errors) == 1 and "Missingno" in str(errors[0])
+    assert [len(team) for team in corpus] == [1, 1]
+    assert _describe(corpus[0]) == [
+        (
+            "Pikachu",
+            50,
+            ["Thunderbolt", "Thunder Wave"],
+            (1, 15, 15, 15),
+            (252**2, 65535, 65535, 100**2, 65535),
+        )
+    ]
+    assert corpus[1][0].species.name == "Mew"
@@ -0,0 +1,123 @@
+import random
+
+import numpy as np
+import pytest
+
+from simulator.battle.action import Action
+from simulator.battle.battle import Player, Result
+from simulator.env.observation_encoder import ObservationEncoder
+from simulator.env.vec_battle_env import BasicEncoder, VecBattleEnv
+from simulator.ruleset import Ruleset
+from simulator.team_generators.basic_rival_team_generator import BasicRivalTeamGenerator
+from simulator.team_generators.random_battle_team_generator import (
+    RandomBattleTeamGenerator,
+)
+
+REWARDS = {Result.P1_WIN: 1.0, Result.P2_WIN: -1.0, Result.DRAW: 0.0}
+
+
+def _starter_env(num_envs: int) -> VecBattleEnv:
+    return VecBattleEnv(
+        num_envs,
+        team_generator=BasicRivalTeamGenerator(),
+        ruleset=Ruleset(),
+        encoder=BasicEncoder(),
+    )
+
+
+def _random_actions(masks: np.ndarray) -> np.ndarray:
+    return np.array([random.choice(np.flatnonzero(mask)) for mask in masks])
+
+
+def _expected_mask(env: VecBattleEnv, i: int) -> np.ndarray:
+    mask = np.zeros(len(Action), bool)
+    mask[env.battles[i].choices(Player.P1)] = True
+    return mask
+
+
+def _expected_observation(env: VecBattleEnv, i: int) -> np.ndarray:
+    observation = np.zeros(env.encoder.size, np.float32)
+    BasicEncoder().encode(env.battles[i], Player.P1, observation)
+    return observation
+
+
+def test_reset_observes_a_new_battle_in_every_slot():
+    random.seed(0)
+    env = VecBattleEnv(
+        3, team_generator=RandomBattleTeamGenerator(seed=0), ruleset=Ruleset()
+    )
+
+    observations, masks = env.reset()
+
+    assert observations.shape == (3, ObservationEncoder.size)
+    assert masks.shape == (3, len(Action))
+    assert len({id(battle) for battle in env.battles}) == 3
+    for i, battle in enumerate(env.battles):
+        assert battle.turn == 0
+        assert (masks[i] == _expected_mask(env, i)).all()
+        observation = np.zeros(ObservationEncoder.size, np.float32)
+        ObservationEncoder().encode(battle, Player.P1, observation)
+        assert (observations[i] == observation).all()
+
+
+def test_step_plays_each_battle_to_p1s_next_decision():
+    random.seed(0)
+    env = _starter_env(4)
+    _, masks = env.reset()
+
+    observations, rewards, dones, masks = env.step(_random_actions(masks))
+
+    for i, battle in enumerate(env.battles):
+        if dones[i]:
+            continue
+        assert battle.history
+        assert battle.choices(Player.P1)
+        assert rewards[i] == 0.0
+        assert (masks[i] == _expected_mask(env, i)).all()
+        assert (observations[i] == _expected_observation(env, i)).all()
+
+
+def test_finished_battles_are_replaced():
+    random.seed(0)
+    env = _starter_env(4)
+    _, masks = env.reset()
+
+    finished = 0
+    for _ in range(200):
+        previous = list(env.battles)
+        observations, rewards, dones, masks = env.step(_random_actions(masks))
+        for i in np.flatnonzero(dones):
+            finished += 1
+            assert previous[i].finished
+            assert env.battles[i] is not previous[i]
+            assert env.battles[i].turn == 0
+            assert rewards[i] == REWARDS[env.results[i]]
+            # The observation and mask are the replacement's first.
+            assert (observations[i] == _expected_observation(env, i)).all()
+            assert (masks[i] == _expected_mask(env, i)).all()
+        assert not any(battle.finished for battle in env.battles)
+
+    assert finished > 4
+
+
+def test_an_invalid_action_advances_no_battle():
+    random.seed(0)
+    env = _starter_env(3)
+    _, masks = env.reset()
+    actions = _random_actions(masks)
+    invalid = np.flatnonzero(~masks[2])[0]
+
+    for bad in (invalid, len(Action), -1):
+        actions[2] = bad
+        with pytest.raises(ValueError, match="battle 2"):
+            env.step(actions)
+        assert all(not battle.history for battle in env.battles)
+    with pytest.raises(ValueError):
+        env.step(actions.astype(float))
+    with pytest.raises(ValueError):
+        env.step(actions[:2])
+
+
+def test_step_requires_reset():
+    with pytest.raises(ValueError):
+        _starter_env(1).step(np.zeros(1, int))